@@ -4,10 +4,216 @@
 """
 
 import numpy as np
+import bisect
+import heapq
 import math
+import time
 from typing import List, Tuple, Dict, Optional
-from .path_planner import GridMap, PathPlanner, PlanningAlgorithm, Node
-import cv2
+from .path_planner import GridMap, PathPlanner, PlanningAlgorithm
+
+class ObstacleIndex:
+    """
+    矩形障碍物的均匀网格哈希索引
+    
+    把包围全部障碍物的区域划分为边长cell_size的桶，每个障碍物登记到它覆盖的全部桶中，
+    桶内容按CSR形式存放（按桶排序的障碍物序号 + 每个桶的起始偏移）。
+    查询先按查询范围一次取出全部候选（查询, 障碍物）对，再用NumPy向量化地精确判断。
+    障碍物视为闭矩形，与AgriculturalField.is_in_obstacle一致。
+    """
+    
+    def __init__(self, boxes, cell_size: Optional[float] = None):
+        """
+        构建索引
+        
+        Args:
+            boxes: 障碍物矩形，形状 (N, 4)，每行为 (x1, y1, x2, y2)
+            cell_size: 桶边长（米），默认按障碍物的平均密度取值（平均每桶约一个障碍物）
+        """
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self._box_list = self.boxes.tolist()
+        count = len(self.boxes)
+        if count:
+            self.origin = self.boxes[:, :2].min(axis=0)
+            extent = np.maximum(self.boxes[:, 2:].max(axis=0) - self.origin, 1e-6)
+        else:
+            self.origin = np.zeros(2)
+            extent = np.ones(2)
+        
+        if cell_size is None:
+            cell_size = math.sqrt(extent[0] * extent[1] / max(count, 1))
+        self.cell_size = max(float(cell_size), 1e-6)
+        self.shape = (int(extent[1] // self.cell_size) + 1,
+                      int(extent[0] // self.cell_size) + 1)   # (行数, 列数)
+        
+        owners, buckets = self._expand(*self.boxes.T)
+        order = np.argsort(buckets, kind='stable')
+        self._entries = owners[order]
+        self._offsets = np.zeros(self.shape[0] * self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(buckets, minlength=len(self._offsets) - 1), out=self._offsets[1:])
+    
+    def __len__(self) -> int:
+        return len(self.boxes)
+    
+    def _expand(self, x1, y1, x2, y2) -> Tuple[np.ndarray, np.ndarray]:
+        """把查询矩形展开为其覆盖的桶：返回 (查询序号, 桶序号)"""
+        rows, cols = self.shape
+        ox, oy = self.origin
+        
+        def bucket(value, origin, size):
+            return np.clip(np.floor((np.asarray(value, dtype=np.float64) - origin) / self.cell_size),
+                           0, size - 1).astype(np.int64)
+        
+        ix0, ix1 = bucket(x1, ox, cols), bucket(x2, ox, cols)
+        iy0, iy1 = bucket(y1, oy, rows), bucket(y2, oy, rows)
+        widths = ix1 - ix0 + 1
+        counts = widths * (iy1 - iy0 + 1)
+        
+        query = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        buckets = ((iy0[query] + local // widths[query]) * cols
+                   + ix0[query] + local % widths[query])
+        return query, buckets
+    
+    def _candidates(self, x1, y1, x2, y2) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        与查询矩形共享桶的候选对：返回 (查询序号, 障碍物序号)
+        
+        跨多个桶的障碍物可能对同一查询重复出现，只做"是否相交"判断时无需去重。
+        """
+        if len(self.boxes) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        
+        query, buckets = self._expand(x1, y1, x2, y2)
+        starts = self._offsets[buckets]
+        sizes = self._offsets[buckets + 1] - starts
+        positions = (np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+                     + np.repeat(starts, sizes))
+        return np.repeat(query, sizes), self._entries[positions]
+    
+    def contains_point(self, x: float, y: float) -> bool:
+        """判断单个点是否在障碍物内（只检查点所在桶中的障碍物）"""
+        if len(self.boxes) == 0:
+            return False
+        rows, cols = self.shape
+        col = int((x - self.origin[0]) // self.cell_size)
+        row = int((y - self.origin[1]) // self.cell_size)
+        if not (0 <= col < cols and 0 <= row < rows):
+            return False
+        
+        bucket = row * cols + col
+        for i in self._entries[self._offsets[bucket]:self._offsets[bucket + 1]].tolist():
+            x1, y1, x2, y2 = self._box_list[i]
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                return True
+        return False
+    
+    def contains_points(self, xs, ys) -> np.ndarray:
+        """
+        批量判断点是否在障碍物内
+        
+        Args:
+            xs: 点的x坐标数组
+            ys: 点的y坐标数组
+        
+        Returns:
+            布尔数组
+        """
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        ys = np.asarray(ys, dtype=np.float64).ravel()
+        query, owner = self._candidates(xs, ys, xs, ys)
+        boxes = self.boxes[owner]
+        px, py = xs[query], ys[query]
+        hit = ((boxes[:, 0] <= px) & (px <= boxes[:, 2]) &
+               (boxes[:, 1] <= py) & (py <= boxes[:, 3]))
+        
+        result = np.zeros(len(xs), dtype=bool)
+        result[query[hit]] = True
+        return result
+    
+    def rows_blocked(self, ys, x_min: float = -math.inf, x_max: float = math.inf) -> np.ndarray:
+        """
+        批量判断水平线 y（限定在 [x_min, x_max] 内）上是否有障碍物
+        
+        Returns:
+            布尔数组
+        """
+        ys = np.asarray(ys, dtype=np.float64).ravel()
+        query, owner = self._candidates(np.full(len(ys), x_min), ys, np.full(len(ys), x_max), ys)
+        boxes = self.boxes[owner]
+        y = ys[query]
+        hit = ((boxes[:, 1] <= y) & (y <= boxes[:, 3]) &
+               (boxes[:, 0] <= x_max) & (x_min <= boxes[:, 2]))
+        
+        result = np.zeros(len(ys), dtype=bool)
+        result[query[hit]] = True
+        return result
+    
+    def row_intervals(self, y: float, strict: bool = False) -> np.ndarray:
+        """
+        与水平线 y 相交的障碍物在该线上占据的x区间
+        
+        Args:
+            y: 水平线的y坐标
+            strict: 为True时不计y只落在障碍物上下边界上的障碍物（开矩形）
+        
+        Returns:
+            按起点排序的区间数组，形状 (K, 2)
+        """
+        return self._line_intervals(1, y, strict)
+    
+    def column_intervals(self, x: float, strict: bool = False) -> np.ndarray:
+        """与竖直线 x 相交的障碍物在该线上占据的y区间，参见row_intervals"""
+        return self._line_intervals(0, x, strict)
+    
+    def _line_intervals(self, axis: int, value: float, strict: bool) -> np.ndarray:
+        """与坐标轴axis上取值为value的直线相交的障碍物，在另一坐标轴上的区间"""
+        low, high = [-math.inf], [math.inf]
+        bounds = (low, [value], high, [value]) if axis == 1 else ([value], low, [value], high)
+        _, owner = self._candidates(*bounds)
+        boxes = self.boxes[np.unique(owner)]
+        if strict:
+            hit = (boxes[:, axis] < value) & (value < boxes[:, axis + 2])
+        else:
+            hit = (boxes[:, axis] <= value) & (value <= boxes[:, axis + 2])
+        
+        other = 1 - axis
+        intervals = boxes[hit][:, [other, other + 2]]
+        return intervals[np.argsort(intervals[:, 0], kind='stable')]
+    
+    def segments_hit(self, x1, y1, x2, y2) -> np.ndarray:
+        """
+        批量判断线段是否与障碍物相交（含接触）
+        
+        Args:
+            x1, y1, x2, y2: 线段端点坐标数组
+        
+        Returns:
+            布尔数组
+        """
+        x1, y1, x2, y2 = (np.asarray(v, dtype=np.float64).ravel() for v in (x1, y1, x2, y2))
+        query, owner = self._candidates(np.minimum(x1, x2), np.minimum(y1, y2),
+                                        np.maximum(x1, x2), np.maximum(y1, y2))
+        boxes = self.boxes[owner]
+        
+        # 参数化线段 p = p1 + t (p2 - p1)，按x、y两个方向的平板求t的可行区间
+        t_min = np.zeros(len(query))
+        t_max = np.ones(len(query))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for axis, (p1, p2) in enumerate(((x1, x2), (y1, y2))):
+                p, d = p1[query], p2[query] - p1[query]
+                low, high = boxes[:, axis], boxes[:, axis + 2]
+                t_a, t_b = (low - p) / d, (high - p) / d
+                parallel = d == 0
+                t_min = np.where(parallel, t_min, np.maximum(t_min, np.minimum(t_a, t_b)))
+                t_max = np.where(parallel, t_max, np.minimum(t_max, np.maximum(t_a, t_b)))
+                # 与该轴平行的线段必须落在平板内
+                t_max = np.where(parallel & ((p < low) | (p > high)), -1.0, t_max)
+        hit = t_min <= t_max
+        
+        result = np.zeros(len(x1), dtype=bool)
+        result[query[hit]] = True
+        return result
 
 class AgriculturalField:
     """农田场景类"""
@@ -40,6 +246,10 @@ class AgriculturalField:
         
         # 障碍物区域 (如灌溉设备、电线杆等)
         self.obstacles = []
+        # 障碍物每次变化时递增，用于判断行拓扑图等派生数据是否过期
+        self.version = 0
+        self._obstacle_index: Optional[ObstacleIndex] = None
+        self._obstacle_index_version = -1
         
     def add_obstacle(self, x: float, y: float, width: float, height: float):
         """添加障碍物"""
@@ -47,14 +257,70 @@ class AgriculturalField:
             'x': x, 'y': y,
             'width': width, 'height': height
         })
+        self.version += 1
+    
+    def rasterize_obstacles(self, grid_map: GridMap):
+        """将全部障碍物一次性栅格化到网格地图"""
+        rectangles = []
+        for obstacle in self.obstacles:
+            x1, y1 = grid_map.world_to_grid(obstacle['x'], obstacle['y'])
+            x2, y2 = grid_map.world_to_grid(obstacle['x'] + obstacle['width'],
+                                            obstacle['y'] + obstacle['height'])
+            rectangles.append((x1, y1, x2, y2))
+        
+        grid_map.set_obstacle_rectangles(rectangles)
+    
+    def to_grid_map(self, resolution: float = 0.1, robot_width: float = 0.0) -> GridMap:
+        """
+        生成覆盖整块农田并包含全部障碍物的网格地图
+        
+        Args:
+            resolution: 分辨率（米/单元格）
+            robot_width: 机器人宽度（米），大于0时按半宽膨胀障碍物
+        
+        Returns:
+            网格地图
+        """
+        width = int(math.ceil(self.field_width / resolution - 1e-9))
+        height = int(math.ceil(self.field_height / resolution - 1e-9))
+        grid_map = GridMap(width, height, resolution=resolution)
+        self.rasterize_obstacles(grid_map)
+        if robot_width > 0:
+            grid_map.set_inflation_radius(robot_width / 2)
+        return grid_map
+    
+    def obstacle_index(self) -> ObstacleIndex:
+        """障碍物空间索引，障碍物变化后首次调用时重建"""
+        if self._obstacle_index is None or self._obstacle_index_version != self.version:
+            self._obstacle_index = ObstacleIndex(
+                [(o['x'], o['y'], o['x'] + o['width'], o['y'] + o['height'])
+                 for o in self.obstacles]
+            )
+            self._obstacle_index_version = self.version
+        return self._obstacle_index
     
     def is_in_obstacle(self, x: float, y: float) -> bool:
         """检查点是否在障碍物内"""
-        for obstacle in self.obstacles:
-            if (obstacle['x'] <= x <= obstacle['x'] + obstacle['width'] and
-                obstacle['y'] <= y <= obstacle['y'] + obstacle['height']):
-                return True
-        return False
+        return self.obstacle_index().contains_point(x, y)
+    
+    def points_in_obstacle(self, points: List[Tuple[float, float]]) -> np.ndarray:
+        """批量检查点是否在障碍物内，返回布尔数组"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return self.obstacle_index().contains_points(points[:, 0], points[:, 1])
+    
+    def path_in_obstacle(self, path: List[Tuple[float, float]]) -> np.ndarray:
+        """
+        一次检查整条路径（如全覆盖路径）的每一段是否穿过障碍物
+        
+        Args:
+            path: 路径点列表
+        
+        Returns:
+            长度为 len(path) - 1 的布尔数组，True表示该段与障碍物相交
+        """
+        points = np.asarray(path, dtype=np.float64).reshape(-1, 2)
+        return self.obstacle_index().segments_hit(points[:-1, 0], points[:-1, 1],
+                                                  points[1:, 0], points[1:, 1])
     
     def get_nearest_row(self, y: float) -> int:
         """获取最近的行索引"""
@@ -69,6 +335,66 @@ class AgriculturalField:
         
         return nearest_row
     
+    def build_row_graph(self, robot_width: float = 0.5,
+                        headland_width: float = 2.0) -> 'RowGraph':
+        """
+        构建行拓扑图
+        
+        行间通道为作物行所在的水平直线，纵向通道为贯穿全田的两端地头中线，以及每个障碍物
+        （按机器人半宽外扩后）左右两侧、延伸到上下相邻一行的绕行线。通道被外扩障碍物
+        切分为无障碍的段，节点取行段端点和行段与纵向通道的交点，沿同一段相邻的节点之间连边。
+        
+        Args:
+            robot_width: 机器人宽度（米）
+            headland_width: 地头宽度（米）
+        
+        Returns:
+            行拓扑图
+        """
+        margin = robot_width / 2
+        bypass_gap = 0.05
+        x_min, x_max = margin, self.field_width - margin
+        y_min, y_max = margin, self.field_height - margin
+        
+        # 外扩后的障碍物 (x1, y1, x2, y2)，视为开区间，机器人可以贴边通过
+        boxes = [(o['x'] - margin, o['y'] - margin,
+                  o['x'] + o['width'] + margin, o['y'] + o['height'] + margin)
+                 for o in self.obstacles]
+        
+        # 纵向通道 (x, 下端y, 上端y)
+        lanes = [(headland_width / 2, y_min, y_max),
+                 (self.field_width - headland_width / 2, y_min, y_max)]
+        for x1, y1, x2, y2 in boxes:
+            low = max(y_min, y1 - self.row_spacing)
+            high = min(y_max, y2 + self.row_spacing)
+            lanes.append((x1 - bypass_gap, low, high))
+            lanes.append((x2 + bypass_gap, low, high))
+        lanes = sorted(set(lane for lane in lanes if x_min <= lane[0] <= x_max))
+        rows = [(i, y) for i, y in enumerate(self.row_positions) if y_min <= y <= y_max]
+        
+        graph = RowGraph()
+        
+        # 行段：相邻节点之间连边
+        for row, y in rows:
+            blocks = [(x1, x2) for x1, y1, x2, y2 in boxes if y1 < y < y2]
+            for a, b in _free_intervals(x_min, x_max, blocks):
+                xs = sorted({a, b} | {x for x, low, high in lanes
+                                      if a <= x <= b and low <= y <= high})
+                nodes = [graph.add_node(x, y) for x in xs]
+                graph.add_row_segment(row, y, xs, nodes)
+                for u, v in zip(nodes, nodes[1:]):
+                    graph.add_edge(u, v)
+        
+        # 纵向通道：同一无障碍段上相邻行的交点之间连边
+        for x, low, high in lanes:
+            blocks = [(y1, y2) for x1, y1, x2, y2 in boxes if x1 < x < x2]
+            for a, b in _free_intervals(low, high, blocks):
+                nodes = [graph.add_node(x, y) for _, y in rows if a <= y <= b]
+                for u, v in zip(nodes, nodes[1:]):
+                    graph.add_edge(u, v)
+        
+        return graph
+    
     def generate_coverage_path(self, start_x: float = 0.1) -> List[Tuple[float, float]]:
         """生成全覆盖路径 (蛇形路径)"""
         path = []
@@ -96,6 +422,202 @@ class AgriculturalField:
         
         return path
 
+def _free_intervals(low: float, high: float,
+                    blocks: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """区间 [low, high] 去掉开区间blocks后剩余的闭区间"""
+    intervals = []
+    current = low
+    for b1, b2 in sorted(blocks):
+        if b2 <= current:
+            continue
+        if b1 >= high:
+            break
+        if b1 > current:
+            intervals.append((current, b1))
+        current = b2
+    if current <= high:
+        intervals.append((current, high))
+    return intervals
+
+class RowGraph:
+    """
+    农田行拓扑图（参见AgriculturalField.build_row_graph）
+    
+    节点为世界坐标点，边代价为两点间距离（米），节点数与行数和障碍物数同阶，
+    远小于网格单元格数。
+    """
+    
+    def __init__(self):
+        self.nodes: List[Tuple[float, float]] = []
+        self.edges: List[List[Tuple[int, float]]] = []
+        self.row_segments: List[Tuple[int, float, float]] = []   # (行号, 起点x, 终点x)
+        self.segment_y: List[float] = []
+        self.segment_xs: List[List[float]] = []       # 行段上节点的x坐标（升序）
+        self.segment_nodes: List[List[int]] = []      # 行段上的节点（与segment_xs对应）
+        self._node_index: Dict[Tuple[float, float], int] = {}
+        self._node_array: Optional[np.ndarray] = None
+        self._segment_array: Optional[np.ndarray] = None
+    
+    def add_node(self, x: float, y: float) -> int:
+        """添加节点，坐标相同的节点只保留一个"""
+        key = (round(x, 6), round(y, 6))
+        node = self._node_index.get(key)
+        if node is None:
+            node = len(self.nodes)
+            self._node_index[key] = node
+            self.nodes.append((x, y))
+            self.edges.append([])
+            self._node_array = None
+        return node
+    
+    def add_row_segment(self, row: int, y: float, xs: List[float], nodes: List[int]):
+        """登记行段及其上按x排序的节点"""
+        self.row_segments.append((row, xs[0], xs[-1]))
+        self.segment_y.append(y)
+        self.segment_xs.append(list(xs))
+        self.segment_nodes.append(list(nodes))
+        self._segment_array = None
+    
+    def has_edge(self, u: int, v: int) -> bool:
+        """u, v之间是否有边"""
+        return any(w == v for w, _ in self.edges[u])
+    
+    def segment_clear(self, segment: int, x1: float, x2: float) -> bool:
+        """行段上 [x1, x2] 之间的各条边是否都保留（未被网格检测过滤）"""
+        xs, nodes = self.segment_xs[segment], self.segment_nodes[segment]
+        low, high = min(x1, x2), max(x1, x2)
+        i = max(0, bisect.bisect_right(xs, low) - 1)
+        j = min(len(xs) - 1, bisect.bisect_left(xs, high))
+        return all(self.has_edge(nodes[k], nodes[k + 1]) for k in range(i, j))
+    
+    def project(self, x: float, y: float,
+                radius: float) -> List[Tuple[int, float, float, List[Tuple[int, float]]]]:
+        """
+        (x, y) 到radius范围内各行段的投影
+        
+        Returns:
+            [(行段序号, 投影点x, 投影点y, [(相连节点, 沿行段距离)])]，
+            投影点两侧节点之间的边已被过滤时相连节点为空
+        """
+        if not self.row_segments:
+            return []
+        if self._segment_array is None:
+            self._segment_array = np.array([(y_seg, a, b) for y_seg, (_, a, b)
+                                            in zip(self.segment_y, self.row_segments)])
+        
+        segments = self._segment_array
+        px = np.clip(x, segments[:, 1], segments[:, 2])
+        near = np.hypot(px - x, segments[:, 0] - y) <= radius
+        
+        projections = []
+        for segment in np.nonzero(near)[0]:
+            segment = int(segment)
+            xs, nodes = self.segment_xs[segment], self.segment_nodes[segment]
+            point_x = float(px[segment])
+            i = bisect.bisect_left(xs, point_x)
+            if i < len(xs) and xs[i] == point_x:
+                links = [(nodes[i], 0.0)]
+            elif self.has_edge(nodes[i - 1], nodes[i]):
+                links = [(nodes[i - 1], point_x - xs[i - 1]), (nodes[i], xs[i] - point_x)]
+            else:
+                links = []
+            projections.append((segment, point_x, self.segment_y[segment], links))
+        return projections
+    
+    def add_edge(self, u: int, v: int):
+        """添加无向边"""
+        (x1, y1), (x2, y2) = self.nodes[u], self.nodes[v]
+        cost = math.hypot(x2 - x1, y2 - y1)
+        self.edges[u].append((v, cost))
+        self.edges[v].append((u, cost))
+    
+    def edge_list(self) -> List[Tuple[int, int]]:
+        """全部无向边 (u, v)，u < v"""
+        return [(u, v) for u, edges in enumerate(self.edges) for v, _ in edges if u < v]
+    
+    def keep_edges(self, keep: List[bool]):
+        """只保留edge_list()中对应位置为True的边"""
+        kept = {edge for edge, flag in zip(self.edge_list(), keep) if flag}
+        self.edges = [[(v, cost) for v, cost in edges if (min(u, v), max(u, v)) in kept]
+                      for u, edges in enumerate(self.edges)]
+    
+    def nearest_nodes(self, x: float, y: float, radius: float) -> List[int]:
+        """距离 (x, y) 不超过radius的节点，按距离从近到远"""
+        if not self.nodes:
+            return []
+        if self._node_array is None:
+            self._node_array = np.array(self.nodes)
+        
+        distances = np.hypot(self._node_array[:, 0] - x, self._node_array[:, 1] - y)
+        near = np.nonzero(distances <= radius)[0]
+        return [int(i) for i in near[np.argsort(distances[near])]]
+    
+    def shortest_path(self, sources: Dict[int, float], targets: Dict[int, float],
+                      upper_bound: float = math.inf) -> Tuple[float, Optional[List[int]]]:
+        """
+        多源多汇A*
+        
+        启发式取到各终止节点的直线距离加离开代价的最小值，边代价为直线长度，因此可采纳且一致。
+        
+        Args:
+            sources: {起始节点: 初始代价}
+            targets: {终止节点: 离开代价}
+            upper_bound: 已知的其他路线代价，不优于它时返回None
+        
+        Returns:
+            (总代价, 节点序列或None)
+        """
+        self.explored_nodes = 0
+        if not sources or not targets:
+            return upper_bound, None
+        if self._node_array is None:
+            self._node_array = np.array(self.nodes)
+        
+        target_nodes = list(targets)
+        target_points = self._node_array[target_nodes]
+        exit_costs = np.array([targets[node] for node in target_nodes])
+        h = np.min(np.hypot(self._node_array[:, None, 0] - target_points[None, :, 0],
+                            self._node_array[:, None, 1] - target_points[None, :, 1])
+                   + exit_costs[None, :], axis=1).tolist()
+        
+        g_score = dict(sources)
+        parents = {node: -1 for node in sources}
+        closed = set()
+        open_heap = [(cost + h[node], node) for node, cost in sources.items()]
+        heapq.heapify(open_heap)
+        best_cost, best_node = upper_bound, None
+        
+        while open_heap:
+            f, node = heapq.heappop(open_heap)
+            if node in closed:
+                continue
+            if f >= best_cost:
+                break
+            closed.add(node)
+            current_g = g_score[node]
+            self.explored_nodes += 1
+            
+            if node in targets and current_g + targets[node] < best_cost:
+                best_cost = current_g + targets[node]
+                best_node = node
+            
+            for other, cost in self.edges[node]:
+                tentative_g = current_g + cost
+                if other not in closed and tentative_g < g_score.get(other, math.inf):
+                    g_score[other] = tentative_g
+                    parents[other] = node
+                    heapq.heappush(open_heap, (tentative_g + h[other], other))
+        
+        if best_node is None:
+            return best_cost, None
+        
+        path = []
+        node = best_node
+        while node >= 0:
+            path.append(node)
+            node = parents[node]
+        return best_cost, path[::-1]
+
 class CoveragePathPlanner:
     """全覆盖路径规划器"""
     
@@ -167,10 +689,7 @@ class CoveragePathPlanner:
     
     def _row_has_obstacle(self, row_y: float) -> bool:
         """检查该行是否有障碍物"""
-        for obstacle in self.field.obstacles:
-            if (obstacle['y'] <= row_y <= obstacle['y'] + obstacle['height']):
-                return True
-        return False
+        return bool(self.field.obstacle_index().rows_blocked([row_y])[0])
     
     def _plan_obstacle_avoidance(self, x: float, y: float, 
                                 direction: int) -> List[Tuple[float, float]]:
@@ -219,6 +738,9 @@ class SpotTreatmentPlanner:
         self.field = field
         self.grid_map = grid_map
         self.path_planner = PathPlanner(grid_map)
+        
+        # 最近一次巡检规划中不可达而被跳过的检查点（网格坐标）
+        self.skipped_spots: List[Tuple[int, int]] = []
     
     def plan_inspection_route(self, spots: List[Tuple[float, float]], 
                            start_pos: Tuple[float, float],
@@ -232,8 +754,9 @@ class SpotTreatmentPlanner:
             algorithm: 路径规划算法
         
         Returns:
-            完整巡检路径
+            完整巡检路径，不可达的检查点跳过并记录在skipped_spots中
         """
+        self.skipped_spots = []
         if not spots:
             return []
         
@@ -246,6 +769,10 @@ class SpotTreatmentPlanner:
         current = grid_start
         full_path = [start_pos]
         
+        if algorithm in (PlanningAlgorithm.ASTAR, PlanningAlgorithm.DIJKSTRA):
+            # 网格最优算法：每个访问点只做一次代价场搜索
+            return self._plan_route_with_distance_fields(unvisited, current, full_path)
+        
         while unvisited:
             # 找到最近的未访问点
             nearest_dist = float('inf')
@@ -259,18 +786,51 @@ class SpotTreatmentPlanner:
             
             if nearest_spot:
                 # 规划到最近点的路径
-                self.grid_map.set_start(current[0], current[1])
-                self.grid_map.set_goal(nearest_spot[0], nearest_spot[1])
-                
-                path_segment = self.path_planner.plan(algorithm)
+                path_segment, _ = self.path_planner.plan_query(current, nearest_spot, algorithm)
+                unvisited.remove(nearest_spot)
                 
                 if path_segment:
                     # 转换为世界坐标并添加到完整路径
                     world_segment = [self.grid_map.grid_to_world(x, y) for x, y in path_segment[1:]]
                     full_path.extend(world_segment)
-                
-                unvisited.remove(nearest_spot)
-                current = nearest_spot
+                    current = nearest_spot
+                else:
+                    # 不可达时留在原地，继续前往其余检查点
+                    self.skipped_spots.append(nearest_spot)
+        
+        return full_path
+    
+    def _plan_route_with_distance_fields(self, unvisited: List[Tuple[int, int]],
+                                         current: Tuple[int, int],
+                                         full_path: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        """
+        基于代价场的巡检路线规划
+        
+        从当前位置扩展代价场直到确定按实际路径代价最近的未访问点，
+        并直接沿代价场提取路径段。代价场按代价从小到大确定检查点，
+        不可达的检查点不会挡住可达的检查点；全部剩余检查点都不可达时
+        将其记入skipped_spots。
+        """
+        while unvisited:
+            field = self.path_planner.compute_distance_field(
+                [current], targets=unvisited, max_targets=1
+            )
+            
+            reachable = [(field.cost_at(x, y), (x, y)) for x, y in unvisited
+                         if not math.isinf(field.cost_at(x, y))]
+            if not reachable:
+                self.skipped_spots.extend(unvisited)
+                break
+            
+            _, nearest_spot = min(reachable)
+            path_segment = field.path_to(nearest_spot[0], nearest_spot[1])
+            
+            # 转换为世界坐标并添加到完整路径
+            world_segment = [self.grid_map.grid_to_world(x, y) for x, y in path_segment[1:]]
+            full_path.extend(world_segment)
+            
+            unvisited.remove(nearest_spot)
+            current = nearest_spot
         
         return full_path
     
@@ -368,21 +928,256 @@ class SpotTreatmentPlanner:
         
         return clusters
 
+class RowGraphPlanner:
+    """
+    基于行拓扑图的路径规划器
+    
+    长距离移动在稀疏的行拓扑图上搜索；只有起点和终点附近的接入段
+    （到拓扑图节点的最初和最后几米）在网格上用局部代价场搜索。
+    拓扑图的边按农田障碍物几何生成后，再用网格地图（含膨胀层）批量视线检测过滤，
+    保证与网格搜索的可通行判断一致。农田障碍物或网格地图变化后下一次规划时自动重建。
+    """
+    
+    def __init__(self, field: AgriculturalField, grid_map: GridMap,
+                 robot_width: float = 0.5, headland_width: float = 2.0,
+                 access_radius: float = 1.5):
+        """
+        初始化行拓扑图规划器
+        
+        Args:
+            field: 农田场景
+            grid_map: 网格地图（机器人轮廓由其膨胀层保证，参见AgriculturalField.to_grid_map）
+            robot_width: 机器人宽度（米）
+            headland_width: 地头宽度（米）
+            access_radius: 接入段搜索半径（米），只有范围内的行段投影点和拓扑图节点作为接入候选
+        """
+        self.field = field
+        self.grid_map = grid_map
+        self.robot_width = robot_width
+        self.headland_width = headland_width
+        self.access_radius = access_radius
+        self.path_planner = PathPlanner(grid_map, cache_size=0)
+        
+        self.graph: Optional[RowGraph] = None
+        self._graph_version = (-1, -1)
+        
+        self.last_path = []
+        self.planning_time = 0.0
+        self.build_time = 0.0
+        self.graph_time = 0.0
+        self.access_time = 0.0
+        self.explored_nodes = 0
+        self.graph_nodes_explored = 0
+        self.access_explored_nodes = 0
+        self.fallback = False
+    
+    def build(self):
+        """构建（或在农田障碍物变化后重建）行拓扑图"""
+        version = (self.field.version, self.grid_map.version)
+        if self.graph is not None and self._graph_version == version:
+            return
+        
+        start_time = time.perf_counter()
+        graph = self.field.build_row_graph(self.robot_width, self.headland_width)
+        
+        edges = graph.edge_list()
+        if edges:
+            grid_map = self.grid_map
+            cells = np.array([grid_map.world_to_grid(x, y) for x, y in graph.nodes])
+            cells[:, 0] = np.clip(cells[:, 0], 0, grid_map.width - 1)
+            cells[:, 1] = np.clip(cells[:, 1], 0, grid_map.height - 1)
+            edges = np.array(edges)
+            graph.keep_edges(self.path_planner.batch_line_of_sight(
+                cells[edges[:, 0]], cells[edges[:, 1]]).tolist())
+        
+        self.graph = graph
+        self._graph_version = version
+        self.build_time = time.perf_counter() - start_time
+    
+    def plan(self, start: Tuple[float, float],
+             goal: Tuple[float, float]) -> Optional[List[Tuple[float, float]]]:
+        """
+        规划从start到goal的路径
+        
+        Args:
+            start: 起点世界坐标
+            goal: 终点世界坐标
+        
+        Returns:
+            世界坐标路径点列表，如果失败返回None
+        """
+        self.build()
+        
+        start_time = time.perf_counter()
+        self.explored_nodes = 0
+        self.graph_nodes_explored = 0
+        self.access_explored_nodes = 0
+        self.fallback = False
+        
+        path = self._plan(start, goal)
+        
+        self.planning_time = time.perf_counter() - start_time
+        self.last_path = path if path else []
+        return path
+    
+    def _plan(self, start: Tuple[float, float],
+              goal: Tuple[float, float]) -> Optional[List[Tuple[float, float]]]:
+        """接入段网格搜索 + 拓扑图搜索，拼接路径"""
+        grid_map = self.grid_map
+        graph = self.graph
+        start_cell = grid_map.world_to_grid(*start)
+        goal_cell = grid_map.world_to_grid(*goal)
+        if not (grid_map.is_valid(*start_cell) and grid_map.is_valid(*goal_cell)):
+            return None
+        
+        access_start = time.perf_counter()
+        start_field, start_entries = self._access(start, start_cell, [goal_cell])
+        goal_field, goal_entries = self._access(goal, goal_cell)
+        self.access_time = time.perf_counter() - access_start
+        
+        # 候选一：起终点接近时的网格直连路径
+        best_cost = start_field.cost_at(*goal_cell) * grid_map.resolution
+        route = None
+        
+        # 候选二：起终点投影在同一行段上时沿行直达
+        for s_entry in start_entries:
+            for g_entry in goal_entries:
+                segment = s_entry[3]
+                if segment is None or segment != g_entry[3]:
+                    continue
+                cost = s_entry[2] + abs(s_entry[0][0] - g_entry[0][0]) + g_entry[2]
+                if cost < best_cost and graph.segment_clear(segment, s_entry[0][0], g_entry[0][0]):
+                    best_cost = cost
+                    route = (s_entry, [], g_entry)
+        
+        # 候选三：经拓扑图
+        sources, targets = {}, {}
+        for entries, links in ((start_entries, sources), (goal_entries, targets)):
+            for entry in entries:
+                for node, distance in entry[4]:
+                    cost = entry[2] + distance
+                    if cost < links.get(node, (math.inf,))[0]:
+                        links[node] = (cost, entry)
+        
+        graph_start = time.perf_counter()
+        _, node_path = graph.shortest_path({node: link[0] for node, link in sources.items()},
+                                           {node: link[0] for node, link in targets.items()},
+                                           best_cost)
+        self.graph_time = time.perf_counter() - graph_start
+        self.graph_nodes_explored = graph.explored_nodes
+        if node_path is not None:
+            route = (sources[node_path[0]][1], node_path, targets[node_path[-1]][1])
+        
+        if route is None:
+            if math.isinf(best_cost):
+                # 拓扑图未覆盖的通行区域（如膨胀后只剩行边缘的通道），退回整图网格搜索
+                self.fallback = True
+                cells, stats = self.path_planner.plan_query(start_cell, goal_cell)
+                self.explored_nodes += stats['explored_nodes']
+                if cells is None:
+                    return None
+                return [start] + [grid_map.grid_to_world(x, y) for x, y in cells[1:-1]] + [goal]
+            cells = start_field.path_to(*goal_cell)
+            return [start] + [grid_map.grid_to_world(x, y) for x, y in cells[1:-1]] + [goal]
+        
+        s_entry, node_path, g_entry = route
+        path = [start]
+        path.extend(grid_map.grid_to_world(x, y) for x, y in start_field.path_to(*s_entry[1])[1:])
+        path.append(s_entry[0])
+        path.extend(graph.nodes[node] for node in node_path)
+        path.append(g_entry[0])
+        path.extend(grid_map.grid_to_world(x, y) for x, y in goal_field.descend(*g_entry[1])[:-1])
+        path.append(goal)
+        
+        # 去掉接入点与节点重合产生的重复点
+        return [point for i, point in enumerate(path) if i == 0 or point != path[i - 1]]
+    
+    def _access(self, point: Tuple[float, float], cell: Tuple[int, int],
+                extra_targets: Optional[List[Tuple[int, int]]] = None):
+        """
+        在网格上搜索point附近的接入段
+        
+        接入点为point在附近行段上的投影点和附近的拓扑图节点，
+        一次局部代价场搜索得到到达全部接入点的代价。
+        
+        Returns:
+            (局部代价场, [(接入点, 接入点单元格, 接入代价（米）, 行段序号或None,
+                          [(相连节点, 沿行段距离)])])
+        """
+        grid_map = self.grid_map
+        graph = self.graph
+        candidates = []
+        for segment, x, y, links in graph.project(point[0], point[1], self.access_radius):
+            if links:
+                candidates.append(((x, y), segment, links))
+        for node in graph.nearest_nodes(point[0], point[1], self.access_radius):
+            candidates.append((graph.nodes[node], None, [(node, 0.0)]))
+        
+        cells = {}
+        for access_point, _, _ in candidates:
+            access_cell = grid_map.world_to_grid(*access_point)
+            if grid_map.is_valid(*access_cell):
+                cells[access_point] = access_cell
+        
+        # 接入点都在access_radius内，搜索范围按接入点确定（允许一定绕行），
+        # 范围外的额外目标视为不可达
+        reach = max((math.hypot(x - cell[0], y - cell[1]) for x, y in cells.values()),
+                    default=0.0)
+        distance_field = self.path_planner.compute_distance_field(
+            [cell], targets=list(cells.values()) + list(extra_targets or []),
+            max_cost=1.5 * reach + 2
+        )
+        self.explored_nodes += self.path_planner.explored_nodes
+        self.access_explored_nodes += self.path_planner.explored_nodes
+        
+        entries = []
+        for access_point, segment, links in candidates:
+            access_cell = cells.get(access_point)
+            if access_cell is None:
+                continue
+            cost = distance_field.cost_at(*access_cell)
+            if not math.isinf(cost):
+                entries.append((access_point, access_cell, cost * grid_map.resolution,
+                                segment, links))
+        return distance_field, entries
+    
+    def get_path_length(self, path: List[Tuple[float, float]]) -> float:
+        """计算路径长度（米）"""
+        return sum(math.hypot(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in zip(path, path[1:]))
+    
+    def get_statistics(self) -> Dict:
+        """获取规划统计信息"""
+        return {
+            'planning_time': self.planning_time,
+            'build_time': self.build_time,
+            'graph_time': self.graph_time,
+            'access_time': self.access_time,
+            'explored_nodes': self.explored_nodes,
+            'graph_nodes_explored': self.graph_nodes_explored,
+            'access_explored_nodes': self.access_explored_nodes,
+            'graph_nodes': len(self.graph.nodes) if self.graph else 0,
+            'fallback': self.fallback,
+            'path_length': self.get_path_length(self.last_path) if self.last_path else 0.0,
+            'path_points': len(self.last_path)
+        }
+
 class AdaptivePathPlanner:
     """自适应路径规划器"""
     
-    def __init__(self, field: AgriculturalField, grid_map: GridMap):
+    def __init__(self, field: AgriculturalField, grid_map: GridMap,
+                 robot_width: float = 0.5):
         """
         初始化自适应规划器
         
         Args:
             field: 农田场景
-            grid_map: 网格地图
+            grid_map: 网格地图（机器人轮廓由其膨胀层保证，参见AgriculturalField.to_grid_map）
+            robot_width: 机器人宽度（米）
         """
         self.field = field
         self.grid_map = grid_map
         self.path_planner = PathPlanner(grid_map)
-        self.coverage_planner = CoveragePathPlanner(field)
+        self.coverage_planner = CoveragePathPlanner(field, robot_width=robot_width)
         self.spot_planner = SpotTreatmentPlanner(field, grid_map)
         
         # 自适应参数
@@ -535,19 +1330,13 @@ if __name__ == "__main__":
     field.add_obstacle(20, 30, 5, 5)  # 灌溉设备
     field.add_obstacle(35, 60, 3, 3)  # 电线杆
     
-    # 创建网格地图
-    grid_map = GridMap(500, 1000, resolution=0.1)  # 50m x 100m, 10cm分辨率
-    
-    # 添加障碍物到网格地图
-    for obstacle in field.obstacles:
-        x1, y1 = int(obstacle['x'] / 0.1), int(obstacle['y'] / 0.1)
-        x2, y2 = int((obstacle['x'] + obstacle['width']) / 0.1), \
-                  int((obstacle['y'] + obstacle['height']) / 0.1)
-        grid_map.set_obstacle_rectangle(x1, y1, x2, y2)
+    # 创建包含障碍物的网格地图 (50m x 100m, 10cm分辨率)，按机器人宽度膨胀障碍物
+    robot_width = 0.5
+    grid_map = field.to_grid_map(resolution=0.1, robot_width=robot_width)
     
     # 测试全覆盖规划
     print("测试全覆盖路径规划:")
-    coverage_planner = CoveragePathPlanner(field)
+    coverage_planner = CoveragePathPlanner(field, robot_width=robot_width)
     coverage_path = coverage_planner.plan_boustrophedon((0.1, 0.1))
     
     print(f"覆盖路径点数: {len(coverage_path)}")
@@ -574,7 +1363,7 @@ if __name__ == "__main__":
     
     # 测试自适应规划
     print("\n测试自适应路径规划:")
-    adaptive_planner = AdaptivePathPlanner(field, grid_map)
+    adaptive_planner = AdaptivePathPlanner(field, grid_map, robot_width=robot_width)
     
     # 混合任务
     hybrid_path = adaptive_planner.plan_adaptive_mission("hybrid", {
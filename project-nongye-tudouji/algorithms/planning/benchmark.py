@@ -0,0 +1,359 @@
+"""
+路径规划基准测试模块
+生成可复现的测试场景（演示地图、随机障碍、迷宫、农田作物行），
+对每种规划算法记录规划时间、探索节点、路径长度和峰值内存，
+输出JSON报告并可与基线报告对比
+
+用法:
+    python -m algorithms.planning.benchmark [报告路径] [基线报告路径]
+"""
+
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Tuple, Dict, Optional
+
+import numpy as np
+
+from .path_planner import GridMap, PathPlanner, PlanningAlgorithm, CellType
+from .agricultural_planner import AgriculturalField
+
+# 与基线对比判定快慢时要求的最少计时重复次数：单次计时混有调度、缓存和
+# 垃圾回收的干扰，取多次中的最小值才稳定，实际抖动见结果中的time_spread
+MIN_COMPARE_REPEATS = 3
+
+
+@dataclass
+class BenchmarkScenario:
+    """基准测试场景"""
+    name: str
+    grid_map: GridMap
+    start: Tuple[int, int]
+    goal: Tuple[int, int]
+
+
+def _random_free_cell(grid_map: GridMap, rng: random.Random,
+                      region: Tuple[int, int, int, int]) -> Tuple[int, int]:
+    """在区域 (x1, y1, x2, y2) 内随机选取一个可通行单元格"""
+    x1, y1, x2, y2 = region
+    for _ in range(10000):
+        x, y = rng.randint(x1, x2), rng.randint(y1, y2)
+        if grid_map.is_valid(x, y):
+            return x, y
+    raise ValueError(f"区域 {region} 内没有可通行单元格")
+
+
+def demo_scenario() -> BenchmarkScenario:
+    """path_planner.py演示程序使用的地图"""
+    grid_map = GridMap(100, 100, resolution=0.1)
+    grid_map.set_obstacle_rectangle(20, 20, 30, 80)
+    grid_map.set_obstacle_rectangle(70, 20, 80, 80)
+    grid_map.set_obstacle_circle(50, 50, 15)
+    return BenchmarkScenario("demo", grid_map, (5, 5), (95, 95))
+
+
+def clutter_scenario(seed: int, width: int = 300, height: int = 300,
+                     obstacle_count: int = 150) -> BenchmarkScenario:
+    """随机分布的矩形和圆形障碍物"""
+    rng = random.Random(seed)
+    grid_map = GridMap(width, height, resolution=0.1)
+    
+    rectangles = []
+    for _ in range(obstacle_count):
+        if rng.random() < 0.7:
+            x, y = rng.randrange(width), rng.randrange(height)
+            rectangles.append((x, y, x + rng.randint(2, 15), y + rng.randint(2, 15)))
+        else:
+            grid_map.set_obstacle_circle(rng.randrange(width), rng.randrange(height),
+                                         rng.randint(2, 8))
+    grid_map.set_obstacle_rectangles(rectangles)
+    
+    start = _random_free_cell(grid_map, rng, (0, 0, width // 10, height // 10))
+    goal = _random_free_cell(grid_map, rng, (width - width // 10, height - height // 10,
+                                             width - 1, height - 1))
+    return BenchmarkScenario(f"clutter_{seed}", grid_map, start, goal)
+
+
+def maze_scenario(seed: int, cells: int = 30, corridor: int = 4) -> BenchmarkScenario:
+    """
+    深度优先生成的完美迷宫
+    
+    Args:
+        seed: 随机种子
+        cells: 每边的迷宫格数
+        corridor: 通道宽度（单元格），墙厚1个单元格
+    """
+    rng = random.Random(seed)
+    pitch = corridor + 1
+    size = cells * pitch + 1
+    grid_map = GridMap(size, size, resolution=0.1)
+    
+    # 先全部设为墙，再挖出通道
+    walls = np.ones((size, size), dtype=bool)
+    visited = np.zeros((cells, cells), dtype=bool)
+    stack = [(0, 0)]
+    visited[0, 0] = True
+    walls[1:1 + corridor, 1:1 + corridor] = False
+    
+    while stack:
+        cx, cy = stack[-1]
+        candidates = [(cx + dx, cy + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                      if 0 <= cx + dx < cells and 0 <= cy + dy < cells
+                      and not visited[cy + dy, cx + dx]]
+        if not candidates:
+            stack.pop()
+            continue
+        
+        nx, ny = rng.choice(candidates)
+        visited[ny, nx] = True
+        x1 = min(cx, nx) * pitch + 1
+        y1 = min(cy, ny) * pitch + 1
+        x2 = max(cx, nx) * pitch + corridor
+        y2 = max(cy, ny) * pitch + corridor
+        walls[y1:y2 + 1, x1:x2 + 1] = False
+        stack.append((nx, ny))
+    
+    grid_map.grid[walls] = CellType.OBSTACLE.value
+    grid_map.rebuild_move_mask()
+    
+    return BenchmarkScenario(f"maze_{seed}", grid_map, (1, 1), (size - 2, size - 2))
+
+
+def field_scenario(seed: int, field_width: float = 30.0, field_height: float = 20.0,
+                   resolution: float = 0.1) -> BenchmarkScenario:
+    """
+    农田作物行布局：行间种植带为障碍物，两端留出地头，
+    种植带上随机留有通道，另随机放置灌溉设备等障碍物
+    """
+    rng = random.Random(seed)
+    field = AgriculturalField(field_width, field_height, row_spacing=0.8)
+    headland = 2.0
+    bed_width = 0.3
+    
+    for row_y in field.row_positions[:-1]:
+        bed_y = row_y + field.row_spacing / 2 - bed_width / 2
+        x = headland
+        while x < field_width - headland:
+            length = min(rng.uniform(4.0, 12.0), field_width - headland - x)
+            field.add_obstacle(x, bed_y, length, bed_width)
+            x += length + rng.uniform(0.6, 1.2)
+    
+    for _ in range(4):
+        field.add_obstacle(rng.uniform(headland, field_width - headland - 1.0),
+                           rng.uniform(0.0, field_height - 1.0),
+                           rng.uniform(0.3, 1.0), rng.uniform(0.3, 1.0))
+    
+    grid_map = field.to_grid_map(resolution=resolution)
+    start = _random_free_cell(grid_map, rng, (0, 0, int(headland / resolution) - 1,
+                                              grid_map.height - 1))
+    goal = _random_free_cell(grid_map, rng, (grid_map.width - int(headland / resolution),
+                                             0, grid_map.width - 1, grid_map.height - 1))
+    return BenchmarkScenario(f"field_{seed}", grid_map, start, goal)
+
+
+def default_scenarios(seed: int = 0) -> List[BenchmarkScenario]:
+    """默认场景集合，相同种子生成完全相同的场景"""
+    return [
+        demo_scenario(),
+        clutter_scenario(seed),
+        clutter_scenario(seed + 1),
+        maze_scenario(seed),
+        field_scenario(seed),
+    ]
+
+
+def run_benchmark(scenarios: List[BenchmarkScenario],
+                  algorithms: Optional[List[PlanningAlgorithm]] = None,
+                  repeats: int = 3, seed: int = 0,
+                  heuristic_method: str = "euclidean",
+                  measure_memory: bool = True) -> List[Dict]:
+    """
+    在每个场景上运行每种算法
+    
+    规划时间取repeats次中的最小值，time_spread记录最慢一次与最快一次之比，
+    反映本次运行的计时抖动；峰值内存在额外一次tracemalloc跟踪的运行中测量，
+    避免跟踪开销影响计时。规划器不启用路径缓存，保证每次都真正执行搜索。
+    
+    Args:
+        scenarios: 测试场景列表
+        algorithms: 待测算法，默认全部
+        repeats: 计时重复次数，要与基线对比时不少于MIN_COMPARE_REPEATS
+        seed: 随机采样算法的随机种子
+        heuristic_method: 启发式函数
+        measure_memory: 是否测量峰值内存（tracemalloc会使纯Python搜索慢数倍）
+    
+    Returns:
+        每个(场景, 算法)组合的结果记录
+    """
+    if algorithms is None:
+        algorithms = list(PlanningAlgorithm)
+    
+    results = []
+    for scenario in scenarios:
+        grid_map = scenario.grid_map
+        grid_map.start_pos = scenario.start
+        grid_map.goal_pos = scenario.goal
+        
+        for algorithm in algorithms:
+            times = []
+            for _ in range(repeats):
+                planner = PathPlanner(grid_map, seed=seed, cache_size=0)
+                path = planner.plan(algorithm, heuristic_method)
+                times.append(planner.planning_time)
+            best_time = min(times)
+            stats = planner.get_statistics()
+            
+            peak = 0
+            if measure_memory:
+                planner = PathPlanner(grid_map, seed=seed, cache_size=0)
+                tracemalloc.start()
+                planner.plan(algorithm, heuristic_method)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            
+            results.append({
+                'scenario': scenario.name,
+                'algorithm': algorithm.value,
+                'map_size': [grid_map.width, grid_map.height],
+                'success': bool(path),
+                'planning_time': best_time,
+                'time_spread': max(times) / max(best_time, 1e-9),
+                'explored_nodes': stats['explored_nodes'],
+                'path_length': stats['path_length'],
+                'path_points': stats['path_points'],
+                'peak_memory_kb': peak / 1024,
+            })
+    
+    return results
+
+
+def build_report(results: List[Dict], seed: int = 0, repeats: int = 3) -> Dict:
+    """生成带运行环境信息的报告"""
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'seed': seed,
+        'repeats': repeats,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def save_report(report: Dict, path: str):
+    """保存JSON报告"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load_report(path: str) -> Dict:
+    """读取JSON报告"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_reports(report: Dict, baseline: Dict, tolerance: float = 0.2,
+                    min_repeats: int = MIN_COMPARE_REPEATS) -> List[Dict]:
+    """
+    与基线报告逐项对比
+    
+    单次计时的抖动常常超过tolerance，只有多次重复取最小值才能与基线比较，
+    因此两份报告的repeats都不少于min_repeats时才标记变快/变慢，否则状态为"noisy"。
+    各项实测的抖动见报告中的time_spread。
+    
+    Args:
+        report: 当前报告
+        baseline: 基线报告
+        tolerance: 相对变化阈值，超过时标记为变快/变慢
+        min_repeats: 判定快慢所需的最少计时重复次数
+    
+    Returns:
+        对比记录，time_ratio/memory_ratio为当前值与基线值之比
+    """
+    # 旧报告没有记录repeats，视为默认值
+    reliable = min(report.get('repeats', 3), baseline.get('repeats', 3)) >= min_repeats
+    baseline_results = {(r['scenario'], r['algorithm']): r for r in baseline['results']}
+    
+    comparisons = []
+    for result in report['results']:
+        key = (result['scenario'], result['algorithm'])
+        base = baseline_results.get(key)
+        if base is None:
+            continue
+        
+        time_ratio = result['planning_time'] / max(base['planning_time'], 1e-9)
+        memory_ratio = result['peak_memory_kb'] / max(base['peak_memory_kb'], 1e-9)
+        if not reliable:
+            status = "noisy"
+        elif time_ratio > 1 + tolerance:
+            status = "slower"
+        elif time_ratio < 1 - tolerance:
+            status = "faster"
+        else:
+            status = "same"
+        
+        comparisons.append({
+            'scenario': key[0],
+            'algorithm': key[1],
+            'time_ratio': time_ratio,
+            'memory_ratio': memory_ratio,
+            'path_length_delta': result['path_length'] - base['path_length'],
+            'success_changed': result['success'] != base['success'],
+            'status': status,
+        })
+    
+    return comparisons
+
+
+def _column_widths(records: List[Dict]) -> Tuple[int, int]:
+    """场景列和算法列的宽度（按最长名称）"""
+    scenario_width = max([len(r['scenario']) for r in records] + [10]) + 2
+    algorithm_width = max([len(r['algorithm']) for r in records] + [10]) + 2
+    return scenario_width, algorithm_width
+
+
+def print_results(results: List[Dict]):
+    """打印结果表格"""
+    sw, aw = _column_widths(results)
+    print(f"{'场景':<{sw}}{'算法':<{aw}}{'成功':<6}{'时间(s)':>10}{'抖动':>8}{'探索节点':>10}"
+          f"{'路径长度':>10}{'峰值内存(KB)':>14}")
+    for r in results:
+        print(f"{r['scenario']:<{sw}}{r['algorithm']:<{aw}}{str(r['success']):<6}"
+              f"{r['planning_time']:>10.4f}{r.get('time_spread', 1.0):>8.2f}"
+              f"{r['explored_nodes']:>10}"
+              f"{r['path_length']:>10.2f}{r['peak_memory_kb']:>14.1f}")
+
+
+def print_comparison(comparisons: List[Dict]):
+    """打印与基线的对比"""
+    sw, aw = _column_widths(comparisons)
+    print(f"{'场景':<{sw}}{'算法':<{aw}}{'时间比':>8}{'内存比':>8}{'路径长度差':>12}  状态")
+    for c in comparisons:
+        flag = " (成功状态变化)" if c['success_changed'] else ""
+        print(f"{c['scenario']:<{sw}}{c['algorithm']:<{aw}}{c['time_ratio']:>8.2f}"
+              f"{c['memory_ratio']:>8.2f}{c['path_length_delta']:>12.2f}  {c['status']}{flag}")
+
+
+if __name__ == "__main__":
+    report_path = sys.argv[1] if len(sys.argv) > 1 else "planning_benchmark.json"
+    baseline_path = sys.argv[2] if len(sys.argv) > 2 else None
+    
+    seed = 0
+    repeats = 3
+    start_time = time.time()
+    results = run_benchmark(default_scenarios(seed), repeats=repeats, seed=seed)
+    print_results(results)
+    print(f"\n总耗时: {time.time() - start_time:.1f}s")
+    
+    report = build_report(results, seed, repeats)
+    save_report(report, report_path)
+    print(f"报告已保存: {report_path}")
+    
+    if baseline_path:
+        print(f"\n与基线 {baseline_path} 对比:")
+        print_comparison(compare_reports(report, load_report(baseline_path)))
@@ -0,0 +1,507 @@
+"""
+分层路径规划模块 (HPA*)
+将大尺度网格地图划分为簇，预计算簇间入口和簇内距离，
+先在小规模抽象图上搜索，再在簇内局部细化路径
+"""
+
+import numpy as np
+import heapq
+import math
+import time
+from typing import List, Tuple, Dict, Optional, Set
+from .path_planner import GridMap, MOVE_DIRECTIONS, MASK_DIRECTIONS_8
+
+# 跨越竖直/水平簇边界的移动方向在移动掩码中的位序号
+RIGHT_BIT = MOVE_DIRECTIONS.index((1, 0))
+DOWN_BIT = MOVE_DIRECTIONS.index((0, 1))
+
+class Cluster:
+    """地图簇"""
+    
+    def __init__(self, cx: int, cy: int, x1: int, y1: int, x2: int, y2: int):
+        """
+        初始化簇
+        
+        Args:
+            cx, cy: 簇在簇网格中的坐标
+            x1, y1, x2, y2: 簇覆盖的单元格范围（包含两端）
+        """
+        self.cx = cx
+        self.cy = cy
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.width = x2 - x1 + 1
+        self.height = y2 - y1 + 1
+        self.local_mask = None   # 去掉越界移动后的局部移动掩码
+        self.nodes: Set[int] = set()   # 簇内的抽象节点（扁平索引）
+        self.edges: Dict[int, List[Tuple[int, float]]] = {}   # 簇内抽象边
+    
+    def contains(self, x: int, y: int) -> bool:
+        """检查单元格是否属于该簇"""
+        return self.x1 <= x <= self.x2 and self.y1 <= y <= self.y2
+
+class HierarchicalPlanner:
+    """
+    分层路径规划器 (HPA*)
+    
+    结果为近似最优路径：跨簇路径必须经过边界入口，短距离跨簇时
+    可能比A*略长。地图变化时只重算受影响的簇及入口发生变化的相邻簇。
+    """
+    
+    def __init__(self, grid_map: GridMap, cluster_size: int = 50,
+                 heuristic_method: str = "diagonal"):
+        """
+        初始化分层规划器
+        
+        Args:
+            grid_map: 网格地图
+            cluster_size: 簇边长（单元格数）
+            heuristic_method: 抽象图搜索使用的启发式函数方法
+        """
+        self.grid_map = grid_map
+        self.cluster_size = cluster_size
+        self.heuristic_method = heuristic_method
+        
+        self.clusters_x = int(math.ceil(grid_map.width / cluster_size))
+        self.clusters_y = int(math.ceil(grid_map.height / cluster_size))
+        self.clusters: List[Cluster] = []
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                x1, y1 = cx * cluster_size, cy * cluster_size
+                x2 = min(grid_map.width, x1 + cluster_size) - 1
+                y2 = min(grid_map.height, y1 + cluster_size) - 1
+                self.clusters.append(Cluster(cx, cy, x1, y1, x2, y2))
+        
+        # 簇边界 -> [(簇内单元格, 相邻簇单元格)]，单元格为扁平索引
+        self.border_entrances: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        # 抽象节点 -> 跨边界相连的节点集合
+        self.inter_edges: Dict[int, Set[int]] = {}
+        # 局部索引移动表缓存，键为簇宽度
+        self._local_moves: Dict[int, List[Tuple[Tuple[int, float], ...]]] = {}
+        
+        self._dirty: Set[int] = set(range(len(self.clusters)))
+        self._built = False
+        
+        self.last_path = []
+        self.planning_time = 0.0
+        self.build_time = 0.0
+        self.explored_nodes = 0
+        self.abstract_nodes_explored = 0
+        
+        grid_map.add_change_listener(self._on_map_changed)
+    
+    def detach(self):
+        """停止监听地图变化"""
+        self.grid_map.remove_change_listener(self._on_map_changed)
+    
+    def _cluster_index(self, x: int, y: int) -> int:
+        """单元格所在簇的编号"""
+        return (y // self.cluster_size) * self.clusters_x + x // self.cluster_size
+    
+    def _on_map_changed(self, x1: int, y1: int, x2: int, y2: int):
+        """标记受影响的簇（变化可能影响相邻单元格的移动，因此外扩一格）"""
+        cs = self.cluster_size
+        cx1 = max(0, (x1 - 1) // cs)
+        cy1 = max(0, (y1 - 1) // cs)
+        cx2 = min(self.clusters_x - 1, (x2 + 1) // cs)
+        cy2 = min(self.clusters_y - 1, (y2 + 1) // cs)
+        for cy in range(cy1, cy2 + 1):
+            for cx in range(cx1, cx2 + 1):
+                self._dirty.add(cy * self.clusters_x + cx)
+    
+    def build(self):
+        """预计算（或增量更新）入口节点和簇内距离"""
+        if not self._dirty:
+            return
+        
+        start_time = time.perf_counter()
+        dirty = self._dirty
+        self._dirty = set()
+        
+        for c in dirty:
+            self._update_local_mask(self.clusters[c])
+        
+        # 重新检测与脏簇相邻的全部边界，入口变化的相邻簇也需重算簇内边
+        recompute = set(dirty)
+        borders = set()
+        for c in dirty:
+            cluster = self.clusters[c]
+            if cluster.cx > 0:
+                borders.add((c - 1, c))
+            if cluster.cx < self.clusters_x - 1:
+                borders.add((c, c + 1))
+            if cluster.cy > 0:
+                borders.add((c - self.clusters_x, c))
+            if cluster.cy < self.clusters_y - 1:
+                borders.add((c, c + self.clusters_x))
+        
+        for border in borders:
+            if self._update_border(border):
+                recompute.update(border)
+        
+        for c in recompute:
+            cluster = self.clusters[c]
+            if cluster.local_mask is None:
+                self._update_local_mask(cluster)
+            self._rebuild_cluster_nodes(c)
+            self._compute_intra_edges(cluster)
+        
+        self._built = True
+        self.build_time = time.perf_counter() - start_time
+    
+    def _update_local_mask(self, cluster: Cluster):
+        """截取簇内移动掩码并去掉离开簇的移动"""
+        mask = self.grid_map.move_mask[cluster.y1:cluster.y2 + 1,
+                                       cluster.x1:cluster.x2 + 1].copy()
+        for bit, (dx, dy) in enumerate(MOVE_DIRECTIONS):
+            clear = np.uint8(0xFF ^ (1 << bit))
+            if dx < 0:
+                mask[:, 0] &= clear
+            elif dx > 0:
+                mask[:, -1] &= clear
+            if dy < 0:
+                mask[0, :] &= clear
+            elif dy > 0:
+                mask[-1, :] &= clear
+        cluster.local_mask = mask.ravel()
+    
+    def _update_border(self, border: Tuple[int, int]) -> bool:
+        """重新检测一条簇边界上的入口，返回入口是否发生变化"""
+        a, b = border
+        cluster_a = self.clusters[a]
+        width = self.grid_map.width
+        move_mask = self.grid_map.move_mask
+        
+        # 障碍物单元格也保留指向可通行邻居的移动位，入口两侧单元格都必须可通行
+        if b == a + 1:
+            # 竖直边界：cluster_a右列与cluster_b左列
+            x = cluster_a.x2
+            cells = [(x, y) for y in range(cluster_a.y1, cluster_a.y2 + 1)]
+            free = self.grid_map._free_region(x, cluster_a.y1, x + 1, cluster_a.y2)
+            crossable = ((move_mask[cluster_a.y1:cluster_a.y2 + 1, x] & (1 << RIGHT_BIT) != 0)
+                         & free[:, 0] & free[:, 1])
+            step = 1
+        else:
+            # 水平边界：cluster_a下行与cluster_b上行
+            y = cluster_a.y2
+            cells = [(x, y) for x in range(cluster_a.x1, cluster_a.x2 + 1)]
+            free = self.grid_map._free_region(cluster_a.x1, y, cluster_a.x2, y + 1)
+            crossable = ((move_mask[y, cluster_a.x1:cluster_a.x2 + 1] & (1 << DOWN_BIT) != 0)
+                         & free[0] & free[1])
+            step = width
+        
+        # 连续可跨越段：短段取中点，长段取两端
+        entrances = []
+        run_start = None
+        for i in range(len(cells) + 1):
+            open_cell = i < len(cells) and crossable[i]
+            if open_cell and run_start is None:
+                run_start = i
+            elif not open_cell and run_start is not None:
+                run_end = i - 1
+                if run_end - run_start + 1 < 6:
+                    picks = [(run_start + run_end) // 2]
+                else:
+                    picks = [run_start, run_end]
+                for p in picks:
+                    cx, cy = cells[p]
+                    idx = cy * width + cx
+                    entrances.append((idx, idx + step))
+                run_start = None
+        
+        old = self.border_entrances.get(border, [])
+        if old == entrances:
+            return False
+        
+        for u, v in old:
+            self.inter_edges.get(u, set()).discard(v)
+            self.inter_edges.get(v, set()).discard(u)
+        for u, v in entrances:
+            self.inter_edges.setdefault(u, set()).add(v)
+            self.inter_edges.setdefault(v, set()).add(u)
+        self.border_entrances[border] = entrances
+        return True
+    
+    def _rebuild_cluster_nodes(self, c: int):
+        """根据相邻边界的入口重建簇内抽象节点集合"""
+        cluster = self.clusters[c]
+        nodes = set()
+        for border in ((c - 1, c), (c, c + 1),
+                       (c - self.clusters_x, c), (c, c + self.clusters_x)):
+            for u, v in self.border_entrances.get(border, ()):
+                nodes.add(u if border[0] == c else v)
+        cluster.nodes = nodes
+    
+    def _local_index_moves(self, local_width: int):
+        """簇宽度对应的局部 (索引偏移, 移动代价) 表"""
+        moves = self._local_moves.get(local_width)
+        if moves is None:
+            diagonal_cost = self.grid_map.diagonal_cost
+            moves = [
+                tuple((dy * local_width + dx, diagonal_cost if dx and dy else 1.0)
+                      for dx, dy in directions)
+                for directions in MASK_DIRECTIONS_8
+            ]
+            self._local_moves[local_width] = moves
+        return moves
+    
+    def _to_local(self, cluster: Cluster, idx: int) -> int:
+        """全局扁平索引转簇内局部索引"""
+        y, x = divmod(idx, self.grid_map.width)
+        return (y - cluster.y1) * cluster.width + (x - cluster.x1)
+    
+    def _to_global(self, cluster: Cluster, local_idx: int) -> int:
+        """簇内局部索引转全局扁平索引"""
+        y, x = divmod(local_idx, cluster.width)
+        return (y + cluster.y1) * self.grid_map.width + (x + cluster.x1)
+    
+    def _cluster_dijkstra(self, cluster: Cluster, source: int,
+                          targets: Set[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        限制在簇内的Dijkstra搜索
+        
+        Args:
+            cluster: 簇
+            source: 起点（全局扁平索引）
+            targets: 目标集合（全局扁平索引），全部确定后提前结束
+        
+        Returns:
+            (局部g值数组, 局部父节点数组)
+        """
+        size = cluster.width * cluster.height
+        g_score = np.full(size, np.inf)
+        parent = np.full(size, -1, dtype=np.int64)
+        closed = np.zeros(size, dtype=bool)
+        local_mask = cluster.local_mask
+        index_moves = self._local_index_moves(cluster.width)
+        
+        remaining = {self._to_local(cluster, t) for t in targets}
+        start = self._to_local(cluster, source)
+        g_score[start] = 0.0
+        open_heap = [(0.0, start)]
+        
+        while open_heap:
+            current_g, idx = heapq.heappop(open_heap)
+            if closed[idx]:
+                continue
+            closed[idx] = True
+            self.explored_nodes += 1
+            
+            remaining.discard(idx)
+            if not remaining:
+                break
+            
+            for offset, move_cost in index_moves[local_mask[idx]]:
+                n_idx = idx + offset
+                if closed[n_idx]:
+                    continue
+                tentative_g = current_g + move_cost
+                if tentative_g < g_score[n_idx]:
+                    g_score[n_idx] = tentative_g
+                    parent[n_idx] = idx
+                    heapq.heappush(open_heap, (tentative_g, n_idx))
+        
+        return g_score, parent
+    
+    def _compute_intra_edges(self, cluster: Cluster):
+        """计算簇内抽象节点两两之间的最短距离"""
+        edges = {node: [] for node in cluster.nodes}
+        nodes = sorted(cluster.nodes)
+        
+        for i, node in enumerate(nodes):
+            others = set(nodes[i + 1:])
+            if not others:
+                break
+            g_score, _ = self._cluster_dijkstra(cluster, node, others)
+            for other in others:
+                cost = g_score[self._to_local(cluster, other)]
+                if not np.isinf(cost):
+                    edges[node].append((other, float(cost)))
+                    edges[other].append((node, float(cost)))
+        
+        cluster.edges = edges
+    
+    def _cluster_path(self, cluster: Cluster, source: int,
+                      target: int) -> Optional[List[int]]:
+        """簇内两点之间的最短路径（全局扁平索引）"""
+        g_score, parent = self._cluster_dijkstra(cluster, source, {target})
+        local = self._to_local(cluster, target)
+        if np.isinf(g_score[local]):
+            return None
+        
+        path = []
+        while local >= 0:
+            path.append(self._to_global(cluster, local))
+            local = int(parent[local])
+        return path[::-1]
+    
+    def _connect_temporary(self, idx: int) -> Dict[int, float]:
+        """把起点/终点临时连接到所在簇的抽象节点"""
+        cluster = self.clusters[self._cluster_index(*self._xy(idx))]
+        if not cluster.nodes:
+            return {}
+        g_score, _ = self._cluster_dijkstra(cluster, idx, set(cluster.nodes))
+        links = {}
+        for node in cluster.nodes:
+            cost = g_score[self._to_local(cluster, node)]
+            if not np.isinf(cost):
+                links[node] = float(cost)
+        return links
+    
+    def _xy(self, idx: int) -> Tuple[int, int]:
+        """扁平索引转网格坐标"""
+        y, x = divmod(idx, self.grid_map.width)
+        return x, y
+    
+    def plan(self, start: Tuple[int, int],
+             goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        分层路径规划
+        
+        Args:
+            start: 起点网格坐标
+            goal: 终点网格坐标
+        
+        Returns:
+            逐格路径点列表，如果失败返回None
+        """
+        self.build()
+        
+        start_time = time.perf_counter()
+        self.explored_nodes = 0
+        self.abstract_nodes_explored = 0
+        
+        path = self._plan(start, goal)
+        
+        self.planning_time = time.perf_counter() - start_time
+        self.last_path = path if path else []
+        return path
+    
+    def _plan(self, start: Tuple[int, int],
+              goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """插入起终点、搜索抽象图并细化路径"""
+        grid_map = self.grid_map
+        if not (grid_map.is_valid(*start) and grid_map.is_valid(*goal)):
+            return None
+        
+        width = grid_map.width
+        start_idx = start[1] * width + start[0]
+        goal_idx = goal[1] * width + goal[0]
+        if start_idx == goal_idx:
+            return [start]
+        
+        start_links = self._connect_temporary(start_idx)
+        goal_links = self._connect_temporary(goal_idx)
+        
+        # 起终点位于同一簇时，簇内直连路径也是候选
+        start_cluster = self._cluster_index(*start)
+        direct_cost = math.inf
+        if start_cluster == self._cluster_index(*goal):
+            cluster = self.clusters[start_cluster]
+            g_score, _ = self._cluster_dijkstra(cluster, start_idx, {goal_idx})
+            direct_cost = float(g_score[self._to_local(cluster, goal_idx)])
+        
+        abstract_path = self._search_abstract(start_idx, goal_idx, start_links,
+                                              goal_links, direct_cost)
+        if abstract_path is None:
+            return None
+        
+        return self._refine(abstract_path)
+    
+    def _search_abstract(self, start_idx: int, goal_idx: int,
+                         start_links: Dict[int, float], goal_links: Dict[int, float],
+                         direct_cost: float) -> Optional[List[int]]:
+        """在抽象图上执行A*"""
+        grid_map = self.grid_map
+        goal_x, goal_y = self._xy(goal_idx)
+        
+        def h(idx: int) -> float:
+            x, y = self._xy(idx)
+            return grid_map.heuristic(x, y, goal_x, goal_y, self.heuristic_method)
+        
+        def neighbors(idx: int):
+            # 起点本身也可能是入口节点，此时还要继续展开它的抽象边
+            if idx == start_idx:
+                yield from start_links.items()
+                if not math.isinf(direct_cost):
+                    yield goal_idx, direct_cost
+            cluster = self.clusters[self._cluster_index(*self._xy(idx))]
+            yield from cluster.edges.get(idx, ())
+            for other in self.inter_edges.get(idx, ()):
+                yield other, 1.0
+            if idx in goal_links:
+                yield goal_idx, goal_links[idx]
+        
+        g_score = {start_idx: 0.0}
+        parents = {start_idx: -1}
+        closed = set()
+        open_heap = [(h(start_idx), start_idx)]
+        
+        while open_heap:
+            _, idx = heapq.heappop(open_heap)
+            if idx in closed:
+                continue
+            closed.add(idx)
+            self.abstract_nodes_explored += 1
+            
+            if idx == goal_idx:
+                path = []
+                while idx >= 0:
+                    path.append(idx)
+                    idx = parents[idx]
+                return path[::-1]
+            
+            current_g = g_score[idx]
+            for other, cost in neighbors(idx):
+                if other in closed:
+                    continue
+                tentative_g = current_g + cost
+                if tentative_g < g_score.get(other, math.inf):
+                    g_score[other] = tentative_g
+                    parents[other] = idx
+                    heapq.heappush(open_heap, (tentative_g + h(other), other))
+        
+        return None
+    
+    def _refine(self, abstract_path: List[int]) -> Optional[List[Tuple[int, int]]]:
+        """把抽象路径细化为逐格路径"""
+        path = [abstract_path[0]]
+        
+        for u, v in zip(abstract_path, abstract_path[1:]):
+            if v in self.inter_edges.get(u, ()):
+                path.append(v)
+                continue
+            cluster = self.clusters[self._cluster_index(*self._xy(u))]
+            segment = self._cluster_path(cluster, u, v)
+            if segment is None:
+                return None
+            path.extend(segment[1:])
+        
+        return [self._xy(idx) for idx in path]
+    
+    def get_path_length(self, path: List[Tuple[int, int]]) -> float:
+        """计算路径长度"""
+        if len(path) < 2:
+            return 0.0
+        
+        total_length = 0.0
+        for i in range(1, len(path)):
+            x1, y1 = path[i-1]
+            x2, y2 = path[i]
+            total_length += math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        
+        return total_length * self.grid_map.resolution
+    
+    def get_statistics(self) -> Dict:
+        """获取规划统计信息"""
+        return {
+            'planning_time': self.planning_time,
+            'build_time': self.build_time,
+            'explored_nodes': self.explored_nodes,
+            'abstract_nodes_explored': self.abstract_nodes_explored,
+            'abstract_nodes': sum(len(c.nodes) for c in self.clusters),
+            'path_length': self.get_path_length(self.last_path) if self.last_path else 0.0,
+            'path_points': len(self.last_path) if self.last_path else 0
+        }
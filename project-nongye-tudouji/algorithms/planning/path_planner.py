@@ -5,11 +5,18 @@
 
 import numpy as np
 import heapq
+import json
+import os
 import math
 import random
-from typing import List, Tuple, Dict, Optional, Set
+from typing import List, Tuple, Dict, Optional
 from enum import Enum
 import time
+import multiprocessing
+import threading
+import contextlib
+from multiprocessing import shared_memory
+from collections import OrderedDict
 from dataclasses import dataclass
 import matplotlib.pyplot as plt
 import cv2
@@ -22,6 +29,11 @@ class PlanningAlgorithm(Enum):
     RRT_STAR = "rrt_star"          # RRT*算法
     THETA_STAR = "theta_star"       # Theta*算法
     D_STAR = "d_star"              # D*算法
+    ARA_STAR = "ara_star"          # ARA*任意时间算法
+    JPS = "jps"                    # 跳点搜索
+    BIDIRECTIONAL_ASTAR = "bidirectional_astar"        # 双向A*（不保证比A*扩展少）
+    BIDIRECTIONAL_DIJKSTRA = "bidirectional_dijkstra"  # 双向Dijkstra
+    STATE_LATTICE = "state_lattice"                    # 差速底盘状态栅格
 
 class CellType(Enum):
     """地图单元格类型"""
@@ -33,33 +45,53 @@ class CellType(Enum):
     VISITED = 5        # 已访问
     EXPLORED = 6       # 已探索
 
-@dataclass
-class Node:
-    """路径节点"""
-    x: int
-    y: int
-    g_cost: float = 0.0      # 从起点到当前节点的实际代价
-    h_cost: float = 0.0      # 从当前节点到终点的启发式代价
-    f_cost: float = 0.0      # f = g + h
-    parent: Optional['Node'] = None
-    theta: float = 0.0       # 朝向角度（用于Theta*）
-    
-    def __lt__(self, other):
-        """堆排序比较"""
-        return self.f_cost < other.f_cost
-    
-    def __eq__(self, other):
-        """节点相等比较"""
-        return self.x == other.x and self.y == other.y
-    
-    def __hash__(self):
-        """节点哈希值"""
-        return hash((self.x, self.y))
+# 8连通移动方向，顺序即移动掩码中的位序号
+MOVE_DIRECTIONS = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1),           (0, 1),
+    (1, -1),  (1, 0),  (1, 1)
+)
+
+# 掩码值 -> 允许的移动方向列表
+MASK_DIRECTIONS_8 = [
+    tuple(d for bit, d in enumerate(MOVE_DIRECTIONS) if mask & (1 << bit))
+    for mask in range(256)
+]
+# 掩码值 -> 允许的移动方向数
+MASK_POPCOUNT = np.array([len(d) for d in MASK_DIRECTIONS_8], dtype=np.int64)
+MASK_DIRECTIONS_4 = [
+    tuple(d for d in directions if d[0] == 0 or d[1] == 0)
+    for directions in MASK_DIRECTIONS_8
+]
+
+# 渲染图层，按优先级从低到高排列，降采样时每块取优先级最高的图层
+RENDER_FREE, RENDER_VISITED, RENDER_EXPLORED, RENDER_INFLATED, \
+    RENDER_OBSTACLE, RENDER_PATH, RENDER_START, RENDER_GOAL = range(8)
+
+# 图层 -> RGB颜色查找表
+RENDER_COLORS = np.array([
+    [255, 255, 255],   # 自由空间: 白色
+    [200, 200, 200],   # 已访问: 浅灰色
+    [150, 150, 150],   # 已探索: 灰色
+    [255, 220, 180],   # 膨胀区域: 浅橙色
+    [0, 0, 0],         # 障碍物: 黑色
+    [0, 0, 255],       # 路径: 蓝色
+    [0, 255, 0],       # 起点: 绿色
+    [255, 0, 0],       # 终点: 红色
+], dtype=np.uint8)
+
+# 单元格取值 -> 渲染图层，未定义的取值按障碍物显示
+GRID_RENDER_LAYERS = np.full(256, RENDER_OBSTACLE, dtype=np.uint8)
+GRID_RENDER_LAYERS[[c.value for c in CellType]] = [
+    RENDER_FREE, RENDER_OBSTACLE, RENDER_START, RENDER_GOAL,
+    RENDER_PATH, RENDER_VISITED, RENDER_EXPLORED
+]
 
 class GridMap:
     """网格地图类"""
     
-    def __init__(self, width: int, height: int, resolution: float = 0.1):
+    def __init__(self, width: int, height: int, resolution: float = 0.1,
+                 storage: Optional[np.ndarray] = None):
         """
         初始化网格地图
         
@@ -67,11 +99,22 @@ class GridMap:
             width: 地图宽度（单元格数）
             height: 地图高度（单元格数）
             resolution: 分辨率（米/单元格）
+            storage: 可选的(2, height, width) uint8存储数组，第0层为单元格类型，
+                     第1层为移动掩码（例如load()返回的内存映射文件），提供时不重建掩码
         """
         self.width = width
         self.height = height
         self.resolution = resolution
-        self.grid = np.zeros((height, width), dtype=int)
+        
+        # 单元格类型与移动掩码共用一块uint8存储，便于整体保存和内存映射
+        build_mask = storage is None
+        if build_mask:
+            storage = np.zeros((2, height, width), dtype=np.uint8)
+        elif storage.shape != (2, height, width) or storage.dtype != np.uint8:
+            raise ValueError(f"存储数组应为(2, {height}, {width})的uint8数组，"
+                             f"实际为{storage.shape} {storage.dtype}")
+        self._storage = storage
+        self.grid = storage[0]
         self.start_pos = None
         self.goal_pos = None
         
@@ -89,24 +132,284 @@ class GridMap:
         
         # 对角线移动代价
         self.diagonal_cost = math.sqrt(2)
+        
+        # 地图版本号，每次障碍物变化时递增，用于判断缓存结果是否过期
+        self.version = 0
+        
+        # 障碍物变化监听器，回调参数为变化区域 (x1, y1, x2, y2)
+        self._change_listeners = []
+        
+        # 最近一次生成的只读快照，版本未变时复用
+        self._snapshot: Optional['GridMap'] = None
+        
+        # ALT路标及其距离表 (路标数, 单元格数)，地图版本与landmark_version不同时失效
+        self.landmarks: List[Tuple[int, int]] = []
+        self.landmark_distances: Optional[np.ndarray] = None
+        self.landmark_version = -1
+        
+        # 分层代价地图（参见CostMap）；快照中代之以固定的合成代价数组
+        self.costmap: Optional['CostMap'] = None
+        self._frozen_cost: Optional[np.ndarray] = None
+        
+        # 配置空间膨胀：机器人半径（单元格）与饱和的净空距离场，未启用时为None
+        self.inflation_cells = 0.0
+        self.clearance_limit = 0.0
+        self.clearance: Optional[np.ndarray] = None
+        
+        # 每个单元格的8位允许移动掩码，第k位对应MOVE_DIRECTIONS[k]
+        self.move_mask = storage[1]
+        
+        # 掩码值 -> [(扁平索引偏移, 移动代价)]，供基于数组的搜索直接使用
+        self.index_moves = [
+            tuple((dy * width + dx, self.diagonal_cost if dx and dy else 1.0)
+                  for dx, dy in directions)
+            for directions in MASK_DIRECTIONS_8
+        ]
+        
+        if build_mask:
+            self.rebuild_move_mask()
     
     def set_obstacle(self, x: int, y: int):
         """设置障碍物"""
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.grid[y, x] = CellType.OBSTACLE.value
+            if self.grid[y, x] != CellType.OBSTACLE.value:
+                self.grid[y, x] = CellType.OBSTACLE.value
+                self._cells_changed(x, y, x, y)
+    
+    def clear_obstacle(self, x: int, y: int):
+        """清除障碍物"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            if self.grid[y, x] == CellType.OBSTACLE.value:
+                self.grid[y, x] = CellType.FREE.value
+                self._cells_changed(x, y, x, y)
+    
+    def add_change_listener(self, callback):
+        """注册障碍物变化监听器，callback(x1, y1, x2, y2)"""
+        self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback):
+        """注销障碍物变化监听器"""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def rebuild_move_mask(self):
+        """重建整张地图的移动掩码（直接修改grid后需调用）"""
+        if self.clearance is not None:
+            self._update_clearance(0, 0, self.width - 1, self.height - 1)
+        self._update_move_mask(0, 0, self.width - 1, self.height - 1)
+        self.version += 1
+        for callback in self._change_listeners:
+            callback(0, 0, self.width - 1, self.height - 1)
+    
+    def _cells_changed(self, x1: int, y1: int, x2: int, y2: int):
+        """通知矩形区域内的障碍物状态发生变化"""
+        if self.clearance is not None:
+            # 净空距离只在变化区域周围clearance_limit范围内改变，膨胀状态随之变化
+            margin = int(math.ceil(self.clearance_limit))
+            x1, y1 = max(0, x1 - margin), max(0, y1 - margin)
+            x2 = min(self.width - 1, x2 + margin)
+            y2 = min(self.height - 1, y2 + margin)
+            self._update_clearance(x1, y1, x2, y2)
+        
+        # 单元格的变化只影响其3x3邻域内单元格的移动掩码
+        self._update_move_mask(x1 - 1, y1 - 1, x2 + 1, y2 + 1)
+        self.version += 1
+        for callback in self._change_listeners:
+            callback(x1, y1, x2, y2)
+    
+    def set_inflation_radius(self, radius: float, clearance_limit: Optional[float] = None):
+        """
+        设置机器人半径并构建配置空间膨胀层
+        
+        距障碍物过近、机器人轮廓会与障碍物单元格重叠的单元格被视为不可通行，
+        搜索只需查一次移动掩码即可保证轮廓安全。之后障碍物变化时只在受影响窗口内增量更新。
+        
+        Args:
+            radius: 机器人半径（米），小于等于0时关闭膨胀
+            clearance_limit: 净空距离场的饱和上限（米），默认刚好覆盖膨胀判断所需范围，
+                             需要更远的净空信息（如代价衰减）时可调大，代价是增量更新窗口变大
+        """
+        self._configure_inflation(radius, clearance_limit)
+        self.rebuild_move_mask()
+    
+    def _configure_inflation(self, radius: float, clearance_limit: Optional[float]):
+        """设置膨胀参数并分配净空距离场（不重建移动掩码）"""
+        if radius <= 0:
+            self.inflation_cells = 0.0
+            self.clearance_limit = 0.0
+            self.clearance = None
+            return
+        
+        self.inflation_cells = radius / self.resolution
+        limit = self.inflation_cells + 1.0
+        if clearance_limit is not None:
+            limit = max(limit, clearance_limit / self.resolution)
+        self.clearance_limit = limit
+        self.clearance = np.empty((self.height, self.width), dtype=np.float32)
+    
+    def _update_clearance(self, x1: int, y1: int, x2: int, y2: int):
+        """用距离变换重新计算窗口内的净空距离（单元格，饱和于clearance_limit）"""
+        # 窗口内单元格的饱和距离只取决于向外margin范围内的障碍物
+        margin = int(math.ceil(self.clearance_limit))
+        # 地图边界不算障碍物，农田边缘允许机器人轮廓越出网格
+        free = ~self._obstacle_region(x1 - margin, y1 - margin, x2 + margin, y2 + margin,
+                                      outside=False)
+        dist = cv2.distanceTransform(free.astype(np.uint8), cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+        np.minimum(dist[margin:margin + y2 - y1 + 1, margin:margin + x2 - x1 + 1],
+                   self.clearance_limit, out=self.clearance[y1:y2 + 1, x1:x2 + 1])
+    
+    def _obstacle_region(self, x1: int, y1: int, x2: int, y2: int,
+                         outside: bool = True) -> np.ndarray:
+        """
+        获取区域 [x1, x2] x [y1, y2] 的障碍物布尔数组（不含膨胀）
+        
+        区域可以超出地图边界，地图外的单元格取值为outside。
+        """
+        obstacle = np.full((y2 - y1 + 1, x2 - x1 + 1), outside, dtype=bool)
+        cx1, cy1 = max(0, x1), max(0, y1)
+        cx2, cy2 = min(self.width - 1, x2), min(self.height - 1, y2)
+        if cx1 <= cx2 and cy1 <= cy2:
+            obstacle[cy1 - y1:cy2 - y1 + 1, cx1 - x1:cx2 - x1 + 1] = (
+                self.grid[cy1:cy2 + 1, cx1:cx2 + 1] == CellType.OBSTACLE.value
+            )
+        return obstacle
+    
+    def _free_region(self, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+        """
+        获取区域 [x1, x2] x [y1, y2] 的可通行布尔数组
+        
+        区域可以超出地图边界，地图外的单元格、障碍物及其膨胀区域都不可通行。
+        """
+        free = ~self._obstacle_region(x1, y1, x2, y2)
+        if self.clearance is not None:
+            cx1, cy1 = max(0, x1), max(0, y1)
+            cx2, cy2 = min(self.width - 1, x2), min(self.height - 1, y2)
+            if cx1 <= cx2 and cy1 <= cy2:
+                # 轮廓与障碍物单元格重叠：中心距离减去半个单元格小于机器人半径
+                free[cy1 - y1:cy2 - y1 + 1, cx1 - x1:cx2 - x1 + 1] &= (
+                    self.clearance[cy1:cy2 + 1, cx1:cx2 + 1] >= self.inflation_cells + 0.5
+                )
+        return free
+    
+    def blocked_cells(self) -> np.ndarray:
+        """整张地图的不可通行布尔数组 (height, width)，包含膨胀区域"""
+        return ~self._free_region(0, 0, self.width - 1, self.height - 1)
+    
+    def _update_move_mask(self, x1: int, y1: int, x2: int, y2: int):
+        """用向量化平移重新计算窗口内的移动掩码"""
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(self.width - 1, x2), min(self.height - 1, y2)
+        if x1 > x2 or y1 > y2:
+            return
+        
+        h, w = y2 - y1 + 1, x2 - x1 + 1
+        free = self._free_region(x1 - 1, y1 - 1, x2 + 1, y2 + 1)
+        mask = np.zeros((h, w), dtype=np.uint8)
+        
+        for bit, (dx, dy) in enumerate(MOVE_DIRECTIONS):
+            allowed = free[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+            if dx and dy:
+                # 对角线移动不能穿越两侧的障碍物
+                allowed = (allowed &
+                           free[1:1 + h, 1 + dx:1 + dx + w] &
+                           free[1 + dy:1 + dy + h, 1:1 + w])
+            mask |= allowed.astype(np.uint8) << bit
+        
+        self.move_mask[y1:y2 + 1, x1:x2 + 1] = mask
     
     def set_obstacle_rectangle(self, x1: int, y1: int, x2: int, y2: int):
-        """设置矩形障碍物"""
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            for y in range(min(y1, y2), max(y1, y2) + 1):
-                self.set_obstacle(x, y)
+        """设置矩形障碍物（包含两个角点）"""
+        x1, x2 = max(0, min(x1, x2)), min(self.width - 1, max(x1, x2))
+        y1, y2 = max(0, min(y1, y2)), min(self.height - 1, max(y1, y2))
+        if x1 > x2 or y1 > y2:
+            return
+        
+        self.grid[y1:y2 + 1, x1:x2 + 1] = CellType.OBSTACLE.value
+        self._cells_changed(x1, y1, x2, y2)
+    
+    def set_obstacle_rectangles(self, rectangles):
+        """
+        批量设置矩形障碍物
+        
+        Args:
+            rectangles: 形如 [(x1, y1, x2, y2), ...] 的矩形列表或 N x 4 数组
+        """
+        for x1, y1, x2, y2 in np.asarray(rectangles, dtype=int).reshape(-1, 4):
+            self.set_obstacle_rectangle(int(x1), int(y1), int(x2), int(y2))
     
     def set_obstacle_circle(self, cx: int, cy: int, radius: int):
         """设置圆形障碍物"""
-        for x in range(max(0, cx - radius), min(self.width, cx + radius + 1)):
-            for y in range(max(0, cy - radius), min(self.height, cy + radius + 1)):
-                if (x - cx) ** 2 + (y - cy) ** 2 <= radius ** 2:
-                    self.set_obstacle(x, y)
+        x1, x2 = max(0, cx - radius), min(self.width - 1, cx + radius)
+        y1, y2 = max(0, cy - radius), min(self.height - 1, cy + radius)
+        if x1 > x2 or y1 > y2:
+            return
+        
+        ys, xs = np.ogrid[y1:y2 + 1, x1:x2 + 1]
+        mask = (xs - cx) ** 2 + (ys - cy) ** 2 <= radius ** 2
+        self._apply_obstacle_mask(x1, y1, mask)
+    
+    def set_obstacle_polygon(self, points: List[Tuple[int, int]]):
+        """
+        设置多边形障碍物
+        
+        Args:
+            points: 多边形顶点网格坐标列表
+        """
+        pts = np.asarray(points, dtype=np.int32).reshape(-1, 2)
+        if len(pts) == 0:
+            return
+        
+        region = self._clip_bounds(pts, 0)
+        if region is None:
+            return
+        x1, y1, x2, y2 = region
+        
+        mask = np.zeros((y2 - y1 + 1, x2 - x1 + 1), dtype=np.uint8)
+        cv2.fillPoly(mask, [pts - np.array([x1, y1], dtype=np.int32)], 1)
+        self._apply_obstacle_mask(x1, y1, mask.astype(bool))
+    
+    def set_obstacle_polyline(self, points: List[Tuple[int, int]], thickness: int = 1):
+        """
+        设置折线障碍物（如灌溉管线、围栏）
+        
+        Args:
+            points: 折线顶点网格坐标列表
+            thickness: 线宽（单元格数）
+        """
+        pts = np.asarray(points, dtype=np.int32).reshape(-1, 2)
+        if len(pts) == 0:
+            return
+        
+        thickness = max(1, int(thickness))
+        region = self._clip_bounds(pts, thickness)
+        if region is None:
+            return
+        x1, y1, x2, y2 = region
+        
+        mask = np.zeros((y2 - y1 + 1, x2 - x1 + 1), dtype=np.uint8)
+        cv2.polylines(mask, [pts - np.array([x1, y1], dtype=np.int32)],
+                      False, 1, thickness)
+        self._apply_obstacle_mask(x1, y1, mask.astype(bool))
+    
+    def _clip_bounds(self, pts: np.ndarray,
+                     margin: int) -> Optional[Tuple[int, int, int, int]]:
+        """计算点集外扩margin后与地图相交的包围盒"""
+        x1 = max(0, int(pts[:, 0].min()) - margin)
+        y1 = max(0, int(pts[:, 1].min()) - margin)
+        x2 = min(self.width - 1, int(pts[:, 0].max()) + margin)
+        y2 = min(self.height - 1, int(pts[:, 1].max()) + margin)
+        if x1 > x2 or y1 > y2:
+            return None
+        return x1, y1, x2, y2
+    
+    def _apply_obstacle_mask(self, x1: int, y1: int, mask: np.ndarray):
+        """将以 (x1, y1) 为左上角的布尔掩码区域标记为障碍物"""
+        if not mask.any():
+            return
+        
+        h, w = mask.shape
+        self.grid[y1:y1 + h, x1:x1 + w][mask] = CellType.OBSTACLE.value
+        self._cells_changed(x1, y1, x1 + w - 1, y1 + h - 1)
     
     def is_obstacle(self, x: int, y: int) -> bool:
         """检查是否为障碍物"""
@@ -115,23 +418,30 @@ class GridMap:
         return self.grid[y, x] == CellType.OBSTACLE.value
     
     def is_valid(self, x: int, y: int) -> bool:
-        """检查坐标是否有效且无障碍"""
-        return not self.is_obstacle(x, y)
+        """检查坐标是否有效且无障碍（启用膨胀时还要求机器人轮廓安全）"""
+        if self.is_obstacle(x, y):
+            return False
+        if self.clearance is not None:
+            return self.clearance[y, x] >= self.inflation_cells + 0.5
+        return True
     
     def set_start(self, x: int, y: int):
         """设置起点"""
         if self.is_valid(x, y):
             self.start_pos = (x, y)
-            self.grid[y, x] = CellType.START.value
     
     def set_goal(self, x: int, y: int):
         """设置终点"""
         if self.is_valid(x, y):
             self.goal_pos = (x, y)
-            self.grid[y, x] = CellType.GOAL.value
     
     def get_neighbors(self, x: int, y: int, diagonal: bool = True) -> List[Tuple[int, int]]:
         """获取邻居节点"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            table = MASK_DIRECTIONS_8 if diagonal else MASK_DIRECTIONS_4
+            return [(x + dx, y + dy) for dx, dy in table[self.move_mask[y, x]]]
+        
+        # 地图外的坐标逐个方向检查
         directions = self.directions_8 if diagonal else self.directions_4
         neighbors = []
         
@@ -159,9 +469,138 @@ class GridMap:
             return math.sqrt(dx * dx + dy * dy)
         elif method == "diagonal":
             return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+        elif method == "alt":
+            bound = max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+            if self.landmarks_current():
+                table = self.landmark_distances
+                d1 = table[:, y1 * self.width + x1]
+                d2 = table[:, y2 * self.width + x2]
+                usable = np.isfinite(d2)
+                if usable.any():
+                    bound = max(bound, float(np.abs(d1[usable] - d2[usable]).max()))
+            return bound
         else:
             return math.sqrt(dx * dx + dy * dy)
     
+    def build_landmarks(self, count: int = 8, seed: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        预计算ALT（A*、路标、三角不等式）启发式的路标距离表
+        
+        路标按最远点策略选取：每次取到已选路标最短路径距离最大的可通行单元格，
+        尚未被任何路标覆盖的连通区域优先。每个路标做一次全图Dijkstra，
+        大地图上需要数秒，适合地图长期不变而查询很多的场景。地图变化后距离表自动失效，
+        需重新调用本方法。
+        
+        Args:
+            count: 路标数量
+            seed: 选取第一个路标时的随机种子
+        
+        Returns:
+            路标网格坐标列表
+        """
+        free = np.flatnonzero(~self.blocked_cells().ravel())
+        self.landmarks = []
+        self.landmark_distances = None
+        # 路标不改变地图版本，已缓存的快照仍带着旧的路标表，需丢弃
+        self._snapshot = None
+        if len(free) == 0 or count <= 0:
+            return self.landmarks
+        
+        planner = PathPlanner(self, cache_size=0)
+        
+        def distances_from(idx: int) -> np.ndarray:
+            y, x = divmod(int(idx), self.width)
+            return planner.compute_distance_field([(x, y)]).cost.ravel()
+        
+        # 从随机单元格出发找到的最远点作为第一个路标
+        rng = random.Random(seed)
+        nearest = distances_from(free[rng.randrange(len(free))])
+        tables = []
+        
+        for _ in range(count):
+            score = nearest[free]
+            best = int(np.argmax(score))
+            if score[best] <= 0:
+                break
+            
+            distances = distances_from(free[best])
+            y, x = divmod(int(free[best]), self.width)
+            self.landmarks.append((x, y))
+            tables.append(distances.astype(np.float32))
+            nearest = distances if len(tables) == 1 else np.minimum(nearest, distances)
+        
+        self.landmark_distances = np.stack(tables)
+        self.landmark_distances.flags.writeable = False
+        self.landmark_version = self.version
+        return self.landmarks
+    
+    def landmarks_current(self) -> bool:
+        """路标距离表是否存在且对应当前地图版本"""
+        return self.landmark_distances is not None and self.landmark_version == self.version
+    
+    def cost_array(self) -> Optional[np.ndarray]:
+        """
+        单元格代价系数 (height, width)，未使用代价地图时为None
+        
+        从u移动到v的代价为 移动距离 * (cost[u] + cost[v]) / 2，系数不小于1，
+        因此几何启发式仍然可采纳。
+        """
+        if self.costmap is not None:
+            return self.costmap.composed()
+        return self._frozen_cost
+    
+    def heuristic_table(self, target: Tuple[int, int], method: str = "euclidean") -> np.ndarray:
+        """
+        整张地图各单元格到target的启发式值
+        
+        与heuristic()逐点计算的结果一致；"alt"在路标表失效时退化为对角距离。
+        
+        Returns:
+            扁平float64数组
+        """
+        if method == "alt":
+            table = self.landmark_heuristic(target)
+            if table is not None:
+                return table.astype(np.float64)
+            method = "diagonal"
+        
+        target_x, target_y = target
+        dx = np.abs(np.arange(self.width, dtype=np.float64) - target_x)[None, :]
+        dy = np.abs(np.arange(self.height, dtype=np.float64) - target_y)[:, None]
+        if method == "manhattan":
+            table = dx + dy
+        elif method == "diagonal":
+            table = np.maximum(dx, dy) + (math.sqrt(2) - 1) * np.minimum(dx, dy)
+        else:
+            table = np.sqrt(dx * dx + dy * dy)
+        return table.ravel()
+    
+    def landmark_heuristic(self, goal: Tuple[int, int]) -> Optional[np.ndarray]:
+        """
+        整张地图到goal的ALT下界
+        
+        对每个路标L，|d(L, goal) - d(L, v)| 是d(v, goal)的下界；取全部路标的最大值，
+        再与对角距离取较大值。与终点不连通的单元格为inf。
+        
+        Returns:
+            扁平float32数组，路标表不存在或已失效时返回None
+        """
+        if not self.landmarks_current():
+            return None
+        
+        goal_x, goal_y = goal
+        dx = np.abs(np.arange(self.width, dtype=np.float32) - goal_x)[None, :]
+        dy = np.abs(np.arange(self.height, dtype=np.float32) - goal_y)[:, None]
+        bound = (np.maximum(dx, dy) + np.float32(math.sqrt(2) - 1) * np.minimum(dx, dy)).ravel()
+        
+        table = self.landmark_distances
+        to_goal = table[:, goal_y * self.width + goal_x]
+        # 终点不可达的路标不提供信息
+        usable = np.isfinite(to_goal)
+        for row, goal_distance in zip(table[usable], to_goal[usable]):
+            np.maximum(bound, np.abs(row - goal_distance), out=bound)
+        return bound
+    
     def distance(self, x1: int, y1: int, x2: int, y2: int) -> float:
         """计算两点间距离"""
         dx = abs(x2 - x1)
@@ -184,261 +623,1899 @@ class GridMap:
         world_y = (grid_y + 0.5) * self.resolution
         return world_x, world_y
     
-    def visualize(self, path: List[Tuple[int, int]] = None, title: str = "Grid Map"):
-        """可视化地图"""
-        vis_grid = self.grid.copy()
+    def snapshot(self) -> 'GridMap':
+        """
+        获取当前版本的只读快照
         
-        # 绘制路径
-        if path:
-            for x, y in path:
-                if vis_grid[y, x] == CellType.FREE.value:
-                    vis_grid[y, x] = CellType.PATH.value
-        
-        # 创建颜色映射
-        color_map = {
-            CellType.FREE.value: [255, 255, 255],      # 白色
-            CellType.OBSTACLE.value: [0, 0, 0],        # 黑色
-            CellType.START.value: [0, 255, 0],          # 绿色
-            CellType.GOAL.value: [255, 0, 0],          # 红色
-            CellType.PATH.value: [0, 0, 255],          # 蓝色
-            CellType.VISITED.value: [200, 200, 200],    # 浅灰色
-            CellType.EXPLORED.value: [150, 150, 150]   # 灰色
-        }
+        快照复制网格、移动掩码和净空距离场并设为只读，之后对本地图的修改不影响快照，
+        可在多个线程中同时用于搜索。地图版本不变时返回同一个快照；只读地图直接返回自身。
+        """
+        if self.read_only:
+            return self
+        
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        
+        storage = self._storage.copy()
+        storage.flags.writeable = False
+        snapshot = GridMap(self.width, self.height, self.resolution, storage=storage)
+        snapshot.version = self.version
+        if self.clearance is not None:
+            snapshot.inflation_cells = self.inflation_cells
+            snapshot.clearance_limit = self.clearance_limit
+            snapshot.clearance = self.clearance.copy()
+            snapshot.clearance.flags.writeable = False
+        if self.landmarks_current():
+            # 距离表构建后只读，快照直接共享
+            snapshot.landmarks = self.landmarks
+            snapshot.landmark_distances = self.landmark_distances
+            snapshot.landmark_version = snapshot.version
+        cost = self.cost_array()
+        if cost is not None:
+            snapshot._frozen_cost = cost.copy()
+            snapshot._frozen_cost.flags.writeable = False
+        
+        self._snapshot = snapshot
+        return snapshot
+    
+    @property
+    def nbytes(self) -> int:
+        """网格与移动掩码占用的字节数"""
+        return self._storage.nbytes
+    
+    @property
+    def read_only(self) -> bool:
+        """地图是否为只读（例如以只读方式映射的文件）"""
+        return not self._storage.flags.writeable
+    
+    def save(self, path: str, packed: bool = False):
+        """
+        保存地图
+        
+        Args:
+            path: 文件路径。packed=False时写入.npy文件（含移动掩码，可用load()直接内存映射），
+                  并在path + '.json'中记录尺寸和分辨率；packed=True时写入.npz文件
+            packed: 是否按位压缩，只保存障碍物占据信息（每个单元格1位），加载时重建掩码
+        """
+        if packed:
+            np.savez_compressed(path,
+                                occupancy=self.pack_occupancy(),
+                                shape=np.array([self.height, self.width]),
+                                resolution=np.array(self.resolution),
+                                inflation=np.array([self.inflation_cells, self.clearance_limit])
+                                * self.resolution)
+            return
+        
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8,
+                                        shape=self._storage.shape)
+        out[:] = self._storage
+        out.flush()
+        del out
         
-        # 转换为彩色图像
-        color_image = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-        for y in range(self.height):
-            for x in range(self.width):
-                cell_value = vis_grid[y, x]
-                if cell_value in color_map:
-                    color_image[y, x] = color_map[cell_value]
+        with open(path + '.json', 'w', encoding='utf-8') as f:
+            json.dump({'width': self.width, 'height': self.height,
+                       'resolution': self.resolution,
+                       'inflation_radius': self.inflation_cells * self.resolution,
+                       'clearance_limit': self.clearance_limit * self.resolution}, f)
+    
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'GridMap':
+        """
+        加载save()保存的地图
+        
+        Args:
+            path: 文件路径，.npz按位压缩格式，其余按.npy格式处理
+            mmap_mode: .npy文件的内存映射模式，'r'为只读共享（多个进程映射同一文件时不复制到内存），
+                       'r+'为可写回文件，'c'为写时复制，None为完整读入内存
+        
+        Returns:
+            网格地图
+        """
+        if path.endswith('.npz'):
+            with np.load(path) as data:
+                height, width = (int(v) for v in data['shape'])
+                grid_map = cls.from_packed(data['occupancy'], width, height,
+                                           float(data['resolution']))
+                radius, limit = (float(v) for v in data['inflation'])
+            if radius > 0:
+                grid_map.set_inflation_radius(radius, limit)
+            return grid_map
+        
+        storage = np.load(path, mmap_mode=mmap_mode)
+        _, height, width = storage.shape
+        meta = {}
+        meta_path = path + '.json'
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        
+        grid_map = cls(width, height, meta.get('resolution', 0.1), storage=storage)
+        
+        # 保存的移动掩码已包含膨胀，只需恢复净空距离场，不写入（可能只读的）存储
+        radius = meta.get('inflation_radius', 0.0)
+        if radius > 0:
+            grid_map._configure_inflation(radius, meta.get('clearance_limit'))
+            grid_map._update_clearance(0, 0, width - 1, height - 1)
+        return grid_map
+    
+    def pack_occupancy(self) -> np.ndarray:
+        """将障碍物占据信息按位压缩为一维uint8数组（每个单元格1位）"""
+        return np.packbits(self.grid == CellType.OBSTACLE.value, axis=None)
+    
+    @classmethod
+    def from_packed(cls, packed: np.ndarray, width: int, height: int,
+                    resolution: float = 0.1) -> 'GridMap':
+        """由pack_occupancy()的结果重建地图"""
+        occupancy = np.unpackbits(packed, count=width * height).reshape(height, width)
+        grid_map = cls(width, height, resolution)
+        grid_map.grid[occupancy.astype(bool)] = CellType.OBSTACLE.value
+        grid_map.rebuild_move_mask()
+        return grid_map
+    
+    def render(self, path: Optional[List[Tuple[int, int]]] = None, downsample: int = 1,
+               region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        渲染地图为RGB图像，不依赖图形界面
+        
+        单元格先映射为渲染图层序号，再经颜色查找表一次转换为图像；路径用数组索引一次写入。
+        降采样时每个 downsample x downsample 块取优先级最高的图层，细路径和小障碍物不会丢失。
+        
+        Args:
+            path: 路径点列表，也可以是带朝向的位姿序列 [(x, y, theta)]
+            downsample: 降采样倍数
+            region: 渲染区域 (x1, y1, x2, y2)（含边界），默认整张地图
+        
+        Returns:
+            (行, 列, 3) 的uint8图像，第0行对应y=0
+        """
+        x1, y1, x2, y2 = region if region is not None else (0, 0, self.width - 1, self.height - 1)
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(self.width - 1, x2), min(self.height - 1, y2)
+        
+        layers = GRID_RENDER_LAYERS[self.grid[y1:y2 + 1, x1:x2 + 1]]
+        if self.clearance is not None:
+            layers[(layers == RENDER_FREE) & ~self._free_region(x1, y1, x2, y2)] = RENDER_INFLATED
+        
+        if path is not None and len(path):
+            points = np.floor(np.asarray(path, dtype=float)[:, :2] + 0.5).astype(np.int64)
+            xs, ys = points[:, 0] - x1, points[:, 1] - y1
+            inside = (xs >= 0) & (ys >= 0) & (xs <= x2 - x1) & (ys <= y2 - y1)
+            xs, ys = xs[inside], ys[inside]
+            # 与原绘制方式一致，路径不覆盖障碍物
+            on_free = layers[ys, xs] < RENDER_OBSTACLE
+            layers[ys[on_free], xs[on_free]] = RENDER_PATH
+        
+        # 起点和终点只在渲染结果中标记，不写入地图
+        for pos, layer in ((self.start_pos, RENDER_START), (self.goal_pos, RENDER_GOAL)):
+            if pos and x1 <= pos[0] <= x2 and y1 <= pos[1] <= y2:
+                layers[pos[1] - y1, pos[0] - x1] = layer
+        
+        if downsample > 1:
+            h, w = layers.shape
+            out_h, out_w = math.ceil(h / downsample), math.ceil(w / downsample)
+            padded = np.zeros((out_h * downsample, out_w * downsample), dtype=np.uint8)
+            padded[:h, :w] = layers
+            layers = padded.reshape(out_h, downsample, out_w, downsample).max(axis=(1, 3))
+        
+        return RENDER_COLORS[layers]
+    
+    def render_png(self, path: Optional[List[Tuple[int, int]]] = None, downsample: int = 1,
+                   region: Optional[Tuple[int, int, int, int]] = None) -> bytes:
+        """渲染地图并编码为PNG字节串，参数同render()"""
+        image = self.render(path, downsample, region)
+        ok, buffer = cv2.imencode('.png', cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+        if not ok:
+            raise ValueError("PNG编码失败")
+        return buffer.tobytes()
+    
+    def render_tiles(self, tile_size: int = 256, downsample: int = 1,
+                     path: Optional[List[Tuple[int, int]]] = None) -> Dict[Tuple[int, int], bytes]:
+        """
+        按瓦片渲染整张地图为PNG，用于分块预览
+        
+        Args:
+            tile_size: 瓦片边长（输出像素）
+            downsample: 降采样倍数，每个瓦片覆盖 tile_size * downsample 个单元格
+            path: 路径点列表
+        
+        Returns:
+            {(瓦片列号, 瓦片行号): PNG字节串}
+        """
+        cells = tile_size * downsample
+        if path is not None and len(path):
+            path = np.asarray(path, dtype=float)
         
+        tiles = {}
+        for ty in range(math.ceil(self.height / cells)):
+            for tx in range(math.ceil(self.width / cells)):
+                region = (tx * cells, ty * cells, (tx + 1) * cells - 1, (ty + 1) * cells - 1)
+                tiles[(tx, ty)] = self.render_png(path, downsample, region)
+        return tiles
+    
+    def visualize(self, path: List[Tuple[int, int]] = None, title: str = "Grid Map"):
+        """可视化地图（需要图形界面，无界面环境请使用render_png）"""
         plt.figure(figsize=(10, 10))
-        plt.imshow(color_image)
+        plt.imshow(self.render(path))
         plt.title(title)
         plt.axis('off')
         plt.show()
 
-class PathPlanner:
-    """路径规划器"""
+class CostMap:
+    """
+    分层代价地图
+    
+    每层是与地图同尺寸的float32数组（如static静态代价、detections检测结果、
+    soil_moisture土壤湿度、inflation障碍物膨胀衰减），按层权重合成为一张
+    代价系数数组：cost = 1 + sum(weight * layer)，负的贡献按0计。
+    合成结果按瓦片缓存，某层变化时只重新合成受影响的瓦片。
+    基于数组的搜索（A*、Dijkstra、双向搜索、ARA*、代价场）直接读取合成数组；
+    JPS、Theta*、RRT和D* Lite仍按均匀代价规划。
+    """
     
-    def __init__(self, grid_map: GridMap):
+    def __init__(self, grid_map: GridMap, tile_size: int = 64):
         """
-        初始化路径规划器
+        创建代价地图并挂接到网格地图
         
         Args:
             grid_map: 网格地图
+            tile_size: 合成缓存的瓦片边长（单元格）
         """
         self.grid_map = grid_map
-        self.last_path = []
-        self.planning_time = 0.0
-        self.explored_nodes = 0
+        self.tile_size = tile_size
+        self.layers: Dict[str, np.ndarray] = OrderedDict()
+        self.weights: Dict[str, float] = {}
         
-    def plan(self, algorithm: PlanningAlgorithm, 
-             heuristic_method: str = "euclidean") -> Optional[List[Tuple[int, int]]]:
+        self.cost = np.ones((grid_map.height, grid_map.width), dtype=np.float32)
+        self._dirty = np.zeros((math.ceil(grid_map.height / tile_size),
+                                math.ceil(grid_map.width / tile_size)), dtype=bool)
+        self.recomposed_tiles = 0
+        
+        # 膨胀层参数 (最大代价, 每米衰减率)，设置后随障碍物变化自动更新
+        self._inflation_params: Optional[Tuple[float, float]] = None
+        
+        grid_map.costmap = self
+        grid_map.add_change_listener(self._on_map_changed)
+    
+    def detach(self):
+        """从网格地图上移除代价地图"""
+        self.grid_map.remove_change_listener(self._on_map_changed)
+        if self.grid_map.costmap is self:
+            self.grid_map.costmap = None
+            self.grid_map.version += 1
+    
+    def add_layer(self, name: str, weight: float = 1.0,
+                  data: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        执行路径规划
+        添加（或替换）代价层
         
         Args:
-            algorithm: 规划算法
-            heuristic_method: 启发式函数方法
+            name: 层名称
+            weight: 合成权重
+            data: 初始数据 (height, width)，默认全0
         
         Returns:
-            路径点列表，如果失败返回None
+            层数组，直接修改后需调用mark_dirty
         """
-        start_time = time.time()
+        shape = (self.grid_map.height, self.grid_map.width)
+        if data is None:
+            layer = np.zeros(shape, dtype=np.float32)
+        else:
+            layer = np.array(data, dtype=np.float32)
+            if layer.shape != shape:
+                raise ValueError(f"代价层尺寸应为{shape}，实际为{layer.shape}")
         
-        if not self.grid_map.start_pos or not self.grid_map.goal_pos:
-            print("错误: 未设置起点或终点")
-            return None
+        self.layers[name] = layer
+        self.weights[name] = weight
+        self.mark_dirty(0, 0, self.grid_map.width - 1, self.grid_map.height - 1)
+        return layer
+    
+    def remove_layer(self, name: str):
+        """删除代价层"""
+        if name in self.layers:
+            del self.layers[name]
+            del self.weights[name]
+            if name == "inflation":
+                self._inflation_params = None
+            self.mark_dirty(0, 0, self.grid_map.width - 1, self.grid_map.height - 1)
+    
+    def set_weight(self, name: str, weight: float):
+        """修改代价层权重"""
+        self.weights[name] = weight
+        self.mark_dirty(0, 0, self.grid_map.width - 1, self.grid_map.height - 1)
+    
+    def update_layer(self, name: str, values: np.ndarray, x: int = 0, y: int = 0):
+        """
+        写入代价层的矩形区域，层不存在时自动创建
         
-        path = None
+        Args:
+            name: 层名称
+            values: 区域数据 (h, w)，超出地图的部分被裁掉
+            x, y: 区域左上角网格坐标
+        """
+        if name not in self.layers:
+            self.add_layer(name)
         
-        if algorithm == PlanningAlgorithm.ASTAR:
-            path = self._astar(heuristic_method)
-        elif algorithm == PlanningAlgorithm.DIJKSTRA:
-            path = self._dijkstra()
-        elif algorithm == PlanningAlgorithm.RRT:
-            path = self._rrt()
-        elif algorithm == PlanningAlgorithm.RRT_STAR:
-            path = self._rrt_star()
-        elif algorithm == PlanningAlgorithm.THETA_STAR:
-            path = self._theta_star(heuristic_method)
-        else:
-            print(f"错误: 未知算法 {algorithm}")
-            return None
+        values = np.asarray(values, dtype=np.float32)
+        h, w = values.shape
+        x1, y1 = max(0, x), max(0, y)
+        x2 = min(self.grid_map.width - 1, x + w - 1)
+        y2 = min(self.grid_map.height - 1, y + h - 1)
+        if x1 > x2 or y1 > y2:
+            return
         
-        self.planning_time = time.time() - start_time
-        self.last_path = path if path else []
+        self.layers[name][y1:y2 + 1, x1:x2 + 1] = values[y1 - y:y2 - y + 1, x1 - x:x2 - x + 1]
+        self.mark_dirty(x1, y1, x2, y2)
+    
+    def mark_dirty(self, x1: int, y1: int, x2: int, y2: int):
+        """标记区域内的瓦片需要重新合成（直接修改层数组后调用）"""
+        ts = self.tile_size
+        self._dirty[max(0, y1) // ts:max(0, y2) // ts + 1,
+                    max(0, x1) // ts:max(0, x2) // ts + 1] = True
+        # 代价变化同样使路径缓存、快照和路标表失效
+        self.grid_map.version += 1
+    
+    def set_inflation_costs(self, max_cost: float = 10.0, decay: float = 2.0,
+                            weight: float = 1.0):
+        """
+        由地图的净空距离场生成inflation层，障碍物变化时自动增量更新
         
-        return path
+        轮廓边缘紧贴障碍物时代价为max_cost，并随离开的距离（米）按exp(-decay * d)衰减，
+        净空距离超过地图clearance_limit的单元格为0。需先调用GridMap.set_inflation_radius。
+        """
+        if self.grid_map.clearance is None:
+            raise ValueError("需先调用GridMap.set_inflation_radius构建净空距离场")
+        
+        self._inflation_params = (max_cost, decay)
+        layer = self.layers.get("inflation")
+        if layer is None:
+            layer = self.add_layer("inflation", weight)
+        else:
+            self.weights["inflation"] = weight
+        self._update_inflation(0, 0, self.grid_map.width - 1, self.grid_map.height - 1)
     
-    def _astar(self, heuristic_method: str) -> Optional[List[Tuple[int, int]]]:
-        """A*算法"""
-        start_x, start_y = self.grid_map.start_pos
-        goal_x, goal_y = self.grid_map.goal_pos
+    def _update_inflation(self, x1: int, y1: int, x2: int, y2: int):
+        """重新计算窗口内的膨胀代价"""
+        grid_map = self.grid_map
+        max_cost, decay = self._inflation_params
+        clearance = grid_map.clearance[y1:y2 + 1, x1:x2 + 1]
         
-        # 初始化起点和终点节点
-        start_node = Node(start_x, start_y)
-        goal_node = Node(goal_x, goal_y)
+        margin = np.maximum(clearance - (grid_map.inflation_cells + 0.5), 0) * grid_map.resolution
+        values = (max_cost * np.exp(-decay * margin)).astype(np.float32)
+        values[clearance >= grid_map.clearance_limit] = 0
+        self.layers["inflation"][y1:y2 + 1, x1:x2 + 1] = values
+        self.mark_dirty(x1, y1, x2, y2)
+    
+    def _on_map_changed(self, x1: int, y1: int, x2: int, y2: int):
+        """障碍物变化时更新膨胀层（窗口已包含净空距离的影响范围）"""
+        if self._inflation_params is None:
+            return
+        if self.grid_map.clearance is None:
+            self.remove_layer("inflation")
+            return
+        self._update_inflation(max(0, x1), max(0, y1),
+                               min(self.grid_map.width - 1, x2),
+                               min(self.grid_map.height - 1, y2))
+    
+    def composed(self) -> np.ndarray:
+        """返回合成后的代价系数数组，只重新合成脏瓦片"""
+        if not self._dirty.any():
+            return self.cost
         
-        # 开放列表和关闭列表
-        open_list = []
-        closed_set: Set[Node] = set()
+        ts = self.tile_size
+        for ty, tx in zip(*np.nonzero(self._dirty)):
+            window = (slice(ty * ts, (ty + 1) * ts), slice(tx * ts, (tx + 1) * ts))
+            total = np.zeros(self.cost[window].shape, dtype=np.float32)
+            for name, layer in self.layers.items():
+                total += np.float32(self.weights[name]) * layer[window]
+            np.maximum(total, 0, out=total)
+            self.cost[window] = total + 1
         
-        # 将起点加入开放列表
-        start_node.h_cost = self.grid_map.heuristic(
-            start_x, start_y, goal_x, goal_y, heuristic_method
-        )
-        start_node.f_cost = start_node.g_cost + start_node.h_cost
-        heapq.heappush(open_list, start_node)
+        self.recomposed_tiles += int(self._dirty.sum())
+        self._dirty[:] = False
+        return self.cost
+
+class SpatialHash:
+    """
+    网格桶空间索引
+    
+    将点按 cell_size 大小的桶分组，支持增量插入、最近邻查询和半径查询，
+    用于RRT/RRT*树节点的检索。
+    """
+    
+    def __init__(self, cell_size: float):
+        """
+        初始化空间索引
         
-        self.explored_nodes = 0
+        Args:
+            cell_size: 桶边长（单元格数）
+        """
+        self.cell_size = max(float(cell_size), 1e-6)
+        self.buckets: Dict[Tuple[int, int], List[int]] = {}
+        self.xs: List[float] = []
+        self.ys: List[float] = []
+        # 已占用桶坐标的范围，用于限制最近邻搜索的外扩圈数
+        self.min_bucket = None
+        self.max_bucket = None
+    
+    def __len__(self) -> int:
+        return len(self.xs)
+    
+    def _bucket(self, x: float, y: float) -> Tuple[int, int]:
+        """计算点所在的桶坐标"""
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+    
+    def insert(self, x: float, y: float) -> int:
+        """插入点，返回点编号"""
+        point_id = len(self.xs)
+        self.xs.append(x)
+        self.ys.append(y)
         
-        while open_list:
-            # 取出f代价最小的节点
-            current_node = heapq.heappop(open_list)
-            self.explored_nodes += 1
-            
-            # 到达终点
-            if current_node.x == goal_x and current_node.y == goal_y:
-                return self._reconstruct_path(current_node)
-            
-            # 加入关闭列表
-            closed_set.add(current_node)
-            
-            # 探索邻居
-            for nx, ny in self.grid_map.get_neighbors(current_node.x, current_node.y):
-                neighbor = Node(nx, ny)
-                
-                if neighbor in closed_set:
-                    continue
-                
-                # 计算代价
-                move_cost = self.grid_map.distance(
-                    current_node.x, current_node.y, nx, ny
-                )
-                tentative_g = current_node.g_cost + move_cost
-                
-                # 检查是否已在开放列表中
-                existing_node = None
-                for node in open_list:
-                    if node.x == nx and node.y == ny:
-                        existing_node = node
-                        break
-                
-                if existing_node is None:
-                    # 新节点
-                    neighbor.g_cost = tentative_g
-                    neighbor.h_cost = self.grid_map.heuristic(
-                        nx, ny, goal_x, goal_y, heuristic_method
-                    )
-                    neighbor.f_cost = neighbor.g_cost + neighbor.h_cost
-                    neighbor.parent = current_node
-                    heapq.heappush(open_list, neighbor)
-                elif tentative_g < existing_node.g_cost:
-                    # 更新现有节点
-                    existing_node.g_cost = tentative_g
-                    existing_node.f_cost = existing_node.g_cost + existing_node.h_cost
-                    existing_node.parent = current_node
-        
-        return None  # 未找到路径
-    
-    def _dijkstra(self) -> Optional[List[Tuple[int, int]]]:
-        """Dijkstra算法"""
-        start_x, start_y = self.grid_map.start_pos
-        goal_x, goal_y = self.grid_map.goal_pos
+        bx, by = self._bucket(x, y)
+        self.buckets.setdefault((bx, by), []).append(point_id)
         
-        # 初始化距离字典
-        distances = {}
-        distances[(start_x, start_y)] = 0
+        if self.min_bucket is None:
+            self.min_bucket = [bx, by]
+            self.max_bucket = [bx, by]
+        else:
+            self.min_bucket = [min(self.min_bucket[0], bx), min(self.min_bucket[1], by)]
+            self.max_bucket = [max(self.max_bucket[0], bx), max(self.max_bucket[1], by)]
         
-        # 优先队列 (distance, x, y, parent)
-        priority_queue = [(0, start_x, start_y, None)]
+        return point_id
+    
+    def nearest(self, x: float, y: float) -> Optional[int]:
+        """查询最近点编号，索引为空时返回None"""
+        if not self.xs:
+            return None
         
-        # 父节点字典
-        parents = {}
+        bx, by = self._bucket(x, y)
+        max_ring = max(abs(bx - self.min_bucket[0]), abs(bx - self.max_bucket[0]),
+                       abs(by - self.min_bucket[1]), abs(by - self.max_bucket[1]))
         
-        self.explored_nodes = 0
+        best_id = None
+        best_dist_sq = float('inf')
         
-        while priority_queue:
-            current_dist, x, y, parent = heapq.heappop(priority_queue)
-            self.explored_nodes += 1
-            
-            # 到达终点
-            if x == goal_x and y == goal_y:
-                return self._reconstruct_path_from_parents(parents, (x, y))
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(bx, by, ring):
+                for point_id in self.buckets.get(cell, ()):
+                    dist_sq = (self.xs[point_id] - x) ** 2 + (self.ys[point_id] - y) ** 2
+                    if dist_sq < best_dist_sq:
+                        best_dist_sq = dist_sq
+                        best_id = point_id
             
-            # 如果找到更短的路径，跳过
-            if (x, y) in distances and current_dist > distances[(x, y)]:
-                continue
-            
-            # 记录父节点
-            parents[(x, y)] = parent
-            
-            # 探索邻居
-            for nx, ny in self.grid_map.get_neighbors(x, y):
-                if (nx, ny) not in distances:
-                    move_cost = self.grid_map.distance(x, y, nx, ny)
-                    new_dist = current_dist + move_cost
-                    distances[(nx, ny)] = new_dist
-                    heapq.heappush(priority_queue, (new_dist, nx, ny, (x, y)))
-                else:
-                    move_cost = self.grid_map.distance(x, y, nx, ny)
-                    new_dist = current_dist + move_cost
-                    if new_dist < distances[(nx, ny)]:
-                        distances[(nx, ny)] = new_dist
-                        heapq.heappush(priority_queue, (new_dist, nx, ny, (x, y)))
+            # 第ring+1圈中的点距查询点至少为 ring * cell_size
+            if best_id is not None and best_dist_sq <= (ring * self.cell_size) ** 2:
+                break
         
-        return None
+        return best_id
     
-    def _rrt(self, max_iterations: int = 5000, step_size: int = 10) -> Optional[List[Tuple[int, int]]]:
-        """RRT算法"""
-        start_x, start_y = self.grid_map.start_pos
-        goal_x, goal_y = self.grid_map.goal_pos
+    def within(self, x: float, y: float, radius: float) -> List[int]:
+        """查询距离不超过radius的全部点编号"""
+        bx1, by1 = self._bucket(x - radius, y - radius)
+        bx2, by2 = self._bucket(x + radius, y + radius)
+        radius_sq = radius * radius
         
-        # 树节点
-        tree = [(start_x, start_y)]
-        parents = {(start_x, start_y): None}
+        result = []
+        for bx in range(bx1, bx2 + 1):
+            for by in range(by1, by2 + 1):
+                for point_id in self.buckets.get((bx, by), ()):
+                    if (self.xs[point_id] - x) ** 2 + (self.ys[point_id] - y) ** 2 <= radius_sq:
+                        result.append(point_id)
         
-        self.explored_nodes = 0
+        return result
+    
+    @staticmethod
+    def _ring_cells(bx: int, by: int, ring: int):
+        """生成与中心桶切比雪夫距离为ring的桶坐标"""
+        if ring == 0:
+            yield bx, by
+            return
         
-        for _ in range(max_iterations):
-            self.explored_nodes += 1
-            
-            # 随机采样点
-            if random.random() < 0.1:  # 10%概率直接采样目标点
-                random_x, random_y = goal_x, goal_y
-            else:
-                random_x = random.randint(0, self.grid_map.width - 1)
-                random_y = random.randint(0, self.grid_map.height - 1)
-            
-            # 找到最近的树节点
-            nearest_dist = float('inf')
-            nearest_node = None
+        for dx in range(-ring, ring + 1):
+            yield bx + dx, by - ring
+            yield bx + dx, by + ring
+        for dy in range(-ring + 1, ring):
+            yield bx - ring, by + dy
+            yield bx + ring, by + dy
+
+class DistanceField:
+    """
+    代价场
+    
+    保存网格中每个单元格到源点集合的最短路径代价，可沿代价下降方向
+    （梯度下降）提取任意单元格与最近源点之间的路径，无需再次搜索。
+    以终点集合为源点时即为到达终点的代价场（cost-to-go）。
+    """
+    
+    def __init__(self, grid_map: GridMap, cost: np.ndarray,
+                 sources: List[Tuple[int, int]],
+                 cell_cost: Optional[np.ndarray] = None):
+        """
+        初始化代价场
+        
+        Args:
+            grid_map: 网格地图
+            cost: 形状为 (height, width) 的代价数组，不可达为inf
+            sources: 源点网格坐标列表
+            cell_cost: 计算时使用的单元格代价系数（参见GridMap.cost_array），None为均匀代价
+        """
+        self.grid_map = grid_map
+        self.cost = cost
+        self.sources = list(sources)
+        self.cell_cost = cell_cost
+        self.map_version = grid_map.version
+    
+    def is_current(self) -> bool:
+        """地图自计算以来是否未发生变化"""
+        return self.map_version == self.grid_map.version
+    
+    def cost_at(self, x: int, y: int) -> float:
+        """单元格到最近源点的代价，地图外或不可达返回inf"""
+        if not (0 <= x < self.grid_map.width and 0 <= y < self.grid_map.height):
+            return math.inf
+        return float(self.cost[y, x])
+    
+    def descend(self, x: int, y: int) -> Optional[List[Tuple[int, int]]]:
+        """从 (x, y) 沿代价下降方向走到最近源点，返回经过的单元格"""
+        if math.isinf(self.cost_at(x, y)):
+            return None
+        
+        grid_map = self.grid_map
+        cost = self.cost
+        path = [(x, y)]
+        current_cost = cost[y, x]
+        
+        cell_cost = self.cell_cost
+        
+        while current_cost > 0:
+            best = None
+            best_cost = current_cost
+            best_total = math.inf
+            for nx, ny in grid_map.get_neighbors(x, y):
+                if cell_cost is None:
+                    if cost[ny, nx] < best_cost:
+                        best_cost = cost[ny, nx]
+                        best = (nx, ny)
+                elif cost[ny, nx] < current_cost:
+                    # 加权代价下选择 代价 + 边代价 最小的邻居，即最短路径上的前驱
+                    total = float(cost[ny, nx]) + grid_map.distance(x, y, nx, ny) * (
+                        float(cell_cost[y, x]) + float(cell_cost[ny, nx])) * 0.5
+                    if total < best_total:
+                        best_total = total
+                        best_cost = cost[ny, nx]
+                        best = (nx, ny)
+            if best is None:
+                return None
+            x, y = best
+            current_cost = best_cost
+            path.append(best)
+        
+        return path
+    
+    def path_to(self, x: int, y: int) -> Optional[List[Tuple[int, int]]]:
+        """从最近源点到 (x, y) 的路径"""
+        path = self.descend(x, y)
+        return path[::-1] if path else None
+
+class DStarLite:
+    """
+    D* Lite增量式路径规划器
+    
+    从终点向起点反向搜索并在多次规划之间保留搜索状态（g、rhs和优先队列）。
+    通过监听GridMap的障碍物变化，只修复受影响单元格的代价，
+    机器人移动后也无需从头重新规划。
+    """
+    
+    # 启发式按比例略微缩小（仍可采纳且一致）。沿直线最短路径上的单元格，其键的第一分量
+    # 在实数下不大于起点的键，但g逐边累加与直接开方的舍入误差可能使其反而大1个ulp，
+    # 导致搜索在处理这些单元格之前就结束、起点保留过低的g值
+    HEURISTIC_SCALE = 1.0 - 1e-9
+    
+    def __init__(self, grid_map: GridMap, goal: Tuple[int, int],
+                 heuristic_method: str = "euclidean"):
+        """
+        初始化D* Lite规划器
+        
+        Args:
+            grid_map: 网格地图
+            goal: 终点网格坐标
+            heuristic_method: 启发式函数方法
+        """
+        self.grid_map = grid_map
+        self.goal = goal
+        self.heuristic_method = heuristic_method
+        self.explored_nodes = 0
+        
+        width = grid_map.width
+        size = width * grid_map.height
+        self.width = width
+        self.goal_idx = goal[1] * width + goal[0]
+        
+        # g和rhs会被逐元素频繁读写，使用列表比NumPy标量访问更快
+        self.g = [math.inf] * size
+        self.rhs = [math.inf] * size
+        # 优先队列采用惰性删除，open_key记录单元格当前有效的键
+        self.open_heap = []
+        self.open_key: Dict[int, Tuple[float, float]] = {}
+        
+        # 扁平视图与地图共享内存，障碍物变化后自动可见
+        self._grid_flat = grid_map.grid.ravel()
+        self._mask_flat = grid_map.move_mask.ravel()
+        self._obstacle = CellType.OBSTACLE.value
+        
+        self.km = 0.0
+        self.start = None
+        self.start_idx = -1
+        self._pending_changes = []
+        
+        self.rhs[self.goal_idx] = 0.0
+        self._push(self.goal_idx, (0.0, 0.0))
+        
+        grid_map.add_change_listener(self._on_map_changed)
+    
+    def detach(self):
+        """停止监听地图变化"""
+        self.grid_map.remove_change_listener(self._on_map_changed)
+    
+    def _on_map_changed(self, x1: int, y1: int, x2: int, y2: int):
+        """记录变化区域，在下一次规划时统一修复"""
+        self._pending_changes.append((x1, y1, x2, y2))
+    
+    def plan(self, start: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        规划或修复从start到终点的路径
+        
+        Args:
+            start: 当前起点网格坐标
+        
+        Returns:
+            路径点列表，如果失败返回None
+        """
+        if self.start is not None and start != self.start:
+            # 起点移动后所有键的下界整体平移
+            self.km += self._heuristic(self.start[0], self.start[1], start)
+        self.start = start
+        self.start_idx = start[1] * self.width + start[0]
+        self.explored_nodes = 0
+        
+        self._apply_changes()
+        self._compute_shortest_path()
+        
+        return self._extract_path()
+    
+    def _apply_changes(self):
+        """更新受障碍物变化影响的单元格"""
+        changes, self._pending_changes = self._pending_changes, []
+        grid_map = self.grid_map
+        
+        for x1, y1, x2, y2 in changes:
+            # 变化单元格及其邻居的出边代价可能改变
+            x1, y1 = max(0, x1 - 1), max(0, y1 - 1)
+            x2 = min(grid_map.width - 1, x2 + 1)
+            y2 = min(grid_map.height - 1, y2 + 1)
+            for y in range(y1, y2 + 1):
+                for idx in range(y * self.width + x1, y * self.width + x2 + 1):
+                    self._update_vertex(idx)
+    
+    def _calculate_key(self, idx: int) -> Tuple[float, float]:
+        """计算单元格的优先级键"""
+        value = min(self.g[idx], self.rhs[idx])
+        y, x = divmod(idx, self.width)
+        return (value + self._heuristic(x, y, self.start) + self.km, value)
+    
+    def _heuristic(self, x: int, y: int, target: Tuple[int, int]) -> float:
+        """缩小后的启发式值"""
+        return self.grid_map.heuristic(x, y, target[0], target[1],
+                                       self.heuristic_method) * self.HEURISTIC_SCALE
+    
+    def _push(self, idx: int, key: Tuple[float, float]):
+        """插入或更新优先队列中的单元格"""
+        self.open_key[idx] = key
+        heapq.heappush(self.open_heap, (key[0], key[1], idx))
+    
+    def _top(self) -> Optional[Tuple[Tuple[float, float], int]]:
+        """返回有效的队首元素，跳过过期条目"""
+        open_heap = self.open_heap
+        open_key = self.open_key
+        while open_heap:
+            k1, k2, idx = open_heap[0]
+            if open_key.get(idx) == (k1, k2):
+                return (k1, k2), idx
+            heapq.heappop(open_heap)
+        return None
+    
+    def _successors(self, idx: int):
+        """
+        单元格的后继 [(扁平索引偏移, 移动代价)]
+        
+        不可通行单元格（障碍物及膨胀区域，与is_valid一致）没有出边。可通行单元格的
+        移动掩码只指向可通行邻居，因此图是对称的，前驱与后继相同。
+        """
+        if self._grid_flat[idx] == self._obstacle:
+            return ()
+        clearance = self.grid_map.clearance
+        if clearance is not None and clearance.flat[idx] < self.grid_map.inflation_cells + 0.5:
+            return ()
+        return self.grid_map.index_moves[self._mask_flat[idx]]
+    
+    def _update_vertex(self, idx: int):
+        """根据后继重新计算rhs并更新队列"""
+        g = self.g
+        rhs = self.rhs
+        if idx != self.goal_idx:
+            best = math.inf
+            for offset, move_cost in self._successors(idx):
+                cost = move_cost + g[idx + offset]
+                if cost < best:
+                    best = cost
+            rhs[idx] = best
+        
+        self.open_key.pop(idx, None)
+        g_value = g[idx]
+        rhs_value = rhs[idx]
+        if g_value != rhs_value:
+            value = g_value if g_value < rhs_value else rhs_value
+            y, x = divmod(idx, self.width)
+            self._push(idx, (value + self._heuristic(x, y, self.start) + self.km, value))
+    
+    def _compute_shortest_path(self):
+        """扩展不一致的单元格直到起点一致"""
+        g = self.g
+        rhs = self.rhs
+        start_idx = self.start_idx
+        update_vertex = self._update_vertex
+        
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            
+            key_old, idx = top
+            if key_old >= self._calculate_key(start_idx) and rhs[start_idx] == g[start_idx]:
+                break
+            
+            self.explored_nodes += 1
+            key_new = self._calculate_key(idx)
+            
+            if key_old < key_new:
+                self._push(idx, key_new)
+            elif g[idx] > rhs[idx]:
+                # 局部过一致：确定g值并传播给前驱
+                g[idx] = rhs[idx]
+                self.open_key.pop(idx, None)
+                for offset, _ in self._successors(idx):
+                    update_vertex(idx + offset)
+            else:
+                # 局部欠一致：重置g值后重新计算自身及前驱
+                g[idx] = math.inf
+                update_vertex(idx)
+                for offset, _ in self._successors(idx):
+                    update_vertex(idx + offset)
+    
+    def _extract_path(self) -> Optional[List[Tuple[int, int]]]:
+        """
+        沿g值下降方向从起点走到终点
+        
+        仍在队列中的单元格g值可能已过期，只走向局部一致的后继。搜索结束时起点的
+        某条最短路径上的单元格键都小于起点的键，必然已一致，因此总能走到终点。
+        """
+        g = self.g
+        open_key = self.open_key
+        if math.isinf(g[self.start_idx]) and math.isinf(self.rhs[self.start_idx]):
+            return None
+        
+        width = self.width
+        idx = self.start_idx
+        path = [self.start]
+        visited = {idx}
+        
+        while idx != self.goal_idx:
+            best_idx = -1
+            best_cost = math.inf
+            for offset, move_cost in self._successors(idx):
+                n_idx = idx + offset
+                if n_idx in open_key:
+                    continue
+                cost = move_cost + g[n_idx]
+                if cost < best_cost:
+                    best_cost = cost
+                    best_idx = n_idx
+            
+            if best_idx < 0 or best_idx in visited:
+                print("错误: D* Lite路径提取失败")
+                return None
+            
+            idx = best_idx
+            visited.add(idx)
+            y, x = divmod(idx, width)
+            path.append((x, y))
+        
+        return path
+
+# 状态栅格的16个离散航向，取整数方向向量使直线基元的终点正好落在单元格上
+LATTICE_HEADINGS = (
+    (1, 0), (2, 1), (1, 1), (1, 2), (0, 1), (-1, 2), (-1, 1), (-2, 1),
+    (-1, 0), (-2, -1), (-1, -1), (-1, -2), (0, -1), (1, -2), (1, -1), (2, -1)
+)
+
+@dataclass
+class MotionPrimitive:
+    """运动基元：从某个离散航向出发、可连续行驶的一段轨迹（单位为单元格）"""
+    start_heading: int
+    end_heading: int
+    dx: int                 # 终点相对起点的单元格偏移
+    dy: int
+    length: float           # 轨迹长度
+    poses: np.ndarray       # (k, 3) 相对起点的采样位姿 (x, y, theta)
+    cells: np.ndarray       # (m, 2) 扫过的单元格偏移 (dx, dy)，不含起点单元格
+
+class StateLattice:
+    """
+    差速底盘的状态栅格
+    
+    状态为 (x, y, 航向序号)。每个航向的基元包括一段直线，以及以最小转弯半径
+    转过1~2个航向的弧线（前后补直线使终点落在单元格上），曲率不超过1/转弯半径，
+    底盘可不停车连续行驶。基元及其扫过的单元格只在构造时计算一次，
+    相同参数的栅格通过StateLattice.cached共享。
+    机器人外形通过地图的膨胀层（GridMap.set_inflation_radius）考虑，扫过单元格只需查中心线。
+    """
+    
+    _cache: Dict[Tuple, 'StateLattice'] = {}
+    
+    def __init__(self, resolution: float, wheel_base: float = 0.5,
+                 turn_radius: float = 1.0, max_heading_change: int = 2):
+        """
+        生成运动基元
+        
+        Args:
+            resolution: 地图分辨率（米/单元格）
+            wheel_base: 轮距（米），内侧轮不反转要求转弯半径不小于轮距的一半
+            turn_radius: 期望的最小转弯半径（米）
+            max_heading_change: 单个基元最多转过的航向数
+        """
+        self.resolution = resolution
+        self.wheel_base = wheel_base
+        self.turn_radius = max(turn_radius, wheel_base / 2)
+        self.heading_count = len(LATTICE_HEADINGS)
+        self.angles = [math.atan2(vy, vx) for vx, vy in LATTICE_HEADINGS]
+        
+        radius = self.turn_radius / resolution
+        self.primitives: List[List[MotionPrimitive]] = []
+        for heading in range(self.heading_count):
+            primitives = [self._straight(heading)]
+            for change in range(1, max_heading_change + 1):
+                for end_heading in (heading + change, heading - change):
+                    primitive = self._turn(heading, end_heading % self.heading_count, radius)
+                    if primitive is not None:
+                        primitives.append(primitive)
+            self.primitives.append(primitives)
+        
+        # 按地图宽度缓存的扁平偏移和包围盒
+        self._flat: Dict[int, List[List[Tuple]]] = {}
+    
+    @classmethod
+    def cached(cls, resolution: float, wheel_base: float = 0.5,
+               turn_radius: float = 1.0) -> 'StateLattice':
+        """返回相同参数的共享栅格，首次调用时生成基元"""
+        key = (resolution, wheel_base, turn_radius)
+        lattice = cls._cache.get(key)
+        if lattice is None:
+            lattice = cls(resolution, wheel_base, turn_radius)
+            cls._cache[key] = lattice
+        return lattice
+    
+    def nearest_heading(self, theta: float) -> int:
+        """与角度theta（弧度）最接近的离散航向序号"""
+        return min(range(self.heading_count),
+                   key=lambda h: abs(math.remainder(theta - self.angles[h], 2 * math.pi)))
+    
+    def expansions(self, width: int) -> List[List[Tuple]]:
+        """
+        各航向基元的扩展表
+        
+        Returns:
+            每个航向的 [(基元序号, 基元, 扫过单元格的扁平偏移, 包围盒)]，
+            包围盒为 (min_dx, min_dy, max_dx, max_dy)
+        """
+        table = self._flat.get(width)
+        if table is None:
+            table = []
+            for primitives in self.primitives:
+                entries = []
+                for i, primitive in enumerate(primitives):
+                    cells = primitive.cells
+                    offsets = cells[:, 1].astype(np.int64) * width + cells[:, 0]
+                    bbox = (int(cells[:, 0].min()), int(cells[:, 1].min()),
+                            int(cells[:, 0].max()), int(cells[:, 1].max()))
+                    entries.append((i, primitive, offsets, bbox))
+                table.append(entries)
+            self._flat[width] = table
+        return table
+    
+    def _straight(self, heading: int) -> MotionPrimitive:
+        """沿航向前进一个方向向量"""
+        vx, vy = LATTICE_HEADINGS[heading]
+        return self._build(heading, heading, [('line', math.hypot(vx, vy))])
+    
+    def _turn(self, heading: int, end_heading: int, radius: float) -> Optional[MotionPrimitive]:
+        """
+        直线 + 圆弧 + 直线 的转向基元
+        
+        圆弧弦向量固定，在终点候选单元格中求解两段直线长度 a, b >= 0，取总长最短者。
+        """
+        theta0, theta1 = self.angles[heading], self.angles[end_heading]
+        turn = math.remainder(theta1 - theta0, 2 * math.pi)
+        sign = 1.0 if turn > 0 else -1.0
+        chord = np.array([math.sin(theta1) - math.sin(theta0),
+                          math.cos(theta0) - math.cos(theta1)]) * radius * sign
+        
+        u0 = np.array([math.cos(theta0), math.sin(theta0)])
+        u1 = np.array([math.cos(theta1), math.sin(theta1)])
+        basis_inv = np.linalg.inv(np.column_stack([u0, u1]))
+        
+        reach = int(math.ceil(2 * radius)) + 3
+        xs, ys = np.meshgrid(np.arange(-reach, reach + 1), np.arange(-reach, reach + 1))
+        targets = np.stack([xs.ravel(), ys.ravel()], axis=1)
+        ab = (targets - chord) @ basis_inv.T
+        lengths = ab.sum(axis=1) + abs(turn) * radius
+        lengths[(ab < -1e-9).any(axis=1)] = np.inf
+        best = int(np.argmin(lengths))
+        if math.isinf(lengths[best]):
+            return None
+        
+        a, b = np.maximum(ab[best], 0.0)
+        return self._build(heading, end_heading,
+                           [('line', a), ('arc', radius * sign, turn), ('line', b)],
+                           end=(int(targets[best, 0]), int(targets[best, 1])))
+    
+    def _build(self, heading: int, end_heading: int, segments: List[Tuple],
+               end: Optional[Tuple[int, int]] = None) -> MotionPrimitive:
+        """按分段描述以不超过1/4单元格的步长采样位姿并统计扫过的单元格"""
+        x, y, theta = 0.0, 0.0, self.angles[heading]
+        poses = [(x, y, theta)]
+        length = 0.0
+        
+        for segment in segments:
+            if segment[0] == 'line':
+                seg_len = segment[1]
+                steps = max(1, int(math.ceil(seg_len / 0.25))) if seg_len > 1e-9 else 0
+                for i in range(1, steps + 1):
+                    s = seg_len * i / steps
+                    poses.append((x + s * math.cos(theta), y + s * math.sin(theta), theta))
+                x, y = x + seg_len * math.cos(theta), y + seg_len * math.sin(theta)
+            else:
+                signed_radius, turn = segment[1], segment[2]
+                seg_len = abs(turn * signed_radius)
+                cx = x - signed_radius * math.sin(theta)
+                cy = y + signed_radius * math.cos(theta)
+                steps = max(1, int(math.ceil(seg_len / 0.25)))
+                for i in range(1, steps + 1):
+                    t = theta + turn * i / steps
+                    poses.append((cx + signed_radius * math.sin(t),
+                                  cy - signed_radius * math.cos(t), t))
+                theta += turn
+                x, y = poses[-1][0], poses[-1][1]
+            length += seg_len
+        
+        if end is None:
+            end = (int(round(x)), int(round(y)))
+        # 消除采样累积误差，终点精确落在单元格中心
+        poses[-1] = (float(end[0]), float(end[1]), self.angles[end_heading])
+        poses = np.array(poses)
+        
+        # 扫过的单元格（四舍五入到最近单元格，统一用floor(v + 0.5)保证平移不变）；
+        # 对角跨越时补上两侧单元格，与网格的防切角规则一致
+        cells = []
+        previous = (0, 0)
+        for px, py, _ in poses[1:]:
+            cell = (math.floor(px + 0.5), math.floor(py + 0.5))
+            if cell == previous:
+                continue
+            if cell[0] != previous[0] and cell[1] != previous[1]:
+                cells.append((cell[0], previous[1]))
+                cells.append((previous[0], cell[1]))
+            cells.append(cell)
+            previous = cell
+        cells = np.unique(np.array(cells, dtype=np.int64), axis=0)
+        cells = cells[(cells[:, 0] != 0) | (cells[:, 1] != 0)]
+        
+        return MotionPrimitive(heading, end_heading, end[0], end[1], length, poses, cells)
+
+class PlannerInstrumentation:
+    """
+    规划器埋点：计数器和分阶段计时
+    
+    计数器（入堆/出堆次数、跳过的过期堆元素、邻居检查、视线检测等）和阶段耗时
+    （search搜索、reconstruction路径重构、smoothing平滑）先累加到当前线程，
+    每次规划或平滑结束时作为一条记录计入聚合结果：总量，以及按2的幂分桶的每条记录直方图。
+    阶段计时使用time.perf_counter，嵌套阶段的耗时只计入内层（search不含reconstruction）。
+    同一实例可由多个规划器、多个线程共享；plan_many的工作进程不回传埋点数据。
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+    
+    def reset(self):
+        """清空聚合结果和当前线程未计入的数据"""
+        with self._lock:
+            self.records = 0
+            self.counters: Dict[str, Dict] = {}
+            self.phases: Dict[str, Dict] = {}
+        self._local.__dict__.clear()
+    
+    def _current(self) -> threading.local:
+        """当前线程本次规划的累加状态"""
+        local = self._local
+        if not hasattr(local, 'counters'):
+            local.counters = {}
+            local.phases = {}
+            local.stack = []
+        return local
+    
+    def count(self, name: str, value: int = 1):
+        """累加计数器"""
+        counters = self._current().counters
+        counters[name] = counters.get(name, 0) + value
+    
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """计时一个阶段，用法: with instrumentation.phase("search"): ..."""
+        local = self._current()
+        # 栈元素记录子阶段的累计耗时，从本阶段中扣除
+        local.stack.append([0.0])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            child = local.stack.pop()[0]
+            if local.stack:
+                local.stack[-1][0] += elapsed
+            local.phases[name] = local.phases.get(name, 0.0) + elapsed - child
+    
+    def flush(self):
+        """把当前线程累加的数据作为一条记录计入聚合结果"""
+        local = self._current()
+        if not local.counters and not local.phases:
+            return
+        
+        with self._lock:
+            self.records += 1
+            for name, value in local.counters.items():
+                self._accumulate(self.counters, name, value, value)
+            for name, seconds in local.phases.items():
+                # 阶段耗时直方图以微秒分桶
+                self._accumulate(self.phases, name, seconds, seconds * 1e6)
+        local.counters = {}
+        local.phases = {}
+    
+    @staticmethod
+    def _accumulate(table: Dict[str, Dict], name: str, value: float, bucket_value: float):
+        """更新一项的总量、极值和直方图（桶的键为上界 1, 2, 4, ...）"""
+        entry = table.get(name)
+        if entry is None:
+            entry = table[name] = {'count': 0, 'total': 0, 'min': value, 'max': value,
+                                   'histogram': {}}
+        entry['count'] += 1
+        entry['total'] += value
+        entry['min'] = min(entry['min'], value)
+        entry['max'] = max(entry['max'], value)
+        
+        bucket = 1 if bucket_value <= 1 else 1 << math.ceil(math.log2(bucket_value))
+        histogram = entry['histogram']
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+    
+    def export(self) -> Dict:
+        """
+        导出聚合结果
+        
+        Returns:
+            {'records': 记录数, 'counters': {...}, 'phases': {...}}，每项含
+            count/total/mean/min/max和histogram [[桶上界, 次数]]；
+            阶段的时间单位为秒，直方图桶上界单位为微秒
+        """
+        self.flush()
+        
+        def summarize(table: Dict[str, Dict]) -> Dict[str, Dict]:
+            return {
+                name: {
+                    'count': entry['count'],
+                    'total': entry['total'],
+                    'mean': entry['total'] / entry['count'],
+                    'min': entry['min'],
+                    'max': entry['max'],
+                    'histogram': sorted(entry['histogram'].items()),
+                }
+                for name, entry in sorted(table.items())
+            }
+        
+        with self._lock:
+            return {
+                'records': self.records,
+                'counters': summarize(self.counters),
+                'phases': summarize(self.phases),
+            }
+    
+    def save(self, path: str):
+        """导出为JSON文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.export(), f, ensure_ascii=False, indent=2)
+
+class PathPlanner:
+    """路径规划器"""
+    
+    def __init__(self, grid_map: GridMap, seed: Optional[int] = None,
+                 cache_size: int = 128,
+                 instrumentation: Optional[PlannerInstrumentation] = None):
+        """
+        初始化路径规划器
+        
+        Args:
+            grid_map: 网格地图
+            seed: 随机采样算法（RRT/RRT*）的随机种子，设置后每次规划结果可复现
+            cache_size: 路径LRU缓存容量，0表示不缓存
+            instrumentation: 可选的埋点，记录计数器和分阶段耗时
+        """
+        self.grid_map = grid_map
+        self.seed = seed
+        self.instrumentation = instrumentation
+        self.last_path = []
+        self.planning_time = 0.0
+        self.explored_nodes = 0
+        # 任意时间算法达到的次优界（路径代价/最优代价的上界），其他算法为None
+        self.suboptimality_bound: Optional[float] = None
+        
+        # 路径LRU缓存，键为 (起点, 终点, 算法, 启发式, 地图版本)
+        self.cache_size = cache_size
+        self._path_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # D* Lite在多次规划之间保留的搜索状态
+        self._d_star_lite: Optional[DStarLite] = None
+        
+        # 状态栅格（运动基元），参见configure_lattice
+        self.lattice: Optional[StateLattice] = None
+        
+    def plan(self, algorithm: PlanningAlgorithm, 
+             heuristic_method: str = "euclidean",
+             time_budget: Optional[float] = None) -> Optional[List[Tuple[int, int]]]:
+        """
+        执行路径规划
+        
+        Args:
+            algorithm: 规划算法
+            heuristic_method: 启发式函数方法
+            time_budget: ARA*的时间预算（秒），到时返回当前最优路径；None表示一直改进到最优
+        
+        Returns:
+            路径点列表，如果失败返回None
+        """
+        start_time = time.perf_counter()
+        
+        if not self.grid_map.start_pos or not self.grid_map.goal_pos:
+            print("错误: 未设置起点或终点")
+            return None
+        
+        start, goal = self.grid_map.start_pos, self.grid_map.goal_pos
+        # 有时间预算的任意时间规划结果取决于运行速度，不缓存
+        cacheable = algorithm != PlanningAlgorithm.ARA_STAR or time_budget is None
+        cache_key = (start, goal, algorithm, heuristic_method, self.grid_map.version)
+        cached = self._cache_lookup(cache_key) if cacheable else None
+        if cached is not None:
+            # 地图未变化时直接返回缓存结果
+            path = list(cached) if cached else None
+            self.explored_nodes = 0
+            self.suboptimality_bound = None
+            self._count("cache_hits")
+            self._flush_instrumentation()
+            self.planning_time = time.perf_counter() - start_time
+            self.last_path = path if path else []
+            return path
+        
+        with self._phase("search"):
+            path = self._run_algorithm(algorithm, start, goal, heuristic_method, time_budget)
+        self._count("expanded", self.explored_nodes)
+        self._flush_instrumentation()
+        
+        self.planning_time = time.perf_counter() - start_time
+        self.last_path = path if path else []
+        if cacheable:
+            self._cache_store(cache_key, path)
+        
+        return path
+    
+    def plan_query(self, start: Tuple[int, int], goal: Tuple[int, int],
+                   algorithm: PlanningAlgorithm = PlanningAlgorithm.ASTAR,
+                   heuristic_method: str = "euclidean",
+                   time_budget: Optional[float] = None) -> Tuple[Optional[List[Tuple[int, int]]], Dict]:
+        """
+        无状态的路径规划查询，可在多个线程中并发调用
+        
+        不读取也不修改地图的start_pos/goal_pos，在地图当前版本的只读快照上搜索，
+        每次查询使用独立的搜索状态，只与其他查询共享路径缓存。
+        地图的修改与查询不在同一线程时，修改方需自行保证修改完成后再发起查询。
+        
+        Args:
+            start: 起点网格坐标
+            goal: 终点网格坐标
+            algorithm: 规划算法
+            heuristic_method: 启发式函数方法
+            time_budget: ARA*的时间预算（秒），参见plan()
+        
+        Returns:
+            (路径点列表或None, 本次查询的统计信息)
+        """
+        start_time = time.perf_counter()
+        snapshot = self.grid_map.snapshot()
+        start, goal = tuple(start), tuple(goal)
+        worker = PathPlanner(snapshot, seed=self.seed, cache_size=0,
+                             instrumentation=self.instrumentation)
+        worker.lattice = self.lattice
+        
+        if not (snapshot.is_valid(*start) and snapshot.is_valid(*goal)):
+            print(f"错误: 起点 {start} 或终点 {goal} 不可通行")
+            return None, worker.get_statistics()
+        
+        cacheable = algorithm != PlanningAlgorithm.ARA_STAR or time_budget is None
+        cache_key = (start, goal, algorithm, heuristic_method, snapshot.version)
+        cached = self._cache_lookup(cache_key) if cacheable else None
+        if cached is not None:
+            path = list(cached) if cached else None
+            worker._count("cache_hits")
+        else:
+            with worker._phase("search"):
+                path = worker._run_algorithm(algorithm, start, goal, heuristic_method, time_budget)
+            worker._count("expanded", worker.explored_nodes)
+            if worker._d_star_lite is not None:
+                worker._d_star_lite.detach()
+            if cacheable:
+                self._cache_store(cache_key, path)
+        
+        worker._flush_instrumentation()
+        worker.planning_time = time.perf_counter() - start_time
+        worker.last_path = path if path else []
+        return path, worker.get_statistics()
+    
+    def _run_algorithm(self, algorithm: PlanningAlgorithm, start: Tuple[int, int],
+                       goal: Tuple[int, int], heuristic_method: str,
+                       time_budget: Optional[float] = None) -> Optional[List[Tuple[int, int]]]:
+        """按算法分派搜索"""
+        self.suboptimality_bound = None
+        if algorithm == PlanningAlgorithm.ASTAR:
+            return self._astar(start, goal, heuristic_method)
+        elif algorithm == PlanningAlgorithm.DIJKSTRA:
+            return self._dijkstra(start, goal)
+        elif algorithm == PlanningAlgorithm.RRT:
+            return self._rrt(start, goal)
+        elif algorithm == PlanningAlgorithm.RRT_STAR:
+            return self._rrt_star(start, goal)
+        elif algorithm == PlanningAlgorithm.THETA_STAR:
+            return self._theta_star(start, goal, heuristic_method)
+        elif algorithm == PlanningAlgorithm.D_STAR:
+            return self._d_star(start, goal, heuristic_method)
+        elif algorithm == PlanningAlgorithm.JPS:
+            return self._jps(start, goal, heuristic_method)
+        elif algorithm == PlanningAlgorithm.ARA_STAR:
+            return self._ara_star(start, goal, heuristic_method, time_budget)
+        elif algorithm == PlanningAlgorithm.BIDIRECTIONAL_ASTAR:
+            return self._bidirectional_search(start, goal, heuristic_method)
+        elif algorithm == PlanningAlgorithm.BIDIRECTIONAL_DIJKSTRA:
+            return self._bidirectional_search(start, goal, None)
+        elif algorithm == PlanningAlgorithm.STATE_LATTICE:
+            return self._state_lattice(start, goal)
+        else:
+            print(f"错误: 未知算法 {algorithm}")
+            return None
+    
+    def _cache_lookup(self, cache_key: Tuple) -> Optional[Tuple]:
+        """
+        查询路径缓存
+        
+        Returns:
+            命中时返回缓存的路径元组（规划失败缓存为空元组），未命中返回None
+        """
+        if self.cache_size <= 0:
+            return None
+        with self._cache_lock:
+            cached = self._path_cache.get(cache_key)
+            if cached is None:
+                return None
+            self._path_cache.move_to_end(cache_key)
+            self.cache_hits += 1
+            return cached
+    
+    def _cache_store(self, cache_key: Tuple, path: Optional[List[Tuple[int, int]]]):
+        """写入路径缓存并淘汰最久未使用的条目"""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self.cache_misses += 1
+            self._path_cache[cache_key] = tuple(path) if path else ()
+            if len(self._path_cache) > self.cache_size:
+                self._path_cache.popitem(last=False)
+    
+    def clear_cache(self):
+        """清空路径缓存"""
+        with self._cache_lock:
+            self._path_cache.clear()
+    
+    def _phase(self, name: str):
+        """埋点阶段计时，未启用埋点时为空操作"""
+        if self.instrumentation is None:
+            return contextlib.nullcontext()
+        return self.instrumentation.phase(name)
+    
+    def _count(self, name: str, value: int = 1):
+        """累加埋点计数器，未启用埋点时为空操作"""
+        if self.instrumentation is not None:
+            self.instrumentation.count(name, value)
+    
+    def _flush_instrumentation(self):
+        """一次规划或平滑结束，把埋点数据计入一条记录"""
+        if self.instrumentation is not None:
+            self.instrumentation.flush()
+    
+    def _record_heap_search(self, pushes: int, remaining: int, expanded: int,
+                            closed: Optional[np.ndarray] = None,
+                            move_mask: Optional[np.ndarray] = None):
+        """
+        搜索结束后一次性记录堆操作计数，搜索循环内只需累加入堆次数
+        
+        出堆次数 = 入堆次数 - 堆中剩余元素数，其中未扩展的即为跳过的过期元素；
+        邻居检查数由已关闭单元格的移动掩码位数求和得到。
+        """
+        if self.instrumentation is None:
+            return
+        pops = pushes - remaining
+        self._count("heap_pushes", pushes)
+        self._count("heap_pops", pops)
+        self._count("stale_skipped", max(0, pops - expanded))
+        if closed is not None:
+            self._count("neighbor_checks", int(MASK_POPCOUNT[move_mask[closed]].sum()))
+    
+    def plan_many(self, queries: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+                  algorithm: PlanningAlgorithm = PlanningAlgorithm.ASTAR,
+                  heuristic_method: str = "euclidean",
+                  workers: Optional[int] = None,
+                  time_budget: Optional[float] = None) -> List[Tuple[Optional[List[Tuple[int, int]]], Dict]]:
+        """
+        并行规划多组互相独立的起点/终点查询
+        
+        地图通过multiprocessing.shared_memory只发布一次，各工作进程直接映射同一块内存
+        （含移动掩码，不重建），查询分发到进程池执行。查询数很少或workers<=1时在本进程顺序执行。
+        
+        Args:
+            queries: [(起点, 终点)] 网格坐标列表
+            algorithm: 规划算法
+            heuristic_method: 启发式函数方法
+            workers: 工作进程数，默认为CPU核数
+            time_budget: 每个查询的ARA*时间预算（秒），参见plan()
+        
+        Returns:
+            与queries顺序一致的 [(路径或None, 统计信息)]
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(queries))
+        
+        if workers <= 1:
+            return [self.plan_query(start, goal, algorithm, heuristic_method, time_budget)
+                    for start, goal in queries]
+        
+        grid_map = self.grid_map
+        blocks = []
+        
+        def publish(array: Optional[np.ndarray]) -> Optional[Tuple[str, Tuple, str]]:
+            """复制数组到新的共享内存块，返回 (块名, 形状, 类型)"""
+            if array is None:
+                return None
+            block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+            return block.name, array.shape, array.dtype.str
+        
+        try:
+            map_info = {
+                'storage': publish(grid_map._storage),
+                'clearance': publish(grid_map.clearance),
+                'landmark_distances': publish(grid_map.landmark_distances
+                                              if grid_map.landmarks_current() else None),
+                'landmarks': grid_map.landmarks,
+                'cost': publish(grid_map.cost_array()),
+                'width': grid_map.width,
+                'height': grid_map.height,
+                'resolution': grid_map.resolution,
+                'inflation_cells': grid_map.inflation_cells,
+                'clearance_limit': grid_map.clearance_limit,
+            }
+            tasks = [(start, goal, algorithm, heuristic_method, time_budget)
+                     for start, goal in queries]
+            lattice_params = (None if self.lattice is None else
+                              (self.lattice.wheel_base, self.lattice.turn_radius))
+            with multiprocessing.Pool(workers, initializer=_init_batch_worker,
+                                      initargs=(map_info, self.seed, self.cache_size,
+                                                lattice_params)) as pool:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                return pool.starmap(_run_batch_query, tasks, chunksize=chunksize)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    
+    def _astar(self, start: Tuple[int, int], goal: Tuple[int, int],
+               heuristic_method: str) -> Optional[List[Tuple[int, int]]]:
+        """A*算法"""
+        return self._array_search(start, goal, heuristic_method)
+    
+    def _array_search(self, start: Tuple[int, int], goal: Tuple[int, int],
+                      heuristic_method: Optional[str]) -> Optional[List[Tuple[int, int]]]:
+        """
+        基于数组的A*搜索核心
+        
+        单元格以扁平索引 y * width + x 表示，g值和父节点保存在NumPy数组中，
+        关闭列表为布尔位图，开放列表为二叉堆并采用惰性删除：
+        同一单元格可能多次入堆，出堆时若已关闭则直接跳过。
+        邻居直接由地图的移动掩码查表得到。
+        
+        Args:
+            start: 起点网格坐标
+            goal: 终点网格坐标
+            heuristic_method: 启发式函数方法，为None时退化为Dijkstra
+        
+        Returns:
+            路径点列表，如果失败返回None
+        """
+        grid_map = self.grid_map
+        width = grid_map.width
+        size = width * grid_map.height
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        start_idx = start_y * width + start_x
+        goal_idx = goal_y * width + goal_x
+        
+        g_score = np.full(size, np.inf)
+        parent = np.full(size, -1, dtype=np.int64)
+        closed = np.zeros(size, dtype=bool)
+        
+        move_mask = grid_map.move_mask.ravel()
+        index_moves = grid_map.index_moves
+        heuristic = grid_map.heuristic
+        use_heuristic = heuristic_method is not None
+        cell_cost = self._cell_cost_flat()
+        
+        # ALT启发式整表计算一次，搜索中直接查表；路标表失效时退化为对角距离
+        h_table = None
+        if heuristic_method == "alt":
+            h_table = grid_map.landmark_heuristic(goal)
+            if h_table is None:
+                heuristic_method = "diagonal"
+        
+        g_score[start_idx] = 0.0
+        start_h = (heuristic(start_x, start_y, goal_x, goal_y, heuristic_method)
+                   if use_heuristic else 0.0)
+        # 堆元素 (f, h, index)，f相同时优先扩展更靠近终点的节点
+        open_heap = [(start_h, start_h, start_idx)]
+        pushes = 1
+        path = None
+        
+        self.explored_nodes = 0
+        
+        while open_heap:
+            _, _, idx = heapq.heappop(open_heap)
+            
+            # 惰性删除：跳过过期的堆元素
+            if closed[idx]:
+                continue
+            closed[idx] = True
+            self.explored_nodes += 1
+            
+            # 到达终点
+            if idx == goal_idx:
+                path = self._reconstruct_path_from_indices(parent, goal_idx)
+                break
+            
+            current_g = float(g_score[idx])
+            
+            # 探索邻居
+            for offset, move_cost in index_moves[move_mask[idx]]:
+                n_idx = idx + offset
+                if closed[n_idx]:
+                    continue
+                
+                if cell_cost is not None:
+                    move_cost *= (float(cell_cost[idx]) + float(cell_cost[n_idx])) * 0.5
+                tentative_g = current_g + move_cost
+                
+                if tentative_g < g_score[n_idx]:
+                    g_score[n_idx] = tentative_g
+                    parent[n_idx] = idx
+                    if h_table is not None:
+                        h = float(h_table[n_idx])
+                    elif use_heuristic:
+                        ny, nx = divmod(n_idx, width)
+                        h = heuristic(nx, ny, goal_x, goal_y, heuristic_method)
+                    else:
+                        h = 0.0
+                    heapq.heappush(open_heap, (tentative_g + h, h, n_idx))
+                    pushes += 1
+        
+        self._record_heap_search(pushes, len(open_heap), self.explored_nodes, closed, move_mask)
+        return path  # 未找到路径时为None
+    
+    def _cell_cost_flat(self) -> Optional[np.ndarray]:
+        """扁平的单元格代价系数数组（参见GridMap.cost_array），均匀代价时为None"""
+        cost = self.grid_map.cost_array()
+        return None if cost is None else cost.ravel()
+    
+    def compute_distance_field(self, sources: List[Tuple[int, int]],
+                               targets: Optional[List[Tuple[int, int]]] = None,
+                               max_targets: Optional[int] = None,
+                               max_cost: Optional[float] = None) -> DistanceField:
+        """
+        计算代价场（多源Dijkstra波前扩展）
+        
+        一次搜索得到所有单元格到源点集合的最短代价，之后可对任意单元格
+        用梯度下降提取路径。
+        
+        Args:
+            sources: 源点网格坐标列表（如当前位置，或全部终点）
+            targets: 可选的目标单元格列表，全部确定后提前结束搜索，
+                     未扩展到的单元格代价为inf
+            max_targets: 确定这么多个目标后即结束搜索（按代价从小到大），
+                         如为1时只保证最近的目标
+            max_cost: 只扩展代价不超过该值的单元格，用于局部搜索
+        
+        Returns:
+            代价场
+        """
+        grid_map = self.grid_map
+        width = grid_map.width
+        size = width * grid_map.height
+        
+        g_score = np.full(size, np.inf)
+        closed = np.zeros(size, dtype=bool)
+        move_mask = grid_map.move_mask.ravel()
+        index_moves = grid_map.index_moves
+        cell_cost = self._cell_cost_flat()
+        
+        open_heap = []
+        for x, y in sources:
+            if 0 <= x < width and 0 <= y < grid_map.height:
+                idx = y * width + x
+                g_score[idx] = 0.0
+                open_heap.append((0.0, idx))
+        heapq.heapify(open_heap)
+        pushes = len(open_heap)
+        
+        remaining = None
+        if targets is not None:
+            remaining = {y * width + x for x, y in targets
+                         if 0 <= x < width and 0 <= y < grid_map.height}
+            if max_targets is not None:
+                # 达到数量后剩余目标不再需要
+                stop_count = max(0, len(remaining) - max_targets)
+            else:
+                stop_count = 0
+        
+        self.explored_nodes = 0
+        
+        while open_heap:
+            current_g, idx = heapq.heappop(open_heap)
+            if closed[idx]:
+                continue
+            if max_cost is not None and current_g > max_cost:
+                break
+            closed[idx] = True
+            self.explored_nodes += 1
+            
+            if remaining is not None:
+                remaining.discard(idx)
+                if len(remaining) <= stop_count:
+                    break
+            
+            for offset, move_cost in index_moves[move_mask[idx]]:
+                n_idx = idx + offset
+                if closed[n_idx]:
+                    continue
+                if cell_cost is not None:
+                    move_cost *= (float(cell_cost[idx]) + float(cell_cost[n_idx])) * 0.5
+                tentative_g = current_g + move_cost
+                if tentative_g < g_score[n_idx]:
+                    g_score[n_idx] = tentative_g
+                    heapq.heappush(open_heap, (tentative_g, n_idx))
+                    pushes += 1
+        
+        self._record_heap_search(pushes, len(open_heap), self.explored_nodes, closed, move_mask)
+        
+        # 提前结束时未确定的单元格只有上界，统一视为不可达
+        g_score[~closed] = np.inf
+        
+        return DistanceField(grid_map, g_score.reshape(grid_map.height, width), sources,
+                             None if cell_cost is None else cell_cost.reshape(grid_map.height, width))
+    
+    def _dijkstra(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Dijkstra算法"""
+        return self._array_search(start, goal, None)
+    
+    def _bidirectional_search(self, start: Tuple[int, int], goal: Tuple[int, int],
+                              heuristic_method: Optional[str]) -> Optional[List[Tuple[int, int]]]:
+        """
+        双向A*/Dijkstra搜索
+        
+        移动掩码对可通行单元格是对称的，反向搜索直接沿同一张图扩展。双向A*使用平均势函数
+        p(v) = (h(v, 终点) - h(起点, v)) / 2，正向键为 g + p，反向键为 g - p，
+        两侧的约化代价一致，因此与双向Dijkstra使用相同的停止条件：
+        两侧堆顶键之和不小于已知最短相遇路径代价mu时停止，结果与单向搜索代价相同。
+        每次扩展开放列表较小的一侧。
+        
+        平均势函数只有单向启发式一半的强度，双向A*并不总比A*扩展得少：
+        障碍物密集、启发式严重低估的地图上更少，开阔地图和田块地图上持平或更多
+        （benchmark的演示场景约多三成）。需要稳定少扩展时应使用A*；
+        双向Dijkstra在多数场景下比单向Dijkstra少扩展。
+        
+        Args:
+            start: 起点网格坐标
+            goal: 终点网格坐标
+            heuristic_method: 启发式函数方法（需一致），为None时为双向Dijkstra
+        
+        Returns:
+            路径点列表，如果失败返回None
+        """
+        grid_map = self.grid_map
+        width = grid_map.width
+        size = width * grid_map.height
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        start_idx = start_y * width + start_x
+        goal_idx = goal_y * width + goal_x
+        
+        move_mask = grid_map.move_mask.ravel()
+        index_moves = grid_map.index_moves
+        cell_cost = self._cell_cost_flat()
+        
+        # 势函数整表计算，与起点或终点不连通的单元格不会出现在最短路径上，取0
+        if heuristic_method is not None:
+            to_goal = grid_map.heuristic_table(goal, heuristic_method)
+            to_start = grid_map.heuristic_table(start, heuristic_method)
+            finite = np.isfinite(to_goal) & np.isfinite(to_start)
+            potential = np.zeros(size)
+            potential[finite] = (to_goal[finite] - to_start[finite]) / 2
+        else:
+            potential = np.zeros(size)
+        
+        g_forward = np.full(size, np.inf)
+        g_backward = np.full(size, np.inf)
+        parent_forward = np.full(size, -1, dtype=np.int64)
+        parent_backward = np.full(size, -1, dtype=np.int64)
+        closed_forward = np.zeros(size, dtype=bool)
+        closed_backward = np.zeros(size, dtype=bool)
+        
+        g_forward[start_idx] = 0.0
+        g_backward[goal_idx] = 0.0
+        heap_forward = [(float(potential[start_idx]), start_idx)]
+        heap_backward = [(-float(potential[goal_idx]), goal_idx)]
+        pushes = 2
+        
+        # 已知最短相遇路径的代价和相遇单元格
+        best_cost = 0.0 if start_idx == goal_idx else math.inf
+        meeting_idx = start_idx if start_idx == goal_idx else -1
+        
+        self.explored_nodes = 0
+        
+        while True:
+            # 惰性删除：丢弃已关闭单元格的过期堆元素
+            while heap_forward and closed_forward[heap_forward[0][1]]:
+                heapq.heappop(heap_forward)
+            while heap_backward and closed_backward[heap_backward[0][1]]:
+                heapq.heappop(heap_backward)
+            if not heap_forward or not heap_backward:
+                break
+            if heap_forward[0][0] + heap_backward[0][0] >= best_cost:
+                break
+            
+            if len(heap_forward) <= len(heap_backward):
+                heap, g_score, parent, closed, g_other, sign = (
+                    heap_forward, g_forward, parent_forward, closed_forward, g_backward, 1.0)
+            else:
+                heap, g_score, parent, closed, g_other, sign = (
+                    heap_backward, g_backward, parent_backward, closed_backward, g_forward, -1.0)
+            
+            _, idx = heapq.heappop(heap)
+            closed[idx] = True
+            self.explored_nodes += 1
+            current_g = float(g_score[idx])
+            
+            for offset, move_cost in index_moves[move_mask[idx]]:
+                n_idx = idx + offset
+                if closed[n_idx]:
+                    continue
+                
+                # 边代价对两端对称，反向搜索可直接使用
+                if cell_cost is not None:
+                    move_cost *= (float(cell_cost[idx]) + float(cell_cost[n_idx])) * 0.5
+                tentative_g = current_g + move_cost
+                if tentative_g < g_score[n_idx]:
+                    g_score[n_idx] = tentative_g
+                    parent[n_idx] = idx
+                    heapq.heappush(heap, (tentative_g + sign * float(potential[n_idx]), n_idx))
+                    pushes += 1
+                    
+                    # 另一侧已到达该单元格时更新最短相遇路径
+                    total = tentative_g + g_other[n_idx]
+                    if total < best_cost:
+                        best_cost = total
+                        meeting_idx = n_idx
+        
+        if self.instrumentation is not None:
+            self._record_heap_search(pushes, len(heap_forward) + len(heap_backward),
+                                     self.explored_nodes, closed_forward | closed_backward,
+                                     move_mask)
+        
+        if meeting_idx < 0:
+            return None
+        
+        path = self._reconstruct_path_from_indices(parent_forward, meeting_idx)
+        current = int(parent_backward[meeting_idx])
+        while current >= 0:
+            y, x = divmod(current, width)
+            path.append((x, y))
+            current = int(parent_backward[current])
+        return path
+    
+    def _ara_star(self, start: Tuple[int, int], goal: Tuple[int, int],
+                  heuristic_method: str, time_budget: Optional[float] = None,
+                  initial_epsilon: float = 3.0,
+                  epsilon_step: float = 0.5) -> Optional[List[Tuple[int, int]]]:
+        """
+        ARA*任意时间搜索
+        
+        先以放大initial_epsilon倍的启发式快速找到一条路径，之后逐步减小放大系数，
+        复用上一轮的g值，只重新扩展代价下降的单元格来改进路径，直到系数为1（最优）
+        或时间预算用完。每轮结束后按 min(epsilon, g(终点) / min(g + h)) 更新次优界，
+        其中min取自开放列表和本轮不一致的单元格。
+        
+        Args:
+            start: 起点网格坐标
+            goal: 终点网格坐标
+            heuristic_method: 启发式函数方法（需可采纳）
+            time_budget: 时间预算（秒），None表示一直改进到最优
+            initial_epsilon: 初始启发式放大系数
+            epsilon_step: 每轮放大系数的减小量
+        
+        Returns:
+            预算内找到的最优路径，一条路径都没找到时返回None
+        """
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        grid_map = self.grid_map
+        width = grid_map.width
+        size = width * grid_map.height
+        start_idx = start[1] * width + start[0]
+        goal_idx = goal[1] * width + goal[0]
+        goal_x, goal_y = goal
+        
+        move_mask = grid_map.move_mask.ravel()
+        index_moves = grid_map.index_moves
+        heuristic = grid_map.heuristic
+        cell_cost = self._cell_cost_flat()
+        
+        # 启发式按需计算并在各轮之间复用
+        h_table = None
+        if heuristic_method == "alt":
+            h_table = grid_map.landmark_heuristic(goal)
+            if h_table is None:
+                heuristic_method = "diagonal"
+        h_values = np.full(size, -1.0) if h_table is None else h_table
+        
+        def h(idx: int) -> float:
+            value = float(h_values[idx])
+            if value < 0:
+                y, x = divmod(idx, width)
+                value = heuristic(x, y, goal_x, goal_y, heuristic_method)
+                h_values[idx] = value
+            return value
+        
+        g_score = np.full(size, np.inf)
+        parent = np.full(size, -1, dtype=np.int64)
+        closed = np.zeros(size, dtype=bool)
+        g_score[start_idx] = 0.0
+        
+        open_set = {start_idx}
+        incons = set()
+        epsilon = initial_epsilon
+        best_path = None
+        self.suboptimality_bound = math.inf
+        self.explored_nodes = 0
+        
+        while True:
+            open_heap = [(float(g_score[i]) + epsilon * h(i), i) for i in open_set]
+            heapq.heapify(open_heap)
+            closed[:] = False
+            timed_out = False
             
-            for node_x, node_y in tree:
-                dist = math.sqrt((random_x - node_x) ** 2 + (random_y - node_y) ** 2)
-                if dist < nearest_dist:
-                    nearest_dist = dist
-                    nearest_node = (node_x, node_y)
+            while open_heap:
+                f, idx = open_heap[0]
+                # 惰性删除：跳过已出开放列表或键已过期的元素
+                if idx not in open_set or f != float(g_score[idx]) + epsilon * h(idx):
+                    heapq.heappop(open_heap)
+                    continue
+                if g_score[goal_idx] <= f:
+                    break
+                
+                heapq.heappop(open_heap)
+                open_set.discard(idx)
+                closed[idx] = True
+                self.explored_nodes += 1
+                
+                if (deadline is not None and self.explored_nodes % 256 == 0
+                        and time.perf_counter() > deadline):
+                    timed_out = True
+                    break
+                
+                current_g = float(g_score[idx])
+                for offset, move_cost in index_moves[move_mask[idx]]:
+                    n_idx = idx + offset
+                    if cell_cost is not None:
+                        move_cost *= (float(cell_cost[idx]) + float(cell_cost[n_idx])) * 0.5
+                    tentative_g = current_g + move_cost
+                    if tentative_g < g_score[n_idx]:
+                        g_score[n_idx] = tentative_g
+                        parent[n_idx] = idx
+                        if closed[n_idx]:
+                            # 本轮已扩展过的单元格留到下一轮
+                            incons.add(n_idx)
+                        else:
+                            open_set.add(n_idx)
+                            heapq.heappush(open_heap, (tentative_g + epsilon * h(n_idx), n_idx))
             
-            if nearest_node is None:
-                continue
+            if not math.isinf(g_score[goal_idx]):
+                # 中途超时时父节点链仍是一条代价不超过g(终点)的有效路径
+                best_path = self._reconstruct_path_from_indices(parent, goal_idx)
+            if timed_out or best_path is None:
+                break
             
-            # 沿着方向延伸步长距离
-            dx = random_x - nearest_node[0]
-            dy = random_y - nearest_node[1]
-            dist = math.sqrt(dx * dx + dy * dy)
+            goal_g = float(g_score[goal_idx])
+            lower = min((float(g_score[i]) + h(i) for i in open_set | incons), default=goal_g)
+            bound = goal_g / lower if lower > 0 else 1.0
+            self.suboptimality_bound = max(1.0, min(epsilon, bound))
             
-            if dist > 0:
-                dx = dx / dist * step_size
-                dy = dy / dist * step_size
-                
-                new_x = int(nearest_node[0] + dx)
-                new_y = int(nearest_node[1] + dy)
-            else:
-                new_x, new_y = nearest_node
+            if self.suboptimality_bound <= 1.0 or epsilon <= 1.0:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            
+            epsilon = max(1.0, epsilon - epsilon_step)
+            open_set |= incons
+            incons = set()
+        
+        return best_path
+    
+    def _rrt(self, start: Tuple[int, int], goal: Tuple[int, int],
+             max_iterations: int = 5000, step_size: int = 10) -> Optional[List[Tuple[int, int]]]:
+        """RRT算法"""
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        rng = random.Random(self.seed)
+        
+        # 树节点保存在空间索引中，parents[i]为节点i的父节点编号
+        tree = SpatialHash(step_size)
+        tree.insert(start_x, start_y)
+        parents = [-1]
+        
+        self.explored_nodes = 0
+        
+        for _ in range(max_iterations):
+            self.explored_nodes += 1
+            
+            random_x, random_y = self._sample(rng, goal_x, goal_y)
+            
+            # 找到最近的树节点
+            nearest_id = tree.nearest(random_x, random_y)
+            nearest_node = (tree.xs[nearest_id], tree.ys[nearest_id])
+            new_x, new_y = self._steer(nearest_node, (random_x, random_y), step_size)
             
             # 检查新节点是否有效
             if not self.grid_map.is_valid(new_x, new_y):
@@ -449,69 +2526,804 @@ class PathPlanner:
                 continue
             
             # 添加到树
-            tree.append((new_x, new_y))
-            parents[(new_x, new_y)] = nearest_node
+            new_id = tree.insert(new_x, new_y)
+            parents.append(nearest_id)
             
             # 检查是否到达目标
             dist_to_goal = math.sqrt((new_x - goal_x) ** 2 + (new_y - goal_y) ** 2)
             if dist_to_goal < step_size:
                 # 连接到目标
                 if not self._line_collision_check(new_x, new_y, goal_x, goal_y):
-                    parents[(goal_x, goal_y)] = (new_x, new_y)
-                    return self._reconstruct_path_from_parents(parents, (goal_x, goal_y))
+                    return self._reconstruct_tree_path(tree, parents, new_id, (goal_x, goal_y))
         
         return None
     
-    def _rrt_star(self, max_iterations: int = 5000, step_size: int = 10, 
+    def _rrt_star(self, start: Tuple[int, int], goal: Tuple[int, int],
+                  max_iterations: int = 5000, step_size: int = 10,
                   search_radius: float = 20.0) -> Optional[List[Tuple[int, int]]]:
-        """RRT*算法"""
-        # RRT* 的实现比RRT更复杂，这里提供简化版本
-        return self._rrt(max_iterations, step_size)
+        """
+        RRT*算法
+        
+        新节点在邻域内选择代价最小的父节点，并尝试以新节点重连邻域内的
+        节点；用完全部迭代次数后返回到达终点的最优路径。邻域半径随树的
+        规模按 gamma * sqrt(log(n) / n) 收缩，并限制在
+        [step_size, search_radius] 之间。
+        """
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        rng = random.Random(self.seed)
+        
+        tree = SpatialHash(search_radius)
+        tree.insert(start_x, start_y)
+        occupied = {(start_x, start_y)}
+        parents = [-1]
+        costs = [0.0]
+        children: List[List[int]] = [[]]
+        goal_candidates = []  # 可直接连接终点的节点编号
+        
+        # 二维情形下的RRT*邻域常数
+        gamma = 2.0 * math.sqrt(1.5) * math.sqrt(
+            self.grid_map.width * self.grid_map.height / math.pi
+        )
+        
+        self.explored_nodes = 0
+        
+        for _ in range(max_iterations):
+            self.explored_nodes += 1
+            
+            random_x, random_y = self._sample(rng, goal_x, goal_y)
+            
+            nearest_id = tree.nearest(random_x, random_y)
+            nearest_node = (tree.xs[nearest_id], tree.ys[nearest_id])
+            new_x, new_y = self._steer(nearest_node, (random_x, random_y), step_size)
+            
+            # 同一单元格只保留一个树节点
+            if (new_x, new_y) in occupied or not self.grid_map.is_valid(new_x, new_y):
+                continue
+            if self._line_collision_check(nearest_node[0], nearest_node[1], new_x, new_y):
+                continue
+            
+            n = len(tree)
+            radius = min(search_radius,
+                         max(step_size, gamma * math.sqrt(math.log(n + 1) / (n + 1))))
+            near_ids = tree.within(new_x, new_y, radius)
+            
+            # 按经由各邻域节点的代价从小到大检查，第一个无碰撞的即为最优父节点
+            best_parent = nearest_id
+            best_cost = costs[nearest_id] + math.hypot(new_x - nearest_node[0],
+                                                       new_y - nearest_node[1])
+            candidates = sorted(
+                (costs[i] + math.hypot(new_x - tree.xs[i], new_y - tree.ys[i]), i)
+                for i in near_ids
+            )
+            for cost, near_id in candidates:
+                if cost >= best_cost:
+                    break
+                if not self._line_collision_check(tree.xs[near_id], tree.ys[near_id],
+                                                  new_x, new_y):
+                    best_parent = near_id
+                    best_cost = cost
+                    break
+            
+            new_id = tree.insert(new_x, new_y)
+            occupied.add((new_x, new_y))
+            parents.append(best_parent)
+            costs.append(best_cost)
+            children.append([])
+            children[best_parent].append(new_id)
+            
+            # 重连：经由新节点到达更近的邻域节点
+            for near_id in near_ids:
+                if near_id == best_parent:
+                    continue
+                near_x, near_y = tree.xs[near_id], tree.ys[near_id]
+                cost = best_cost + math.hypot(near_x - new_x, near_y - new_y)
+                if cost < costs[near_id] and not self._line_collision_check(
+                        new_x, new_y, near_x, near_y):
+                    children[parents[near_id]].remove(near_id)
+                    parents[near_id] = new_id
+                    children[new_id].append(near_id)
+                    self._propagate_cost(tree, costs, children, near_id, cost)
+            
+            dist_to_goal = math.hypot(new_x - goal_x, new_y - goal_y)
+            if dist_to_goal < step_size and not self._line_collision_check(
+                    new_x, new_y, goal_x, goal_y):
+                goal_candidates.append(new_id)
+        
+        if not goal_candidates:
+            return None
+        
+        # 重连会改变节点代价，因此在最后选择到达终点的最优节点
+        best_id = min(goal_candidates,
+                      key=lambda i: costs[i] + math.hypot(tree.xs[i] - goal_x,
+                                                          tree.ys[i] - goal_y))
+        return self._reconstruct_tree_path(tree, parents, best_id, (goal_x, goal_y))
     
-    def _theta_star(self, heuristic_method: str) -> Optional[List[Tuple[int, int]]]:
-        """Theta*算法"""
-        # Theta* 的实现比A*更复杂，这里提供简化版本
-        return self._astar(heuristic_method)
+    def _d_star(self, start: Tuple[int, int], goal: Tuple[int, int],
+                heuristic_method: str) -> Optional[List[Tuple[int, int]]]:
+        """
+        D* Lite算法
+        
+        终点和启发式不变时复用上一次的搜索状态，只修复地图变化和
+        起点移动带来的影响。
+        """
+        planner = self._d_star_lite
+        
+        if (planner is None or planner.goal != goal or
+                planner.heuristic_method != heuristic_method):
+            if planner is not None:
+                planner.detach()
+            planner = DStarLite(self.grid_map, goal, heuristic_method)
+            self._d_star_lite = planner
+        
+        path = planner.plan(start)
+        self.explored_nodes = planner.explored_nodes
+        return path
     
-    def _line_collision_check(self, x1: int, y1: int, x2: int, y2: int) -> bool:
-        """检查直线路径是否有碰撞"""
-        dx = abs(x2 - x1)
-        dy = abs(y2 - y1)
+    def configure_lattice(self, wheel_base: float = 0.5, turn_radius: float = 1.0):
+        """
+        设置状态栅格规划使用的底盘参数
+        
+        Args:
+            wheel_base: 轮距（米），与DifferentialDriveController的wheel_base一致
+            turn_radius: 最小转弯半径（米）
+        """
+        self.lattice = StateLattice.cached(self.grid_map.resolution, wheel_base, turn_radius)
+        # 缓存键不含底盘参数，参数变化后旧的栅格路径不再适用
+        self.clear_cache()
+    
+    def plan_lattice(self, start: Tuple[int, int], goal: Tuple[int, int],
+                     start_heading: Optional[float] = None,
+                     goal_heading: Optional[float] = None) -> Optional[List[Tuple[float, float, float]]]:
+        """
+        状态栅格规划，返回底盘可连续行驶的位姿序列
+        
+        Args:
+            start: 起点网格坐标
+            goal: 终点网格坐标
+            start_heading: 起点朝向（弧度），默认朝向终点；吸附到最近的栅格朝向，
+                           返回的第一个位姿即为吸附后的朝向
+            goal_heading: 终点朝向（弧度），默认不限
+        
+        Returns:
+            [(x, y, theta)] 网格坐标下的位姿序列（相邻位姿间距不超过1/4单元格），失败返回None
+        """
+        start_time = time.perf_counter()
+        with self._phase("search"):
+            poses = self._lattice_search(start, goal, start_heading, goal_heading)
+        self._count("expanded", self.explored_nodes)
+        self._flush_instrumentation()
+        self.planning_time = time.perf_counter() - start_time
+        self.last_path = self._poses_to_cells(poses) if poses else []
+        return poses
+    
+    def _state_lattice(self, start: Tuple[int, int],
+                       goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """状态栅格规划（起点朝向终点，终点朝向不限），返回位姿经过的单元格"""
+        poses = self._lattice_search(start, goal)
+        return self._poses_to_cells(poses) if poses else None
+    
+    def _lattice_search(self, start: Tuple[int, int], goal: Tuple[int, int],
+                        start_heading: Optional[float] = None,
+                        goal_heading: Optional[float] = None) -> Optional[List[Tuple[float, float, float]]]:
+        """
+        状态栅格上的A*搜索
         
-        sx = 1 if x1 < x2 else -1
-        sy = 1 if y1 < y2 else -1
+        状态编码为 单元格扁平索引 * 航向数 + 航向序号，状态空间远大于网格但实际扩展稀疏，
+        g值和父节点用字典保存。基元的碰撞检测是对其扫过单元格扁平偏移的一次NumPy取值，
+        代价为基元长度乘以扫过单元格的平均代价系数。启发式为欧氏距离（基元长度不短于其弦长）。
+        """
+        grid_map = self.grid_map
+        if self.lattice is None or self.lattice.resolution != grid_map.resolution:
+            self.lattice = StateLattice.cached(grid_map.resolution)
+        lattice = self.lattice
         
-        err = dx - dy
-        x, y = x1, y1
+        width, height = grid_map.width, grid_map.height
+        heading_count = lattice.heading_count
+        expansions = lattice.expansions(width)
+        blocked = grid_map.blocked_cells().ravel()
+        cell_cost = self._cell_cost_flat()
         
-        while True:
-            if self.grid_map.is_obstacle(x, y):
-                return True
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        goal_idx = goal_y * width + goal_x
+        if start_heading is None:
+            start_heading = math.atan2(goal_y - start_y, goal_x - start_x)
+        goal_h = None if goal_heading is None else lattice.nearest_heading(goal_heading)
+        
+        start_key = (start_y * width + start_x) * heading_count + lattice.nearest_heading(start_heading)
+        g_score = {start_key: 0.0}
+        # 状态 -> (父状态, 基元序号)
+        parent: Dict[int, Tuple[int, int]] = {}
+        closed = set()
+        start_h = math.hypot(goal_x - start_x, goal_y - start_y)
+        open_heap = [(start_h, start_h, start_key)]
+        pushes = 1
+        primitive_checks = 0
+        poses = None
+        
+        self.explored_nodes = 0
+        
+        while open_heap:
+            _, _, key = heapq.heappop(open_heap)
+            if key in closed:
+                continue
+            closed.add(key)
+            self.explored_nodes += 1
             
-            if x == x2 and y == y2:
+            idx, heading = divmod(key, heading_count)
+            if idx == goal_idx and (goal_h is None or heading == goal_h):
+                poses = self._reconstruct_lattice_path(parent, key)
                 break
             
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x += sx
-            if e2 < dx:
-                err += dx
-                y += sy
+            y, x = divmod(idx, width)
+            current_g = g_score[key]
+            
+            for i, primitive, offsets, bbox in expansions[heading]:
+                primitive_checks += 1
+                if (x + bbox[0] < 0 or y + bbox[1] < 0 or
+                        x + bbox[2] >= width or y + bbox[3] >= height):
+                    continue
+                swept = idx + offsets
+                if blocked[swept].any():
+                    continue
+                
+                move_cost = primitive.length
+                if cell_cost is not None:
+                    move_cost *= float(cell_cost[swept].mean())
+                
+                n_x, n_y = x + primitive.dx, y + primitive.dy
+                n_key = (n_y * width + n_x) * heading_count + primitive.end_heading
+                if n_key in closed:
+                    continue
+                
+                tentative_g = current_g + move_cost
+                if tentative_g < g_score.get(n_key, math.inf):
+                    g_score[n_key] = tentative_g
+                    parent[n_key] = (key, i)
+                    h = math.hypot(goal_x - n_x, goal_y - n_y)
+                    heapq.heappush(open_heap, (tentative_g + h, h, n_key))
+                    pushes += 1
         
-        return False
+        self._record_heap_search(pushes, len(open_heap), self.explored_nodes)
+        self._count("neighbor_checks", primitive_checks)
+        return poses
     
-    def _reconstruct_path(self, goal_node: Node) -> List[Tuple[int, int]]:
-        """从终点节点重构路径"""
-        path = []
-        current = goal_node
+    def _reconstruct_lattice_path(self, parent: Dict[int, Tuple[int, int]],
+                                  key: int) -> List[Tuple[float, float, float]]:
+        """沿父状态回溯，拼接各基元平移到所在单元格后的采样位姿"""
+        with self._phase("reconstruction"):
+            lattice = self.lattice
+            width = self.grid_map.width
+            segments = []
+            
+            while key in parent:
+                previous, i = parent[key]
+                idx, heading = divmod(previous, lattice.heading_count)
+                y, x = divmod(idx, width)
+                segments.append(lattice.primitives[heading][i].poses + (x, y, 0.0))
+                key = previous
+            
+            # 起点位姿取搜索实际使用的吸附朝向，与第一段基元的起始朝向一致
+            idx, heading = divmod(key, lattice.heading_count)
+            y, x = divmod(idx, width)
+            poses = [(float(x), float(y), lattice.angles[heading])]
+            for segment in reversed(segments):
+                poses.extend(tuple(map(float, pose)) for pose in segment[1:])
+            return poses
+    
+    @staticmethod
+    def _poses_to_cells(poses: List[Tuple[float, float, float]]) -> List[Tuple[int, int]]:
+        """位姿序列经过的单元格（去除连续重复）"""
+        cells = []
+        for x, y, _ in poses:
+            cell = (math.floor(x + 0.5), math.floor(y + 0.5))
+            if not cells or cells[-1] != cell:
+                cells.append(cell)
+        return cells
+    
+    def _sample(self, rng: random.Random, goal_x: int, goal_y: int) -> Tuple[int, int]:
+        """随机采样点，10%概率直接采样目标点"""
+        if rng.random() < 0.1:
+            return goal_x, goal_y
+        return (rng.randint(0, self.grid_map.width - 1),
+                rng.randint(0, self.grid_map.height - 1))
+    
+    def _steer(self, from_node: Tuple[int, int], to_point: Tuple[int, int],
+               step_size: int) -> Tuple[int, int]:
+        """从from_node沿着to_point方向延伸步长距离"""
+        dx = to_point[0] - from_node[0]
+        dy = to_point[1] - from_node[1]
+        dist = math.sqrt(dx * dx + dy * dy)
         
-        while current:
-            path.append((current.x, current.y))
-            current = current.parent
+        if dist > 0:
+            dx = dx / dist * step_size
+            dy = dy / dist * step_size
+            return int(from_node[0] + dx), int(from_node[1] + dy)
+        return from_node
+    
+    def _propagate_cost(self, tree: SpatialHash, costs: List[float],
+                        children: List[List[int]], node_id: int, cost: float):
+        """重连后更新节点及其全部子孙节点的代价"""
+        stack = [(node_id, cost)]
+        while stack:
+            current, current_cost = stack.pop()
+            costs[current] = current_cost
+            for child in children[current]:
+                child_cost = current_cost + math.hypot(tree.xs[child] - tree.xs[current],
+                                                       tree.ys[child] - tree.ys[current])
+                stack.append((child, child_cost))
+    
+    def _reconstruct_tree_path(self, tree: SpatialHash, parents: List[int],
+                               last_id: int, goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """从树节点编号重构路径并连接终点"""
+        path = [goal]
+        current = last_id
+        
+        while current >= 0:
+            node = (tree.xs[current], tree.ys[current])
+            if node != path[-1]:
+                path.append(node)
+            current = parents[current]
         
         return path[::-1]  # 反转路径
     
+    def _theta_star(self, start: Tuple[int, int], goal: Tuple[int, int],
+                    heuristic_method: str) -> Optional[List[Tuple[int, int]]]:
+        """
+        Theta*算法（Lazy Theta*，任意角度路径）
+        
+        在数组搜索核心上实现：生成邻居时先乐观地假设它与当前节点的父节点
+        视线可达并直接继承该父节点，出堆时才做一次视线检测，不可达时再从
+        已关闭的相邻节点中选择父节点。因此一次搜索即可得到无需再平滑的
+        任意角度路径，同一次搜索内视线检测结果按 (父节点, 单元格) 缓存。
+        """
+        grid_map = self.grid_map
+        width = grid_map.width
+        size = width * grid_map.height
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        start_idx = start_y * width + start_x
+        goal_idx = goal_y * width + goal_x
+        
+        g_score = np.full(size, np.inf)
+        parent = np.full(size, -1, dtype=np.int64)
+        closed = np.zeros(size, dtype=bool)
+        
+        move_mask = grid_map.move_mask.ravel()
+        index_moves = grid_map.index_moves
+        heuristic = grid_map.heuristic
+        line_of_sight = self._line_of_sight
+        blocked = grid_map.blocked_cells().ravel()
+        los_cache: Dict[Tuple[int, int], bool] = {}
+        
+        g_score[start_idx] = 0.0
+        parent[start_idx] = start_idx
+        start_h = heuristic(start_x, start_y, goal_x, goal_y, heuristic_method)
+        open_heap = [(start_h, start_h, start_idx)]
+        pushes = 1
+        los_cache_hits = 0
+        path = None
+        
+        self.explored_nodes = 0
+        
+        while open_heap:
+            _, _, idx = heapq.heappop(open_heap)
+            
+            if closed[idx]:
+                continue
+            closed[idx] = True
+            self.explored_nodes += 1
+            
+            y, x = divmod(idx, width)
+            parent_idx = int(parent[idx])
+            
+            # 延迟的视线检测：父节点不可见时改从已关闭的相邻节点中选择父节点
+            if parent_idx != idx:
+                key = (parent_idx, idx)
+                visible = los_cache.get(key)
+                if visible is None:
+                    py, px = divmod(parent_idx, width)
+                    visible = line_of_sight(px, py, x, y, blocked)
+                    los_cache[key] = visible
+                else:
+                    los_cache_hits += 1
+                
+                if not visible:
+                    best_g = np.inf
+                    for offset, move_cost in index_moves[move_mask[idx]]:
+                        n_idx = idx + offset
+                        if closed[n_idx] and g_score[n_idx] + move_cost < best_g:
+                            best_g = g_score[n_idx] + move_cost
+                            parent_idx = n_idx
+                    g_score[idx] = best_g
+                    parent[idx] = parent_idx
+            
+            if idx == goal_idx:
+                parent[start_idx] = -1
+                path = self._reconstruct_path_from_indices(parent, goal_idx)
+                break
+            
+            # 邻居乐观地继承当前节点的父节点
+            parent_g = float(g_score[parent_idx])
+            py, px = divmod(parent_idx, width)
+            
+            for offset, _ in index_moves[move_mask[idx]]:
+                n_idx = idx + offset
+                if closed[n_idx]:
+                    continue
+                
+                ny, nx = divmod(n_idx, width)
+                tentative_g = parent_g + math.hypot(nx - px, ny - py)
+                
+                if tentative_g < g_score[n_idx]:
+                    g_score[n_idx] = tentative_g
+                    parent[n_idx] = parent_idx
+                    h = heuristic(nx, ny, goal_x, goal_y, heuristic_method)
+                    heapq.heappush(open_heap, (tentative_g + h, h, n_idx))
+                    pushes += 1
+        
+        self._record_heap_search(pushes, len(open_heap), self.explored_nodes, closed, move_mask)
+        self._count("los_cache_hits", los_cache_hits)
+        return path
+    
+    def _jps(self, start: Tuple[int, int], goal: Tuple[int, int],
+             heuristic_method: str) -> Optional[List[Tuple[int, int]]]:
+        """
+        跳点搜索（Jump Point Search）
+        
+        适用于均匀代价的8连通网格，与get_neighbors一样禁止对角线穿越
+        障碍物角点。沿直线和对角线方向跳过对称路径，只把跳点放入开放列表，
+        最后把跳点之间的直线段展开为逐格路径，路径长度与A*相同。
+        """
+        grid_map = self.grid_map
+        goal_x, goal_y = goal
+        heuristic = grid_map.heuristic
+        
+        # 外扩一圈的可通行表，walk[y + 1][x + 1]，地图外为障碍物
+        walk = grid_map._free_region(-1, -1, grid_map.width, grid_map.height).tolist()
+        
+        def jump_straight(x: int, y: int, dx: int, dy: int) -> Optional[Tuple[int, int]]:
+            """沿直线方向跳跃，返回跳点或None"""
+            while True:
+                if not walk[y + 1][x + 1]:
+                    return None
+                if x == goal_x and y == goal_y:
+                    return x, y
+                if dx:
+                    # 上下方可通行而其后方被挡住时存在强制邻居
+                    if ((walk[y][x + 1] and not walk[y][x + 1 - dx]) or
+                            (walk[y + 2][x + 1] and not walk[y + 2][x + 1 - dx])):
+                        return x, y
+                else:
+                    if ((walk[y + 1][x] and not walk[y + 1 - dy][x]) or
+                            (walk[y + 1][x + 2] and not walk[y + 1 - dy][x + 2])):
+                        return x, y
+                x += dx
+                y += dy
+        
+        def jump(x: int, y: int, dx: int, dy: int) -> Optional[Tuple[int, int]]:
+            """沿方向 (dx, dy) 跳跃，返回跳点或None"""
+            if not (dx and dy):
+                return jump_straight(x, y, dx, dy)
+            
+            while True:
+                if not walk[y + 1][x + 1]:
+                    return None
+                if x == goal_x and y == goal_y:
+                    return x, y
+                # 对角线移动时，水平或垂直方向上存在跳点则当前点为跳点
+                if jump_straight(x + dx, y, dx, 0) or jump_straight(x, y + dy, 0, dy):
+                    return x, y
+                # 两侧均可通行才能继续沿对角线移动
+                if not (walk[y + 1][x + 1 + dx] and walk[y + 1 + dy][x + 1]):
+                    return None
+                x += dx
+                y += dy
+        
+        def pruned_directions(x: int, y: int, dx: int, dy: int) -> List[Tuple[int, int]]:
+            """根据来向裁剪后的搜索方向"""
+            directions = []
+            if dx and dy:
+                walk_y = walk[y + 1 + dy][x + 1]
+                walk_x = walk[y + 1][x + 1 + dx]
+                if walk_y:
+                    directions.append((0, dy))
+                if walk_x:
+                    directions.append((dx, 0))
+                if walk_x and walk_y:
+                    directions.append((dx, dy))
+            elif dx:
+                walk_next = walk[y + 1][x + 1 + dx]
+                walk_down = walk[y + 2][x + 1]
+                walk_up = walk[y][x + 1]
+                if walk_next:
+                    directions.append((dx, 0))
+                    if walk_down:
+                        directions.append((dx, 1))
+                    if walk_up:
+                        directions.append((dx, -1))
+                if walk_down:
+                    directions.append((0, 1))
+                if walk_up:
+                    directions.append((0, -1))
+            else:
+                walk_next = walk[y + 1 + dy][x + 1]
+                walk_right = walk[y + 1][x + 2]
+                walk_left = walk[y + 1][x]
+                if walk_next:
+                    directions.append((0, dy))
+                    if walk_right:
+                        directions.append((1, dy))
+                    if walk_left:
+                        directions.append((-1, dy))
+                if walk_right:
+                    directions.append((1, 0))
+                if walk_left:
+                    directions.append((-1, 0))
+            return directions
+        
+        g_score = {start: 0.0}
+        parents: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {start: None}
+        closed = set()
+        start_h = heuristic(start[0], start[1], goal_x, goal_y, heuristic_method)
+        open_heap = [(start_h, start_h, start)]
+        
+        self.explored_nodes = 0
+        
+        while open_heap:
+            _, _, node = heapq.heappop(open_heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            self.explored_nodes += 1
+            
+            if node == goal:
+                return self._expand_jump_points(
+                    self._reconstruct_path_from_parents(parents, goal)
+                )
+            
+            x, y = node
+            parent = parents[node]
+            if parent is None:
+                directions = [(nx - x, ny - y) for nx, ny in grid_map.get_neighbors(x, y)]
+            else:
+                dx = (x > parent[0]) - (x < parent[0])
+                dy = (y > parent[1]) - (y < parent[1])
+                directions = pruned_directions(x, y, dx, dy)
+            
+            current_g = g_score[node]
+            for dx, dy in directions:
+                jump_point = jump(x + dx, y + dy, dx, dy)
+                if jump_point is None or jump_point in closed:
+                    continue
+                
+                # 跳点与当前节点位于同一直线或对角线上
+                steps = max(abs(jump_point[0] - x), abs(jump_point[1] - y))
+                move_cost = steps * (grid_map.diagonal_cost if dx and dy else 1.0)
+                tentative_g = current_g + move_cost
+                
+                if tentative_g < g_score.get(jump_point, math.inf):
+                    g_score[jump_point] = tentative_g
+                    parents[jump_point] = node
+                    h = heuristic(jump_point[0], jump_point[1], goal_x, goal_y,
+                                  heuristic_method)
+                    heapq.heappush(open_heap, (tentative_g + h, h, jump_point))
+        
+        return None
+    
+    def _expand_jump_points(self, jump_points: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """把跳点之间的直线或对角线段展开为逐格路径"""
+        path = jump_points[:1]
+        for x2, y2 in jump_points[1:]:
+            x, y = path[-1]
+            dx = (x2 > x) - (x2 < x)
+            dy = (y2 > y) - (y2 < y)
+            while (x, y) != (x2, y2):
+                x += dx
+                y += dy
+                path.append((x, y))
+        return path
+    
+    @staticmethod
+    def _supercover_cells(x1: int, y1: int, x2: int, y2: int):
+        """
+        逐个产生两单元格中心连线经过的全部单元格（超覆盖）
+        
+        与线段有任何接触（含仅在角点接触）的单元格都会产生，因此线段恰好
+        穿过单元格角点时两侧单元格都要检查，与A*的对角移动不切角规则一致。
+        沿主轴逐列用整数运算求出线段在该列的副轴范围。
+        """
+        dx = x2 - x1
+        dy = y2 - y1
+        x_major = abs(dx) >= abs(dy)
+        steps = max(abs(dx), abs(dy))
+        if steps == 0:
+            yield x1, y1
+            return
+        sign = 1 if (dx if x_major else dy) > 0 else -1
+        minor = dy if x_major else dx
+        denominator = 2 * steps
+        
+        for i in range(steps + 1):
+            # 本列覆盖主轴[i-0.5, i+0.5]与线段的交集（以1/2为单位）
+            low = minor * max(2 * i - 1, 0)
+            high = minor * min(2 * i + 1, denominator)
+            if low > high:
+                low, high = high, low
+            for j in range(-((steps - low) // denominator),
+                           (high + steps) // denominator + 1):
+                if x_major:
+                    yield x1 + sign * i, y1 + j
+                else:
+                    yield x1 + j, y1 + sign * i
+    
+    def _supercover_indices(self, starts: np.ndarray,
+                            ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        _supercover_cells的向量化版本
+        
+        每列取左、右列边界处所在行的单元格，斜率恰为1时再加中间的对角单元格，
+        单元格可能重复出现。
+        
+        Returns:
+            (segment, indices) 每个单元格所属的线段编号及其扁平索引
+        """
+        x1, y1 = starts[:, 0], starts[:, 1]
+        dx = ends[:, 0] - x1
+        dy = ends[:, 1] - y1
+        x_major = np.abs(dx) >= np.abs(dy)
+        steps = np.maximum(np.abs(dx), np.abs(dy))
+        width = self.grid_map.width
+        major_stride = np.where(x_major, np.sign(dx), np.sign(dy) * width)
+        minor_stride = np.where(x_major, np.sign(dy) * width, np.sign(dx))
+        minor = np.abs(np.where(x_major, dy, dx))
+        
+        # 每列所属的线段及其在线段内的序号
+        counts = steps + 1
+        segment = np.repeat(np.arange(len(starts)), counts)
+        i = np.arange(counts.sum()) - (np.cumsum(counts) - counts)[segment]
+        seg_steps = steps[segment]
+        seg_minor = minor[segment]
+        denominator = np.maximum(2 * seg_steps, 1)
+        
+        first = (seg_minor * np.maximum(2 * i - 1, 0) + seg_steps - 1) // denominator
+        last = (seg_minor * np.minimum(2 * i + 1, 2 * seg_steps) + seg_steps) // denominator
+        middle = np.where(seg_minor == seg_steps, i, first)
+        
+        column = (y1 * width + x1)[segment] + major_stride[segment] * i
+        seg_minor_stride = minor_stride[segment]
+        indices = np.concatenate([column + seg_minor_stride * first,
+                                  column + seg_minor_stride * last,
+                                  column + seg_minor_stride * middle])
+        return np.tile(segment, 3), indices
+    
+    def _line_of_sight(self, x1: int, y1: int, x2: int, y2: int,
+                       blocked: Optional[np.ndarray] = None) -> bool:
+        """
+        检查两个单元格之间视线是否无遮挡
+        
+        线段经过的全部单元格（超覆盖，含角点接触）都须无障碍，因此视线
+        不会从两个对角障碍物之间挤过，与A*/JPS的移动规则一致。长线段
+        一次性从网格中取值判断。两端点须在地图内。
+        
+        Args:
+            blocked: 可选的扁平障碍物布尔数组，多次调用时可预先计算复用
+        """
+        if blocked is None:
+            blocked = self.grid_map.blocked_cells().ravel()
+        if self.instrumentation is not None:
+            self.instrumentation.count("los_checks")
+        
+        dx = x2 - x1
+        dy = y2 - y1
+        steps = max(abs(dx), abs(dy))
+        width = self.grid_map.width
+        if abs(dx) >= abs(dy):
+            major_stride, minor_stride, minor = (1 if dx > 0 else -1), width, dy
+        else:
+            major_stride, minor_stride, minor = (width if dy > 0 else -width), 1, dx
+        if minor < 0:
+            minor_stride, minor = -minor_stride, -minor
+        base = y1 * width + x1
+        if steps == 0:
+            return not blocked[base]
+        
+        if steps <= 32:
+            # 整数增量遍历：以1/(2*steps)格为单位，row为当前副轴行，
+            # 线段越过行边界(2*row+1)*steps时进入下一行；恰好在列边界越过
+            # 时为角点接触，两侧单元格都检查
+            row = 0
+            for i in range(steps + 1):
+                column = base + major_stride * i
+                if blocked[column + minor_stride * row]:
+                    return False
+                high = minor * min(2 * i + 1, 2 * steps)
+                while (2 * row + 1) * steps < high:
+                    row += 1
+                    if blocked[column + minor_stride * row]:
+                        return False
+                if (2 * row + 1) * steps == high and blocked[column + minor_stride * (row + 1)]:
+                    return False
+            return True
+        
+        # 每列经过左、右列边界处所在行之间的单元格（至多2个）；斜率恰为1时
+        # 每列还经过中间的对角单元格
+        denominator = 2 * steps
+        edge = np.arange(-1, denominator + 2, 2)
+        np.clip(edge, 0, denominator, out=edge)
+        edge *= minor
+        first = (edge[:-1] + (steps - 1)) // denominator
+        last = (edge[1:] + steps) // denominator
+        column = np.arange(steps + 1) * major_stride + base
+        if blocked[column + minor_stride * first].any() or \
+                blocked[column + minor_stride * last].any():
+            return False
+        if minor == steps:
+            return not blocked[column + minor_stride * np.arange(steps + 1)].any()
+        return True
+    
+    def batch_line_of_sight(self, starts, ends,
+                            blocked: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        批量视线检测
+        
+        把全部线段一次性展开为超覆盖单元格索引数组（与_line_of_sight、
+        _line_collision_check相同的规则），用一次取值判断所有线段是否
+        穿过障碍物。端点须在地图内。
+        
+        Args:
+            starts: N x 2 起点网格坐标
+            ends: N x 2 终点网格坐标
+            blocked: 可选的扁平障碍物布尔数组
+        
+        Returns:
+            长度为N的布尔数组，True表示视线无遮挡
+        """
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.int64).reshape(-1, 2)
+        if len(starts) == 0:
+            return np.zeros(0, dtype=bool)
+        if blocked is None:
+            blocked = self.grid_map.blocked_cells().ravel()
+        self._count("los_checks", len(starts))
+        self._count("los_batches")
+        
+        segment, indices = self._supercover_indices(starts, ends)
+        hits = np.bincount(segment, weights=blocked[indices], minlength=len(starts))
+        return hits == 0
+    
+    def _line_collision_check(self, x1: int, y1: int, x2: int, y2: int) -> bool:
+        """
+        检查直线路径是否有碰撞
+        
+        逐格检查与_line_of_sight相同的超覆盖单元格（含两端点），
+        经过地图外或不可通行的单元格即视为碰撞。
+        """
+        if self.instrumentation is not None:
+            self.instrumentation.count("los_checks")
+        
+        for x, y in self._supercover_cells(x1, y1, x2, y2):
+            if not self.grid_map.is_valid(x, y):
+                return True
+        
+        return False
+    
+    def _reconstruct_path_from_indices(self, parent: np.ndarray,
+                                       goal_idx: int) -> List[Tuple[int, int]]:
+        """从扁平索引父节点数组重构路径"""
+        with self._phase("reconstruction"):
+            width = self.grid_map.width
+            path = []
+            current = goal_idx
+            
+            while current >= 0:
+                y, x = divmod(current, width)
+                path.append((x, y))
+                current = int(parent[current])
+            
+            return path[::-1]  # 反转路径
+    
     def _reconstruct_path_from_parents(self, parents: Dict, goal: Tuple[int, int]) -> List[Tuple[int, int]]:
         """从父节点字典重构路径"""
         path = []
@@ -523,11 +3335,31 @@ class PathPlanner:
         
         return path[::-1]  # 反转路径
     
-    def smooth_path(self, path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        """路径平滑化"""
+    def smooth_path(self, path: List[Tuple[int, int]],
+                    mode: str = "linear") -> List[Tuple[int, int]]:
+        """
+        路径平滑化
+        
+        Args:
+            path: 路径点列表
+            mode: "linear" 从每个锚点依次检查后续路径点；
+                  "exponential" 用批量视线检测按指数步长探测、再二分查找
+                  最远可见点，长路径上接近线性时间
+        """
         if len(path) <= 2:
             return path
         
+        with self._phase("smoothing"):
+            if mode == "exponential":
+                smoothed_path = self._smooth_path_exponential(path)
+            else:
+                smoothed_path = self._smooth_path_linear(path)
+        self._flush_instrumentation()
+        
+        return smoothed_path
+    
+    def _smooth_path_linear(self, path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """从每个锚点依次检查后续路径点的路径平滑"""
         smoothed_path = [path[0]]
         current_idx = 0
         
@@ -549,6 +3381,55 @@ class PathPlanner:
         
         return smoothed_path
     
+    def _smooth_path_exponential(self, path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """指数探测加二分查找的路径平滑"""
+        blocked = self.grid_map.blocked_cells().ravel()
+        points = np.asarray(path, dtype=np.int64)
+        last = len(path) - 1
+        
+        smoothed_path = [path[0]]
+        current_idx = 0
+        
+        while current_idx < last:
+            # 以1, 2, 4, ...为步长的候选点，外加终点，一次批量检测
+            candidates = []
+            step = 1
+            while current_idx + step < last:
+                candidates.append(current_idx + step)
+                step *= 2
+            candidates.append(last)
+            
+            visible = self.batch_line_of_sight(
+                np.repeat(points[current_idx:current_idx + 1], len(candidates), axis=0),
+                points[candidates], blocked
+            )
+            
+            farthest_idx = current_idx + 1
+            blocked_idx = None
+            for candidate, is_visible in zip(candidates, visible):
+                if is_visible:
+                    farthest_idx = candidate
+                else:
+                    blocked_idx = candidate
+                    break
+            
+            # 在最后一个可见点与第一个不可见点之间二分
+            if blocked_idx is not None:
+                low, high = farthest_idx, blocked_idx
+                x1, y1 = path[current_idx]
+                while high - low > 1:
+                    mid = (low + high) // 2
+                    if self._line_of_sight(x1, y1, path[mid][0], path[mid][1], blocked):
+                        low = mid
+                    else:
+                        high = mid
+                farthest_idx = low
+            
+            smoothed_path.append(path[farthest_idx])
+            current_idx = farthest_idx
+        
+        return smoothed_path
+    
     def get_path_length(self, path: List[Tuple[int, int]]) -> float:
         """计算路径长度"""
         if len(path) < 2:
@@ -568,9 +3449,60 @@ class PathPlanner:
             'planning_time': self.planning_time,
             'explored_nodes': self.explored_nodes,
             'path_length': self.get_path_length(self.last_path) if self.last_path else 0.0,
-            'path_points': len(self.last_path) if self.last_path else 0
+            'path_points': len(self.last_path) if self.last_path else 0,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'suboptimality_bound': self.suboptimality_bound
         }
 
+# 批量规划工作进程内的规划器，由_init_batch_worker创建
+_batch_planner: Optional[PathPlanner] = None
+_batch_blocks: List[shared_memory.SharedMemory] = []
+
+def _init_batch_worker(map_info: Dict, seed: Optional[int], cache_size: int,
+                       lattice_params: Optional[Tuple[float, float]] = None):
+    """
+    工作进程初始化：在共享内存上重建只读地图和规划器
+    
+    工作进程与主进程共用resource_tracker，共享内存块的删除由主进程负责。
+    """
+    global _batch_planner
+    
+    def attach(info: Tuple[str, Tuple, str]) -> np.ndarray:
+        """映射共享内存块为只读数组"""
+        name, shape, dtype = info
+        block = shared_memory.SharedMemory(name=name)
+        _batch_blocks.append(block)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array.flags.writeable = False
+        return array
+    
+    grid_map = GridMap(map_info['width'], map_info['height'], map_info['resolution'],
+                       storage=attach(map_info['storage']))
+    
+    if map_info['clearance'] is not None:
+        grid_map.inflation_cells = map_info['inflation_cells']
+        grid_map.clearance_limit = map_info['clearance_limit']
+        grid_map.clearance = attach(map_info['clearance'])
+    
+    if map_info['landmark_distances'] is not None:
+        grid_map.landmarks = map_info['landmarks']
+        grid_map.landmark_distances = attach(map_info['landmark_distances'])
+        grid_map.landmark_version = grid_map.version
+    
+    if map_info['cost'] is not None:
+        grid_map._frozen_cost = attach(map_info['cost'])
+    
+    _batch_planner = PathPlanner(grid_map, seed=seed, cache_size=cache_size)
+    if lattice_params is not None:
+        _batch_planner.configure_lattice(*lattice_params)
+
+def _run_batch_query(start: Tuple[int, int], goal: Tuple[int, int],
+                     algorithm: PlanningAlgorithm, heuristic_method: str,
+                     time_budget: Optional[float]):
+    """在工作进程中执行单个查询"""
+    return _batch_planner.plan_query(start, goal, algorithm, heuristic_method, time_budget)
+
 # 使用示例
 if __name__ == "__main__":
     # 创建测试地图
@@ -593,7 +3525,9 @@ if __name__ == "__main__":
     algorithms = [
         (PlanningAlgorithm.ASTAR, "A*算法"),
         (PlanningAlgorithm.DIJKSTRA, "Dijkstra算法"),
-        (PlanningAlgorithm.RRT, "RRT算法")
+        (PlanningAlgorithm.RRT, "RRT算法"),
+        (PlanningAlgorithm.THETA_STAR, "Theta*算法"),
+        (PlanningAlgorithm.JPS, "跳点搜索")
     ]
     
     for algorithm, name in algorithms:
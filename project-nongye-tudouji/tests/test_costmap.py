@@ -0,0 +1,105 @@
+"""CostMap回归测试：瓦片增量合成与加权搜索"""
+
+import math
+import random
+
+import numpy as np
+
+from algorithms.planning.path_planner import CostMap, GridMap, PathPlanner, PlanningAlgorithm
+
+# 直接读取合成代价数组的算法
+WEIGHTED_ALGORITHMS = [
+    PlanningAlgorithm.ASTAR,
+    PlanningAlgorithm.DIJKSTRA,
+    PlanningAlgorithm.BIDIRECTIONAL_ASTAR,
+    PlanningAlgorithm.BIDIRECTIONAL_DIJKSTRA,
+    PlanningAlgorithm.ARA_STAR,
+]
+
+
+def random_free_cell(grid_map, rng):
+    while True:
+        x, y = rng.randrange(grid_map.width), rng.randrange(grid_map.height)
+        if grid_map.is_valid(x, y):
+            return x, y
+
+
+def weighted_cost(path, cost):
+    total = 0.0
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        total += math.hypot(x2 - x1, y2 - y1) * (float(cost[y1, x1]) + float(cost[y2, x2])) / 2
+    return total
+
+
+def layered_map(seed):
+    rng = random.Random(seed)
+    grid_map = GridMap(100, 70, resolution=0.1)
+    for _ in range(15):
+        x, y = rng.randrange(100), rng.randrange(70)
+        grid_map.set_obstacle_rectangle(x, y, x + rng.randrange(8), y + rng.randrange(8))
+    grid_map.set_inflation_radius(0.1, clearance_limit=0.5)
+    
+    costmap = CostMap(grid_map, tile_size=16)
+    data = np.random.default_rng(seed).uniform(0, 3, (70, 100))
+    costmap.add_layer("detections", 1.5, data)
+    costmap.add_layer("soil_moisture", 0.5)
+    costmap.set_inflation_costs(max_cost=5.0, decay=2.0)
+    return grid_map, costmap, rng
+
+
+def test_incremental_composition_matches_full_recompute():
+    grid_map, costmap, rng = layered_map(0)
+    costmap.composed()
+    costmap.recomposed_tiles = 0
+    
+    costmap.update_layer("detections", np.full((5, 7), 4.0), x=30, y=20)
+    costmap.update_layer("soil_moisture", np.full((3, 3), -2.0), x=97, y=67)
+    grid_map.set_obstacle_rectangle(60, 40, 62, 42)
+    composed = costmap.composed().copy()
+    # 只有被修改区域所在的瓦片重新合成
+    assert 0 < costmap.recomposed_tiles < costmap._dirty.size
+    
+    expected = np.ones((70, 100), dtype=np.float32)
+    for name, layer in costmap.layers.items():
+        expected += np.float32(costmap.weights[name]) * layer
+    expected = np.maximum(expected, 1)
+    assert np.allclose(composed, expected)
+    
+    # 增量更新的膨胀层与重新生成的结果一致
+    inflation = costmap.layers["inflation"].copy()
+    costmap.set_inflation_costs(max_cost=5.0, decay=2.0)
+    assert np.allclose(costmap.layers["inflation"], inflation)
+
+
+def test_weighted_searches_match_cost_field():
+    grid_map, costmap, rng = layered_map(1)
+    cost = costmap.composed()
+    planner = PathPlanner(grid_map, cache_size=0)
+    
+    for _ in range(6):
+        start, goal = random_free_cell(grid_map, rng), random_free_cell(grid_map, rng)
+        optimal = planner.compute_distance_field([start]).cost_at(*goal)
+        for algorithm in WEIGHTED_ALGORITHMS:
+            path, _ = planner.plan_query(start, goal, algorithm)
+            if math.isinf(optimal):
+                assert path is None
+                continue
+            assert path[0] == start and path[-1] == goal
+            assert abs(weighted_cost(path, cost) - optimal) < 1e-3
+
+
+def test_cost_change_invalidates_cached_paths():
+    grid_map, costmap, rng = layered_map(2)
+    planner = PathPlanner(grid_map)
+    start, goal = random_free_cell(grid_map, rng), random_free_cell(grid_map, rng)
+    
+    first, _ = planner.plan_query(start, goal)
+    planner.plan_query(start, goal)
+    assert planner.cache_hits == 1
+    
+    # 在原路径中段铺上高代价，重新规划后应绕开
+    x, y = first[len(first) // 2]
+    costmap.update_layer("detections", np.full((9, 9), 100.0), x=x - 4, y=y - 4)
+    second, _ = planner.plan_query(start, goal)
+    assert planner.cache_hits == 1
+    assert weighted_cost(second, costmap.composed()) < weighted_cost(first, costmap.composed())
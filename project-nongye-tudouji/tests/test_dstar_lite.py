@@ -0,0 +1,71 @@
+"""D* Lite回归测试：增量修复后的路径与A*一致"""
+
+import math
+import random
+
+from algorithms.planning.path_planner import GridMap, PathPlanner, DStarLite
+
+
+def path_cost(path):
+    return sum(math.hypot(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+def random_free_cell(grid_map, rng):
+    while True:
+        x, y = rng.randrange(grid_map.width), rng.randrange(grid_map.height)
+        if grid_map.is_valid(x, y):
+            return x, y
+
+
+def check_against_astar(grid_map, planner, start, goal, path):
+    reference, _ = PathPlanner(grid_map, cache_size=0).plan_query(start, goal)
+    assert (path is None) == (reference is None)
+    if path is None:
+        return
+    assert path[0] == start and path[-1] == goal
+    assert abs(path_cost(path) - path_cost(reference)) < 1e-6
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        assert grid_map.is_valid(x2, y2)
+        assert (x2, y2) in grid_map.get_neighbors(x1, y1)
+
+
+def test_incremental_replanning_matches_astar_on_inflated_map():
+    for seed in range(30):
+        rng = random.Random(seed)
+        grid_map = GridMap(80, 60, resolution=0.1)
+        grid_map.set_inflation_radius(0.1 + 0.1 * (seed % 2))
+        for _ in range(20):
+            x, y = rng.randrange(80), rng.randrange(60)
+            grid_map.set_obstacle_rectangle(x, y, x + rng.randrange(8), y + rng.randrange(3))
+        goal = random_free_cell(grid_map, rng)
+        start = random_free_cell(grid_map, rng)
+        planner = DStarLite(grid_map, goal)
+        
+        for _ in range(8):
+            path = planner.plan(start)
+            check_against_astar(grid_map, planner, start, goal, path)
+            
+            # 在终点附近以外随机增删障碍物，并沿路径前进几步
+            for _ in range(2):
+                x, y = rng.randrange(80), rng.randrange(60)
+                if max(abs(x - goal[0]), abs(y - goal[1])) > 2:
+                    if rng.random() < 0.8:
+                        grid_map.set_obstacle(x, y)
+                    else:
+                        grid_map.clear_obstacle(x, y)
+            if path and len(path) > 3:
+                start = path[rng.randrange(1, min(6, len(path) - 1))]
+            if not grid_map.is_valid(*start):
+                start = random_free_cell(grid_map, rng)
+        planner.detach()
+
+
+def test_inflated_cells_have_no_successors():
+    grid_map = GridMap(20, 20, resolution=0.1)
+    grid_map.set_inflation_radius(0.1)
+    grid_map.set_obstacle(10, 10)
+    planner = DStarLite(grid_map, (2, 2))
+    
+    assert not grid_map.is_valid(11, 10)
+    assert planner._successors(11 + 10 * 20) == ()
+    assert len(planner._successors(15 + 15 * 20)) == 8
@@ -0,0 +1,58 @@
+"""HierarchicalPlanner回归测试：路径只经过可通行单元格，可达性与A*一致"""
+
+import random
+
+from algorithms.planning.path_planner import GridMap, PathPlanner
+from algorithms.planning.hierarchical_planner import HierarchicalPlanner
+
+
+def random_map(seed: int, size: int = 60) -> GridMap:
+    rng = random.Random(seed)
+    grid_map = GridMap(size, size)
+    for _ in range(25):
+        x, y = rng.randrange(size), rng.randrange(size)
+        grid_map.set_obstacle_rectangle(x, y, x + rng.randint(0, 12), y + rng.randint(0, 3))
+    return grid_map
+
+
+def random_free_cell(grid_map: GridMap, rng: random.Random):
+    while True:
+        x, y = rng.randrange(grid_map.width), rng.randrange(grid_map.height)
+        if grid_map.is_valid(x, y):
+            return x, y
+
+
+def test_paths_free_and_reachability_matches_astar():
+    for seed in range(10):
+        grid_map = random_map(seed)
+        blocked = grid_map.blocked_cells()
+        hierarchical = HierarchicalPlanner(grid_map, cluster_size=10)
+        planner = PathPlanner(grid_map, cache_size=0)
+        
+        for u, v in (e for entrances in hierarchical.border_entrances.values() for e in entrances):
+            for idx in (u, v):
+                assert not blocked.flat[idx]
+        
+        rng = random.Random(seed)
+        for _ in range(30):
+            start, goal = random_free_cell(grid_map, rng), random_free_cell(grid_map, rng)
+            path = hierarchical.plan(start, goal)
+            reference, _ = planner.plan_query(start, goal)
+            assert (path is None) == (reference is None), (seed, start, goal)
+            if path is not None:
+                assert path[0] == start and path[-1] == goal
+                assert all(not blocked[y, x] for x, y in path)
+                assert all(max(abs(x2 - x1), abs(y2 - y1)) == 1
+                           for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+def test_start_on_entrance_crosses_border():
+    # 簇边界上的墙只在 (9, 5) 留有缺口，起点就是该入口
+    grid_map = GridMap(20, 10)
+    grid_map.set_obstacle_rectangle(9, 0, 9, 4)
+    grid_map.set_obstacle_rectangle(9, 6, 9, 9)
+    hierarchical = HierarchicalPlanner(grid_map, cluster_size=10)
+    
+    path = hierarchical.plan((9, 5), (15, 5))
+    assert path is not None
+    assert path[0] == (9, 5) and path[-1] == (15, 5)
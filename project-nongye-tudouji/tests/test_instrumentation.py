@@ -0,0 +1,89 @@
+"""PlannerInstrumentation回归测试：计数器、阶段计时与导出"""
+
+import json
+import random
+import threading
+
+from algorithms.planning.path_planner import (GridMap, PathPlanner, PlannerInstrumentation,
+                                              PlanningAlgorithm)
+
+
+def obstacle_map():
+    rng = random.Random(0)
+    grid_map = GridMap(80, 60, resolution=0.1)
+    for _ in range(20):
+        x, y = rng.randrange(80), rng.randrange(60)
+        grid_map.set_obstacle_rectangle(x, y, x + rng.randrange(8), y + rng.randrange(3))
+    grid_map.set_obstacle(2, 2)
+    grid_map.set_obstacle(77, 57)
+    return grid_map
+
+
+def test_search_counters_are_consistent():
+    instrumentation = PlannerInstrumentation()
+    planner = PathPlanner(obstacle_map(), cache_size=0, instrumentation=instrumentation)
+    path, info = planner.plan_query((1, 1), (78, 58))
+    assert path is not None
+    
+    data = instrumentation.export()
+    counters = data['counters']
+    assert data['records'] == 1
+    assert counters['expanded']['total'] == info['explored_nodes']
+    pushes, pops = counters['heap_pushes']['total'], counters['heap_pops']['total']
+    assert pops <= pushes
+    assert pops == info['explored_nodes'] + counters['stale_skipped']['total']
+    assert counters['neighbor_checks']['total'] >= info['explored_nodes']
+    assert set(data['phases']) >= {'search', 'reconstruction'}
+
+
+def test_nested_phases_and_histograms():
+    instrumentation = PlannerInstrumentation()
+    planner = PathPlanner(obstacle_map(), instrumentation=instrumentation)
+    path, _ = planner.plan_query((1, 1), (78, 58))
+    planner.plan_query((1, 1), (78, 58))
+    planner.smooth_path(path, "exponential")
+    
+    data = instrumentation.export()
+    # 两次查询加一次平滑，第二次查询命中缓存
+    assert data['records'] == 3
+    assert data['counters']['cache_hits']['total'] == 1
+    assert data['counters']['los_batches']['total'] >= 1
+    assert data['counters']['los_checks']['total'] >= data['counters']['los_batches']['total']
+    
+    for entry in data['phases'].values():
+        assert entry['min'] <= entry['mean'] <= entry['max']
+        assert sum(count for _, count in entry['histogram']) == entry['count']
+        bounds = [bound for bound, _ in entry['histogram']]
+        assert all(bound & (bound - 1) == 0 for bound in bounds)
+    
+    # 嵌套阶段的耗时只计入内层，外层只剩自身的少量开销
+    with instrumentation.phase("outer"):
+        with instrumentation.phase("inner"):
+            sum(range(20000))
+    instrumentation.flush()
+    phases = instrumentation.export()['phases']
+    assert phases['outer']['total'] < phases['inner']['total']
+
+
+def test_shared_between_threads_and_saved(tmp_path):
+    instrumentation = PlannerInstrumentation()
+    grid_map = obstacle_map()
+    planner = PathPlanner(grid_map, cache_size=0, instrumentation=instrumentation)
+    queries = [((1, 1 + i), (78, 58 - i)) for i in range(8)]
+    
+    threads = [threading.Thread(target=planner.plan_query,
+                                args=(start, goal, PlanningAlgorithm.JPS))
+               for start, goal in queries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    path = tmp_path / "instrumentation.json"
+    instrumentation.save(str(path))
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert data['records'] == len(queries)
+    assert data['counters']['expanded']['count'] == len(queries)
+    
+    instrumentation.reset()
+    assert instrumentation.export() == {'records': 0, 'counters': {}, 'phases': {}}
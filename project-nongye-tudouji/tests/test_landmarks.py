@@ -0,0 +1,42 @@
+"""ALT路标测试：路标表与地图快照保持一致"""
+
+from algorithms.planning.path_planner import GridMap, PathPlanner, PlanningAlgorithm
+
+
+def comb_map():
+    # 梳状隔墙，直线距离严重低估真实距离，ALT启发式明显减少扩展节点
+    grid_map = GridMap(120, 80, resolution=0.1)
+    for x in range(10, 110, 12):
+        if (x // 12) % 2:
+            grid_map.set_obstacle_rectangle(x, 0, x + 1, 70)
+        else:
+            grid_map.set_obstacle_rectangle(x, 10, x + 1, 79)
+    return grid_map
+
+
+def test_query_after_build_landmarks_uses_alt():
+    grid_map = comb_map()
+    planner = PathPlanner(grid_map, cache_size=0)
+    start, goal = (2, 40), (117, 40)
+    
+    before, before_info = planner.plan_query(start, goal, PlanningAlgorithm.ASTAR, "alt")
+    assert not grid_map.snapshot().landmarks_current()
+    
+    grid_map.build_landmarks(count=6, seed=0)
+    after, after_info = planner.plan_query(start, goal, PlanningAlgorithm.ASTAR, "alt")
+    
+    snapshot = grid_map.snapshot()
+    assert snapshot.landmarks_current()
+    assert snapshot.landmarks == grid_map.landmarks
+    assert abs(after_info['path_length'] - before_info['path_length']) < 1e-6
+    assert after_info['explored_nodes'] < before_info['explored_nodes']
+
+
+def test_map_change_invalidates_landmarks_in_snapshot():
+    grid_map = comb_map()
+    grid_map.build_landmarks(count=4, seed=0)
+    assert grid_map.snapshot().landmarks_current()
+    
+    grid_map.set_obstacle(5, 5)
+    assert not grid_map.landmarks_current()
+    assert not grid_map.snapshot().landmarks_current()
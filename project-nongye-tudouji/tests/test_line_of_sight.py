@@ -0,0 +1,118 @@
+"""视线检测测试：任意角度路径与A*/JPS遵守同样的不切角规则"""
+
+import math
+import random
+
+from algorithms.planning.path_planner import GridMap, PathPlanner, PlanningAlgorithm
+
+
+def path_cost(path):
+    return sum(math.hypot(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+def random_free_cell(grid_map, rng):
+    while True:
+        x, y = rng.randrange(grid_map.width), rng.randrange(grid_map.height)
+        if grid_map.is_valid(x, y):
+            return x, y
+
+
+def random_map(seed, width=60, height=45):
+    rng = random.Random(seed)
+    grid_map = GridMap(width, height, resolution=0.1)
+    for _ in range(rng.randint(150, 500)):
+        grid_map.set_obstacle(rng.randrange(width), rng.randrange(height))
+    if seed % 3:
+        grid_map.set_inflation_radius(0.03 * (seed % 3))
+    return grid_map, rng
+
+
+def segment_feasible(planner, start, end):
+    return not planner._line_collision_check(start[0], start[1], end[0], end[1])
+
+
+def test_line_of_sight_rejects_corner_squeeze():
+    grid_map = GridMap(20, 20, resolution=0.1)
+    for i in range(20):
+        grid_map.set_obstacle(i, 19 - i)
+    planner = PathPlanner(grid_map)
+    
+    # 对角墙上相邻障碍物只在角点相接，A*不能从中间穿过，视线也不能
+    assert not planner._line_of_sight(2, 2, 15, 15)
+    assert planner._line_collision_check(2, 2, 15, 15)
+    assert not planner._line_of_sight(9, 9, 10, 10)
+    assert planner._line_of_sight(2, 2, 8, 9)
+
+
+def test_line_of_sight_matches_neighbor_moves():
+    grid_map, rng = random_map(7)
+    planner = PathPlanner(grid_map)
+    for _ in range(300):
+        x, y = random_free_cell(grid_map, rng)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nx, ny = x + dx, y + dy
+                if (dx or dy) and 0 <= nx < grid_map.width and 0 <= ny < grid_map.height:
+                    assert planner._line_of_sight(x, y, nx, ny) == \
+                        ((nx, ny) in grid_map.get_neighbors(x, y))
+
+
+def test_theta_star_paths_are_feasible():
+    for seed in range(12):
+        grid_map, rng = random_map(seed)
+        planner = PathPlanner(grid_map, cache_size=0)
+        for _ in range(8):
+            start, goal = random_free_cell(grid_map, rng), random_free_cell(grid_map, rng)
+            reference, _ = planner.plan_query(start, goal, PlanningAlgorithm.ASTAR)
+            path, _ = planner.plan_query(start, goal, PlanningAlgorithm.THETA_STAR)
+            assert (path is None) == (reference is None)
+            if path is None:
+                continue
+            assert path[0] == start and path[-1] == goal
+            assert all(segment_feasible(planner, p, q) for p, q in zip(path, path[1:]))
+            assert path_cost(path) <= path_cost(reference) + 1e-6
+
+
+def test_batch_line_of_sight_matches_collision_check():
+    grid_map, rng = random_map(4, 120, 80)
+    planner = PathPlanner(grid_map)
+    starts, ends = [], []
+    for _ in range(1500):
+        start = random_free_cell(grid_map, rng)
+        if rng.random() < 0.3:
+            # 斜率恰为1的线段会穿过单元格角点
+            d = rng.randint(-40, 40)
+            end = (start[0] + d, start[1] + rng.choice((d, -d)))
+            if not (0 <= end[0] < grid_map.width and 0 <= end[1] < grid_map.height):
+                continue
+        else:
+            end = random_free_cell(grid_map, rng)
+        starts.append(start)
+        ends.append(end)
+    
+    visible = planner.batch_line_of_sight(starts, ends)
+    assert 0 < visible.sum() < len(starts)
+    for start, end, is_visible in zip(starts, ends, visible):
+        assert is_visible == segment_feasible(planner, start, end)
+        assert is_visible == planner._line_of_sight(start[0], start[1], end[0], end[1])
+    
+    grid_map = GridMap(20, 20, resolution=0.1)
+    for i in range(20):
+        grid_map.set_obstacle(i, 19 - i)
+    assert not PathPlanner(grid_map).batch_line_of_sight([(2, 2)], [(15, 15)])[0]
+
+
+def test_smoothed_segments_pass_collision_check():
+    for seed in range(12):
+        grid_map, rng = random_map(seed)
+        planner = PathPlanner(grid_map, cache_size=0)
+        for _ in range(8):
+            start, goal = random_free_cell(grid_map, rng), random_free_cell(grid_map, rng)
+            path, _ = planner.plan_query(start, goal, PlanningAlgorithm.ASTAR)
+            if path is None:
+                continue
+            for mode in ("linear", "exponential"):
+                smoothed = planner.smooth_path(path, mode)
+                assert smoothed[0] == start and smoothed[-1] == goal
+                assert all(segment_feasible(planner, p, q)
+                           for p, q in zip(smoothed, smoothed[1:]))
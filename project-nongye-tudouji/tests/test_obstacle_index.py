@@ -0,0 +1,96 @@
+"""ObstacleIndex回归测试：各查询与逐个障碍物的暴力判断一致"""
+
+import random
+
+import numpy as np
+
+from algorithms.planning.agricultural_planner import ObstacleIndex
+
+
+def random_boxes(rng, count):
+    boxes = []
+    for _ in range(count):
+        x, y = rng.uniform(0, 50), rng.uniform(0, 30)
+        boxes.append((x, y, x + rng.uniform(0, 4), y + rng.uniform(0, 1.5)))
+    return boxes
+
+
+def brute_contains(boxes, x, y):
+    return any(x1 <= x <= x2 and y1 <= y <= y2 for x1, y1, x2, y2 in boxes)
+
+
+def brute_segment_hit(boxes, x1, y1, x2, y2, samples=400):
+    # 线段密集采样，可能漏掉只擦过障碍物角点的接触
+    ts = np.linspace(0, 1, samples)
+    xs, ys = x1 + ts * (x2 - x1), y1 + ts * (y2 - y1)
+    return any(((bx1 <= xs) & (xs <= bx2) & (by1 <= ys) & (ys <= by2)).any()
+               for bx1, by1, bx2, by2 in boxes)
+
+
+def test_point_queries_match_brute_force():
+    rng = random.Random(0)
+    boxes = random_boxes(rng, 200)
+    index = ObstacleIndex(boxes)
+    xs = [rng.uniform(-5, 60) for _ in range(3000)]
+    ys = [rng.uniform(-5, 35) for _ in range(3000)]
+    # 障碍物的角点和边界上的点也算在内（闭矩形）
+    xs += [b[0] for b in boxes] + [b[2] for b in boxes]
+    ys += [b[1] for b in boxes] + [(b[1] + b[3]) / 2 for b in boxes]
+    
+    expected = [brute_contains(boxes, x, y) for x, y in zip(xs, ys)]
+    assert index.contains_points(xs, ys).tolist() == expected
+    assert [index.contains_point(x, y) for x, y in zip(xs, ys)] == expected
+
+
+def test_row_queries_match_brute_force():
+    rng = random.Random(1)
+    boxes = random_boxes(rng, 150)
+    index = ObstacleIndex(boxes, cell_size=2.0)
+    ys = [rng.uniform(-2, 32) for _ in range(300)] + [b[1] for b in boxes[:20]]
+    
+    for x_min, x_max in ((-np.inf, np.inf), (10.0, 25.0)):
+        expected = [any(y1 <= y <= y2 and x1 <= x_max and x_min <= x2
+                        for x1, y1, x2, y2 in boxes) for y in ys]
+        assert index.rows_blocked(ys, x_min, x_max).tolist() == expected
+    
+    for y in ys[:50]:
+        intervals = index.row_intervals(y)
+        expected = sorted((x1, x2) for x1, y1, x2, y2 in boxes if y1 <= y <= y2)
+        assert sorted(map(tuple, intervals.tolist())) == expected
+        assert (np.diff(intervals[:, 0]) >= 0).all()
+        strict = sorted((x1, x2) for x1, y1, x2, y2 in boxes if y1 < y < y2)
+        assert sorted(map(tuple, index.row_intervals(y, strict=True).tolist())) == strict
+
+
+def test_segment_queries_match_brute_force():
+    rng = random.Random(2)
+    boxes = random_boxes(rng, 120)
+    index = ObstacleIndex(boxes)
+    segments = []
+    for _ in range(800):
+        x1, y1 = rng.uniform(-2, 52), rng.uniform(-2, 32)
+        if rng.random() < 0.3:
+            # 水平、竖直线段走平行于坐标轴的分支
+            x2, y2 = (x1 + rng.uniform(-10, 10), y1) if rng.random() < 0.5 else \
+                (x1, y1 + rng.uniform(-10, 10))
+        else:
+            x2, y2 = x1 + rng.uniform(-10, 10), y1 + rng.uniform(-10, 10)
+        segments.append((x1, y1, x2, y2))
+    
+    hits = index.segments_hit(*np.array(segments).T)
+    for segment, hit in zip(segments, hits):
+        if brute_segment_hit(boxes, *segment):
+            assert hit
+        elif hit:
+            # 采样漏掉的只可能是擦边接触，把障碍物稍微放大后采样应能命中
+            grown = [(x1 - 0.05, y1 - 0.05, x2 + 0.05, y2 + 0.05) for x1, y1, x2, y2 in boxes]
+            assert brute_segment_hit(grown, *segment)
+
+
+def test_empty_index():
+    index = ObstacleIndex(np.zeros((0, 4)))
+    assert len(index) == 0
+    assert not index.contains_point(1.0, 1.0)
+    assert not index.contains_points([1.0, 2.0], [1.0, 2.0]).any()
+    assert not index.segments_hit([0.0], [0.0], [5.0], [5.0]).any()
+    assert len(index.row_intervals(1.0)) == 0
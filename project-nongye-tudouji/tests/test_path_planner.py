@@ -0,0 +1,184 @@
+"""PathPlanner回归测试：各算法与A*的代价一致、缓存、批量规划和地图存取"""
+
+import math
+import random
+
+import pytest
+
+from algorithms.planning.path_planner import GridMap, PathPlanner, PlanningAlgorithm
+
+# 网格最优算法，在均匀代价地图上与A*代价相同
+OPTIMAL_ALGORITHMS = [
+    PlanningAlgorithm.DIJKSTRA,
+    PlanningAlgorithm.JPS,
+    PlanningAlgorithm.BIDIRECTIONAL_ASTAR,
+    PlanningAlgorithm.BIDIRECTIONAL_DIJKSTRA,
+    PlanningAlgorithm.ARA_STAR,
+    PlanningAlgorithm.D_STAR,
+]
+
+
+def path_cost(path):
+    return sum(math.hypot(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+def random_free_cell(grid_map, rng):
+    while True:
+        x, y = rng.randrange(grid_map.width), rng.randrange(grid_map.height)
+        if grid_map.is_valid(x, y):
+            return x, y
+
+
+def random_map(seed, width=60, height=45):
+    rng = random.Random(seed)
+    grid_map = GridMap(width, height, resolution=0.1)
+    for _ in range(rng.randint(10, 30)):
+        x, y = rng.randrange(width), rng.randrange(height)
+        grid_map.set_obstacle_rectangle(x, y, x + rng.randrange(10), y + rng.randrange(4))
+    for _ in range(rng.randint(50, 200)):
+        grid_map.set_obstacle(rng.randrange(width), rng.randrange(height))
+    if seed % 2:
+        grid_map.set_inflation_radius(0.1)
+    return grid_map, rng
+
+
+def random_queries(grid_map, rng, count):
+    return [(random_free_cell(grid_map, rng), random_free_cell(grid_map, rng))
+            for _ in range(count)]
+
+
+def check_grid_path(grid_map, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        assert (x2, y2) in grid_map.get_neighbors(x1, y1)
+
+
+@pytest.mark.parametrize("algorithm", OPTIMAL_ALGORITHMS, ids=lambda a: a.value)
+def test_optimal_algorithms_match_astar(algorithm):
+    for seed in range(6):
+        grid_map, rng = random_map(seed)
+        planner = PathPlanner(grid_map, cache_size=0)
+        for start, goal in random_queries(grid_map, rng, 6):
+            reference, _ = planner.plan_query(start, goal, PlanningAlgorithm.ASTAR)
+            path, _ = planner.plan_query(start, goal, algorithm)
+            assert (path is None) == (reference is None)
+            if path is None:
+                continue
+            assert path[0] == start and path[-1] == goal
+            assert abs(path_cost(path) - path_cost(reference)) < 1e-6
+            if algorithm != PlanningAlgorithm.JPS:
+                # JPS返回跳点，其余算法返回逐格路径
+                check_grid_path(grid_map, path, start, goal)
+
+
+def test_alt_heuristic_keeps_optimal_cost():
+    grid_map, rng = random_map(3)
+    grid_map.build_landmarks(count=6, seed=0)
+    planner = PathPlanner(grid_map, cache_size=0)
+    for start, goal in random_queries(grid_map, rng, 10):
+        reference, _ = planner.plan_query(start, goal, PlanningAlgorithm.DIJKSTRA)
+        for algorithm in (PlanningAlgorithm.ASTAR, PlanningAlgorithm.ARA_STAR):
+            path, _ = planner.plan_query(start, goal, algorithm, "alt")
+            assert (path is None) == (reference is None)
+            if path is not None:
+                assert abs(path_cost(path) - path_cost(reference)) < 1e-6
+
+
+def test_ara_star_bound_holds_under_time_budget():
+    grid_map, rng = random_map(4, 150, 120)
+    planner = PathPlanner(grid_map, cache_size=0)
+    for start, goal in random_queries(grid_map, rng, 4):
+        reference, _ = planner.plan_query(start, goal, PlanningAlgorithm.ASTAR)
+        path, info = planner.plan_query(start, goal, PlanningAlgorithm.ARA_STAR,
+                                        time_budget=0.0)
+        assert (path is None) == (reference is None)
+        if path is None:
+            continue
+        check_grid_path(grid_map, path, start, goal)
+        bound = info['suboptimality_bound']
+        assert bound >= 1.0
+        assert path_cost(path) <= bound * path_cost(reference) + 1e-6
+
+
+@pytest.mark.parametrize("algorithm", [PlanningAlgorithm.RRT, PlanningAlgorithm.RRT_STAR],
+                         ids=lambda a: a.value)
+def test_sampling_paths_are_collision_free(algorithm):
+    for seed in range(4):
+        grid_map, rng = random_map(seed)
+        planner = PathPlanner(grid_map, seed=seed, cache_size=0)
+        for start, goal in random_queries(grid_map, rng, 4):
+            path, _ = planner.plan_query(start, goal, algorithm)
+            if path is None:
+                continue
+            assert path[0] == start and path[-1] == goal
+            for (x1, y1), (x2, y2) in zip(path, path[1:]):
+                assert not planner._line_collision_check(x1, y1, x2, y2)
+
+
+def test_path_cache_hits_and_invalidation():
+    grid_map, rng = random_map(0)
+    planner = PathPlanner(grid_map, cache_size=2)
+    start, goal = random_free_cell(grid_map, rng), random_free_cell(grid_map, rng)
+    
+    first, _ = planner.plan_query(start, goal)
+    again, info = planner.plan_query(start, goal)
+    assert again == first
+    assert (planner.cache_hits, planner.cache_misses) == (1, 1)
+    assert info['explored_nodes'] == 0
+    
+    # 地图变化后版本号改变，旧条目不再命中
+    grid_map.set_obstacle(*random_free_cell(grid_map, rng))
+    planner.plan_query(start, goal)
+    assert (planner.cache_hits, planner.cache_misses) == (1, 2)
+    
+    # 容量为2时最久未使用的条目被淘汰
+    other = random_free_cell(grid_map, rng)
+    planner.plan_query(start, other)
+    planner.plan_query(other, goal)
+    planner.plan_query(start, goal)
+    assert planner.cache_hits == 1
+    
+    planner.clear_cache()
+    planner.plan_query(other, goal)
+    assert planner.cache_hits == 1
+
+
+def test_plan_many_matches_sequential_queries():
+    grid_map, rng = random_map(1)
+    grid_map.build_landmarks(count=4, seed=0)
+    queries = random_queries(grid_map, rng, 8)
+    planner = PathPlanner(grid_map, cache_size=0)
+    
+    sequential = [planner.plan_query(start, goal, PlanningAlgorithm.ASTAR, "alt")
+                  for start, goal in queries]
+    parallel = planner.plan_many(queries, PlanningAlgorithm.ASTAR, "alt", workers=2)
+    
+    assert len(parallel) == len(queries)
+    for (expected, expected_info), (path, info) in zip(sequential, parallel):
+        assert (path is None) == (expected is None)
+        if path is not None:
+            assert abs(path_cost(path) - path_cost(expected)) < 1e-6
+            assert abs(info['path_length'] - expected_info['path_length']) < 1e-6
+            # 工作进程同样使用了路标表
+            assert info['explored_nodes'] == expected_info['explored_nodes']
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_save_load_round_trip(tmp_path, packed):
+    grid_map, rng = random_map(1)
+    path = str(tmp_path / ("map.npz" if packed else "map.npy"))
+    grid_map.save(path, packed=packed)
+    loaded = GridMap.load(path)
+    
+    assert (loaded.width, loaded.height) == (grid_map.width, grid_map.height)
+    assert loaded.resolution == grid_map.resolution
+    assert (loaded.grid == grid_map.grid).all()
+    assert (loaded.move_mask == grid_map.move_mask).all()
+    assert (loaded.blocked_cells() == grid_map.blocked_cells()).all()
+    
+    original = PathPlanner(grid_map, cache_size=0)
+    reloaded = PathPlanner(loaded, cache_size=0)
+    for start, goal in random_queries(grid_map, rng, 5):
+        expected, _ = original.plan_query(start, goal)
+        actual, _ = reloaded.plan_query(start, goal)
+        assert actual == expected
@@ -0,0 +1,48 @@
+"""RowGraphPlanner回归测试：接入段只做局部搜索"""
+
+import random
+
+from algorithms.planning.agricultural_planner import AgriculturalField, RowGraphPlanner
+
+
+def crop_field(seed: int) -> AgriculturalField:
+    rng = random.Random(seed)
+    field = AgriculturalField(30, 40, row_spacing=0.8)
+    for row_y in field.row_positions[:-1]:
+        bed_y = row_y + field.row_spacing / 2 - 0.15
+        x = 2.0
+        while x < 28.0:
+            length = min(rng.uniform(4.0, 12.0), 28.0 - x)
+            field.add_obstacle(x, bed_y, length, 0.3)
+            x += length + rng.uniform(0.6, 1.2)
+    return field
+
+
+def test_access_search_is_bounded():
+    field = crop_field(0)
+    grid_map = field.to_grid_map(resolution=0.1)
+    planner = RowGraphPlanner(field, grid_map, robot_width=0.1, access_radius=1.5)
+    blocked = grid_map.blocked_cells()
+    
+    # 每个接入段的代价上限为 1.5 * access_radius / resolution + 2 个单元格
+    radius_cells = 1.5 * 1.5 / 0.1 + 2
+    bound = 2 * (2 * radius_cells + 1) ** 2
+    
+    rng = random.Random(0)
+    planned = 0
+    while planned < 20:
+        start = (rng.uniform(0, 30), rng.uniform(0, 40))
+        goal = (rng.uniform(0, 30), rng.uniform(0, 40))
+        if not (grid_map.is_valid(*grid_map.world_to_grid(*start)) and
+                grid_map.is_valid(*grid_map.world_to_grid(*goal))):
+            continue
+        planned += 1
+        
+        path = planner.plan(start, goal)
+        stats = planner.get_statistics()
+        assert path is not None
+        assert not stats['fallback']
+        assert stats['access_explored_nodes'] <= bound
+        for x, y in path:
+            cx, cy = grid_map.world_to_grid(x, y)
+            assert not blocked[cy, cx]
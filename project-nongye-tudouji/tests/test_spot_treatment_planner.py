@@ -0,0 +1,27 @@
+"""SpotTreatmentPlanner回归测试：不可达的检查点不影响其余检查点"""
+
+from algorithms.planning.agricultural_planner import AgriculturalField, SpotTreatmentPlanner
+from algorithms.planning.path_planner import GridMap, PlanningAlgorithm
+
+
+def walled_map():
+    # 竖墙把地图分成左右两个互不连通的区域
+    grid_map = GridMap(40, 30, resolution=1.0)
+    grid_map.set_obstacle_rectangle(20, 0, 20, 29)
+    return grid_map
+
+
+def test_unreachable_spots_are_skipped():
+    grid_map = walled_map()
+    planner = SpotTreatmentPlanner(AgriculturalField(40, 30), grid_map)
+    # 墙上与墙另一侧的检查点比左侧的可达检查点离起点更近
+    spots = [(20.5, 3.5), (22.5, 2.5), (5.5, 5.5), (10.5, 20.5), (35.5, 25.5), (3.5, 12.5)]
+    reachable = {(5, 5), (10, 20), (3, 12)}
+    
+    for algorithm in (PlanningAlgorithm.ASTAR, PlanningAlgorithm.JPS):
+        route = planner.plan_inspection_route(spots, (2.5, 2.5), algorithm)
+        cells = [grid_map.world_to_grid(x, y) for x, y in route]
+        
+        assert reachable <= set(cells)
+        assert sorted(planner.skipped_spots) == [(20, 3), (22, 2), (35, 25)]
+        assert all(x < 20 for x, _ in cells)